@@ -0,0 +1,195 @@
+
+# AdditiveBound.py
+# Change Log
+# 18/10/2026    - Initial development: arborescence bound on assignment reduced costs
+
+import logging
+import numpy
+import algorithms.HungarianAssignment as HA
+
+def additiveBound ( costMatrix, rowPotentials, colPotentials, roots = ( 0, ), rounds = 3 ):
+
+  '''
+
+  Fischetti-Toth additive lower bound on the cost of a tour of an asymmetric
+  costMatrix, for the branch and bound in TSP.TSP ().
+
+  The assignment bound is sum ( rowPotentials ) + sum ( colPotentials ), and
+  with its optimal potentials every reduced cost
+
+     costMatrix [i,j] - rowPotentials [i] - colPotentials [j]
+
+  is >= 0. Since a tour is an assignment, its cost is the assignment bound plus
+  its reduced cost, so any lower bound on the reduced cost of a tour can be
+  added on. The reduced costs are 0 on the assignment's circuits, but a tour
+  must also join the circuits up, which an arborescence bound can see:
+
+  A tour less the arc into r is a spanning arborescence rooted at r, and less
+  the arc out of r, an arborescence of arcs into r. The better of these two
+  bounds (see minimumArborescence ()), plus the cheapest arc into / out of r,
+  is added, and its residual costs are again reduced by an assignment, and so
+  on, each bound being added to the last. This stops after rounds rounds, or
+  sooner once a round adds nothing; round k uses the root roots [k % len].
+
+  Parameters:
+  -----------
+
+  costMatrix                   : 2D numpy.array, numpy.inf where an arc is
+                                 forbidden.
+  rowPotentials, colPotentials : optimal assignment duals, as returned by
+                                 HungarianAssignment.shortestAugmentingPathAssignment ().
+
+  Returns the bound: numpy.inf if no arborescence exists.
+
+  '''
+
+  residualCosts = numpy.maximum ( costMatrix - rowPotentials [:, None] - colPotentials [None, :], 0 )
+  numpy.fill_diagonal ( residualCosts, numpy.inf )
+
+  bound = rowPotentials.sum () + colPotentials.sum ()
+  tolerance = 1e-9 * max ( 1.0, abs ( bound ) )
+
+  for round in range ( rounds ):
+
+    root = roots [ round % len ( roots ) ]
+    outward, outwardResiduals = minimumArborescence ( residualCosts, root )
+    inward, inwardResiduals = minimumArborescence ( residualCosts.T, root )
+
+    if numpy.isinf ( outward ) or numpy.isinf ( inward ):
+      return numpy.inf
+
+    if outward >= inward:
+      residualCosts = outwardResiduals
+      closingArc = residualCosts [:, root].min ()
+      residualCosts [:, root] -= closingArc
+    else:
+      residualCosts = inwardResiduals.T
+      closingArc = residualCosts [root].min ()
+      residualCosts [root] -= closingArc
+
+    arborescenceBound = max ( outward, inward ) + closingArc
+    assignmentBound, residualCosts = _assignmentReduction ( residualCosts )
+    bound = bound + arborescenceBound + assignmentBound
+
+    logging.debug ( "Additive bound round " + str ( round ) + ": + " + str ( arborescenceBound ) + " + " + str ( assignmentBound ) )
+
+    if arborescenceBound + assignmentBound <= tolerance:
+      break
+
+  return bound
+
+def _assignmentReduction ( residualCosts ):
+
+  '''
+  The optimal assignment cost of residualCosts (>= 0) and the reduced costs
+  left by its potentials.
+  '''
+
+  finite = numpy.isfinite ( residualCosts )
+  bigCost = ( residualCosts [finite].max () + 1 ) * len ( residualCosts ) if finite.any () else 1.0
+  rowToCol, colToRow, rowPotentials, colPotentials = HA.shortestAugmentingPathAssignment ( numpy.where ( finite, residualCosts, bigCost ) )
+
+  reducedCosts = numpy.maximum ( residualCosts - rowPotentials [:, None] - colPotentials [None, :], 0 )
+  return rowPotentials.sum () + colPotentials.sum (), reducedCosts
+
+def minimumArborescence ( costMatrix, root ):
+
+  '''
+
+  Cost of the cheapest spanning arborescence rooted at root (arc i -> j costs
+  costMatrix [i,j]), by Edmonds' (Chu-Liu) algorithm, on the dense matrix:
+
+  - Every node but the root takes its cheapest incoming arc, and that cost is
+    taken off all its incoming arcs, and added to the total.
+  - If those arcs make no cycle they are the arborescence. Otherwise each cycle
+    is contracted to one node, whose arcs in and out are the cheapest (reduced)
+    arcs in and out of any of its nodes, and the search is repeated. Any arc
+    into a cycle node costs at least its reduced cost more than the cycle arc
+    it replaces, which is why the reduced costs carry over.
+
+  Each round is O(n^2) numpy work.
+
+  Returns ( cost, residualCosts ): cost is numpy.inf if some node cannot be
+  reached from root. residualCosts are the costs less every reduction made
+  on each arc (as an arc into a node or contracted cycle); they are >= 0, and
+  since an arborescence enters each node and cycle at least once, any
+  arborescence costs at least cost plus its residual cost.
+
+  '''
+
+  costs = numpy.array ( costMatrix, dtype = float )
+  numpy.fill_diagonal ( costs, numpy.inf )
+  residualCosts = costs.copy ()
+  groups = numpy.arange ( len ( costs ) )
+  totalCost = 0.0
+
+  while True:
+
+    numNodes = len ( costs )
+    if numNodes == 1:
+      return totalCost, residualCosts
+
+    cheapestIn = costs.min ( axis = 0 )
+    cheapestIn [root] = 0
+    if numpy.isinf ( cheapestIn ).any ():
+      return numpy.inf, residualCosts
+
+    totalCost += cheapestIn.sum ()
+    costs -= cheapestIn [None, :]
+    residualCosts -= numpy.where ( groups [:, None] != groups [None, :], cheapestIn [groups] [None, :], 0 )
+    predecessors = costs.argmin ( axis = 0 )
+
+    labels = _contractCycles ( predecessors, root )
+    if labels is None:
+      return totalCost, residualCosts
+
+    # Cheapest arc between each pair of groups; arcs inside a group are dropped.
+    order = labels.argsort ( kind = 'mergesort' )
+    starts = numpy.flatnonzero ( numpy.concatenate ( ( [True], numpy.diff ( labels [order] ) != 0 ) ) )
+    costs = numpy.minimum.reduceat ( costs [order], starts, axis = 0 )
+    costs = numpy.minimum.reduceat ( costs [:, order], starts, axis = 1 )
+    numpy.fill_diagonal ( costs, numpy.inf )
+    root = labels [root]
+    groups = labels [groups]
+
+def _contractCycles ( predecessors, root ):
+
+  '''
+  Group label of each node when each cycle of the predecessors (ignoring the
+  root's) is made one group and every other node is its own, numbered 0..;
+  None if there is no cycle.
+  '''
+
+  numNodes = len ( predecessors )
+  labels = - numpy.ones ( numNodes, dtype = int )
+  visitedFrom = - numpy.ones ( numNodes, dtype = int )
+  nextLabel = 0
+  foundCycle = False
+
+  for start in range ( numNodes ):
+
+    node = start
+    while node != root and visitedFrom [node] == -1 and labels [node] == -1:
+      visitedFrom [node] = start
+      node = predecessors [node]
+
+    if node != root and visitedFrom [node] == start and labels [node] == -1:
+      # Walked round a new cycle back to node.
+      foundCycle = True
+      member = node
+      while True:
+        labels [member] = nextLabel
+        member = predecessors [member]
+        if member == node:
+          break
+      nextLabel = nextLabel + 1
+
+  if not foundCycle:
+    return None
+
+  for node in range ( numNodes ):
+    if labels [node] == -1:
+      labels [node] = nextLabel
+      nextLabel = nextLabel + 1
+
+  return labels
@@ -0,0 +1,193 @@
+
+# AuctionAssignment.py
+# Change Log
+# 18/10/2026    - Initial development: sparse auction with epsilon scaling
+
+import logging
+import numpy
+
+def SparseAuctionAssignment ( indptr, indices, costs, scalingFactor = 4 ):
+
+  '''
+
+  Least cost assignment for problems where most supply/demand pairings are
+  forbidden. Only the allowed edges are given, in CSR form, so memory is
+  proportional to the number of edges rather than n^2 (HungarianAssignment
+  needs a dense matrix with forbidden cells set to a large sentinel).
+
+  The method is Bertsekas' auction algorithm with epsilon scaling. Unassigned
+  supply vertices (rows) bid for their best demand vertex (col) given the current
+  col prices, raising the price by the margin over their second best choice plus
+  epsilon. All free rows bid at once (the Jacobi variant), so every bidding round
+  is a handful of numpy operations over the edges of the free rows. Epsilon is
+  divided by scalingFactor after each phase until it reaches its final value.
+
+  Parameters:
+  -----------
+
+  indptr, indices, costs : the CSR arrays. The allowed edges from row i go to cols
+                           indices [indptr[i]:indptr[i+1]] with the corresponding
+                           costs. See denseToCSR ().
+
+  The problem must be square (n rows, n cols). Costs are multiplied by (n+1)
+  internally so that the final epsilon of 1 gives the optimum for integer costs;
+  for real valued costs the total is within n/(n+1) of the optimum.
+
+  Result:
+  ( rowToCol, totalCost ) where rowToCol [i] is the col assigned to row i.
+
+  Raises ValueError if no complete assignment exists using the allowed edges.
+
+  Example
+
+  costMatrix = numpy.array ( [ 6, 0, 1,
+                               0, 4, 0,
+                               5, 2, 3 ] ).reshape (3,3) with 0 meaning forbidden
+  indptr, indices, costs = denseToCSR ( costMatrix, 0 )
+  >>> SparseAuctionAssignment ( indptr, indices, costs )
+  (array([2, 1, 0]), 10)
+  '''
+
+  indptr  = numpy.asarray ( indptr )
+  indices = numpy.asarray ( indices )
+  costs   = numpy.asarray ( costs )
+
+  n = len ( indptr ) - 1
+  rowToCol = numpy.array ( [-1] * n )
+
+  if n == 0:
+    return rowToCol, 0
+
+  rowLengths = numpy.diff ( indptr )
+  if ( rowLengths == 0 ).any () or len ( numpy.unique ( indices ) ) < n or indices.max () >= n:
+    raise ValueError ( "No feasible assignment: every row and col needs at least one allowed edge" )
+
+  # Work with integer benefits (negated, scaled costs) so that the auction maximises.
+  if costs.dtype.kind in 'iub':
+    benefits = -costs.astype ( numpy.int64 ) * ( n + 1 )
+  else:
+    benefits = -costs.astype ( float ) * ( n + 1 )
+
+  costRange = benefits.max () - benefits.min ()
+  prices = numpy.zeros ( n, dtype = benefits.dtype )
+
+  epsilon = max ( costRange // scalingFactor, 1 )
+
+  while True:
+
+    logging.debug ( "Auction phase with epsilon " + str ( epsilon ) )
+    rowToCol = _auctionPhase ( indptr, indices, benefits, prices, epsilon, costRange )
+
+    if epsilon == 1:
+      break
+    epsilon = max ( epsilon // scalingFactor, 1 )
+
+  totalCost = costs [ _edgePositions ( indptr, indices, rowToCol ) ].sum ()
+  return rowToCol, totalCost
+
+def denseToCSR ( costMatrix, forbiddenCost = None ):
+
+  '''
+  Build the CSR arrays for SparseAuctionAssignment () from a dense matrix in which
+  forbidden pairings hold forbiddenCost (e.g. the TSP.AssignmentProblem infinity).
+  With forbiddenCost None, only non-finite cells are forbidden.
+
+  Returns ( indptr, indices, costs ).
+  '''
+
+  if forbiddenCost is None:
+    allowed = numpy.isfinite ( costMatrix )
+  else:
+    allowed = costMatrix != forbiddenCost
+
+  rowIndices, colIndices = numpy.where ( allowed )
+  indptr = numpy.concatenate ( ( [0], numpy.cumsum ( allowed.sum ( axis = 1 ) ) ) )
+
+  return indptr, colIndices, costMatrix [ rowIndices, colIndices ]
+
+def _auctionPhase ( indptr, indices, benefits, prices, epsilon, costRange ):
+
+  '''
+  One epsilon-scaling phase: starting with every row unassigned, run bidding
+  rounds until all rows hold a col. prices is updated in place.
+  '''
+
+  n = len ( indptr ) - 1
+  rowToCol = numpy.array ( [-1] * n )
+  colToRow = numpy.array ( [-1] * n )
+
+  # With a feasible assignment no price can rise by more than this within a phase.
+  priceLimit = prices.max () + 2 * n * ( costRange + epsilon )
+
+  freeRows = numpy.arange ( n )
+
+  while len ( freeRows ) > 0:
+
+    edges, segmentStarts, segmentLengths = _edgesOfRows ( indptr, freeRows )
+    values = benefits [edges] - prices [ indices [edges] ]
+
+    bestValues = numpy.maximum.reduceat ( values, segmentStarts )
+
+    # First edge in each segment attaining the best value.
+    positions = numpy.arange ( len ( edges ) )
+    isBest = values == numpy.repeat ( bestValues, segmentLengths )
+    bestPositions = numpy.minimum.reduceat ( numpy.where ( isBest, positions, len ( edges ) ), segmentStarts )
+
+    # Second best value. A row with a single edge bids as if its alternative were
+    # worse by the whole cost range.
+    secondValues = numpy.where ( segmentLengths > 1, 0, bestValues - costRange - epsilon )
+    multiEdge = segmentLengths > 1
+    if multiEdge.any ():
+      values [bestPositions] = values.min () - costRange - epsilon
+      secondValues [multiEdge] = numpy.maximum.reduceat ( values, segmentStarts ) [multiEdge]
+
+    bidCols = indices [ edges [bestPositions] ]
+    bids = prices [bidCols] + bestValues - secondValues + epsilon
+
+    # Each col takes its highest bid: sort by (col, bid) and keep the last of each col.
+    order = numpy.lexsort ( ( bids, bidCols ) )
+    sortedCols = bidCols [order]
+    isLast = numpy.ones ( len ( order ), dtype = bool )
+    isLast [:-1] = sortedCols [:-1] != sortedCols [1:]
+    winners = order [isLast]
+
+    wonCols = bidCols [winners]
+    winningRows = freeRows [winners]
+    prices [wonCols] = bids [winners]
+
+    if prices [wonCols].max () > priceLimit:
+      raise ValueError ( "No feasible assignment exists using the allowed edges" )
+
+    outbidRows = colToRow [wonCols]
+    outbidRows = outbidRows [ outbidRows != -1 ]
+    rowToCol [outbidRows] = -1
+
+    colToRow [wonCols] = winningRows
+    rowToCol [winningRows] = wonCols
+
+    freeRows = numpy.where ( rowToCol == -1 )[0]
+
+  return rowToCol
+
+def _edgesOfRows ( indptr, rows ):
+
+  '''
+  Gather the CSR edge positions belonging to the given rows, in row order.
+  Returns ( edges, segmentStarts, segmentLengths ) where the edges of rows [k]
+  are edges [ segmentStarts[k] : segmentStarts[k] + segmentLengths[k] ].
+  '''
+
+  segmentLengths = indptr [rows + 1] - indptr [rows]
+  segmentStarts  = numpy.cumsum ( segmentLengths ) - segmentLengths
+  edges = numpy.arange ( segmentLengths.sum () ) + numpy.repeat ( indptr [rows] - segmentStarts, segmentLengths )
+  return edges, segmentStarts, segmentLengths
+
+def _edgePositions ( indptr, indices, rowToCol ):
+
+  '''
+  Locate the CSR position of edge ( i, rowToCol [i] ) for every row i.
+  '''
+
+  segmentLengths = numpy.diff ( indptr )
+  matches = indices == numpy.repeat ( rowToCol, segmentLengths )
+  return numpy.where ( matches )[0]
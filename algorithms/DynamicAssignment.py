@@ -0,0 +1,255 @@
+
+# DynamicAssignment.py
+# Change Log
+# 18/10/2026    - Initial development: incrementally repaired assignment
+
+import logging
+import numpy
+import algorithms.HungarianAssignment as HA
+
+class DynamicAssignment:
+
+  '''
+
+  A least cost assignment which is kept optimal while the problem changes one
+  row or column at a time, e.g. a dispatcher where a job (demand) arrives or a
+  driver (supply) goes offline. Re-solving with HungarianAssignment () would be
+  O(n^3) per change; here each change is repaired in O(n^2).
+
+  The matching and dual potentials from HA.shortestAugmentingPathAssignment ()
+  are kept. The problem is held as a square matrix. If there are fewer supply
+  than demand vertices (or the other way round), the spare slots are 'dummy'
+  vertices with zero cost to everything, and a real vertex matched to a dummy
+  counts as unassigned. Every change then comes down to resetting one row or
+  column: drop its matched edge, recompute its potential so that all reduced
+  costs are non-negative again, and run one shortest augmenting path search
+  (HA.reoptimiseAssignment ()).
+
+  Vertices are referred to by their labels, as the supply and demand lists of
+  HungarianAssignment (). The cost vector given to add_row () is in the order of
+  getDemandVertices () (and for add_col (), getSupplyVertices ()).
+
+  Example (not for doctest)
+
+  dispatch = DynamicAssignment ( drivers, jobs, costMatrix )
+  dispatch.add_col ( 'job17', costsFromEachDriver )
+  dispatch.remove_row ( 'driver3' )
+  dispatch.getAssignedPairs ()
+  >>> [ ('driver1', 'job17'), ... ]
+
+  '''
+
+  def __init__ (self, supplyVertexList, demandVertexList, costMatrix):
+
+    numRows, numCols = costMatrix.shape
+
+    if len ( supplyVertexList ) != numRows or len ( demandVertexList ) != numCols:
+      raise ValueError ( "Supply and demand lists do not match the cost matrix shape " + str ( costMatrix.shape ) )
+
+    size = max ( numRows, numCols )
+
+    # None marks a dummy slot.
+    self.rowLabels = list ( supplyVertexList ) + [None] * ( size - numRows )
+    self.colLabels = list ( demandVertexList ) + [None] * ( size - numCols )
+
+    self.costMatrix = numpy.zeros ( ( size, size ) )
+    self.costMatrix [:numRows, :numCols] = costMatrix
+
+    self.rowToCol, self.colToRow, self.rowPotentials, self.colPotentials = \
+      HA.shortestAugmentingPathAssignment ( self.costMatrix )
+
+  # Changes to the problem
+
+  def add_row (self, label, costs):
+
+    '''
+    Add a supply vertex with the given costs to the current demand vertices.
+    '''
+
+    self._checkNewLabel ( self.rowLabels, label )
+
+    if None in self.rowLabels:
+      rowSlot = self.rowLabels.index ( None )
+    else:
+      rowSlot, colSlot = self._addDummySlots ()
+
+    self.costMatrix [rowSlot, :] = 0
+    self.costMatrix [rowSlot, self._realSlots ( self.colLabels )] = costs
+    self.rowLabels [rowSlot] = label
+    self._resetRow ( rowSlot )
+
+  def add_col (self, label, costs):
+
+    '''
+    Add a demand vertex with the given costs from the current supply vertices.
+    '''
+
+    self._checkNewLabel ( self.colLabels, label )
+
+    if None in self.colLabels:
+      colSlot = self.colLabels.index ( None )
+    else:
+      rowSlot, colSlot = self._addDummySlots ()
+
+    self.costMatrix [:, colSlot] = 0
+    self.costMatrix [self._realSlots ( self.rowLabels ), colSlot] = costs
+    self.colLabels [colSlot] = label
+    self._resetCol ( colSlot )
+
+  def remove_row (self, label):
+
+    rowSlot = self._slot ( self.rowLabels, label )
+
+    if None in self.colLabels:
+      # More supply than demand: the matrix shrinks by the row and a dummy col.
+      self._removeSlots ( rowSlot, self.colLabels.index ( None ) )
+    else:
+      self.costMatrix [rowSlot, :] = 0
+      self.rowLabels [rowSlot] = None
+      self._resetRow ( rowSlot )
+
+  def remove_col (self, label):
+
+    colSlot = self._slot ( self.colLabels, label )
+
+    if None in self.rowLabels:
+      self._removeSlots ( self.rowLabels.index ( None ), colSlot )
+    else:
+      self.costMatrix [:, colSlot] = 0
+      self.colLabels [colSlot] = None
+      self._resetCol ( colSlot )
+
+  def update_cost (self, rowLabel, colLabel, cost):
+
+    rowSlot = self._slot ( self.rowLabels, rowLabel )
+    colSlot = self._slot ( self.colLabels, colLabel )
+
+    self.costMatrix [rowSlot, colSlot] = cost
+
+    # An unmatched edge that is still no cheaper than its potentials allow
+    # cannot change the optimum. Otherwise re-match the row.
+    reducedCost = cost - self.rowPotentials [rowSlot] - self.colPotentials [colSlot]
+    if self.rowToCol [rowSlot] == colSlot or reducedCost < 0:
+      self._resetRow ( rowSlot )
+
+  # Results
+
+  def getSupplyVertices (self):
+    return [ label for label in self.rowLabels if label is not None ]
+
+  def getDemandVertices (self):
+    return [ label for label in self.colLabels if label is not None ]
+
+  def getAssignedPairs (self):
+
+    '''
+    ( supplyVertex, demandVertex ) for every assigned pair, as HA.getAssignedPairs ().
+    '''
+
+    return [ ( self.rowLabels [row], self.colLabels [col] ) for row, col in enumerate ( self.rowToCol )
+             if self.rowLabels [row] is not None and self.colLabels [col] is not None ]
+
+  def getTotalCost (self):
+    rows = numpy.arange ( len ( self.rowToCol ) )
+    return self.costMatrix [rows, self.rowToCol].sum ()
+
+  # Repairs
+
+  def _resetRow (self, rowSlot):
+
+    '''
+    Un-match rowSlot, give it the largest potential which keeps its reduced costs
+    non-negative and re-match it with one augmentation.
+    '''
+
+    colSlot = self.rowToCol [rowSlot]
+    if colSlot != -1:
+      self.colToRow [colSlot] = -1
+      self.rowToCol [rowSlot] = -1
+
+    self.rowPotentials [rowSlot] = ( self.costMatrix [rowSlot] - self.colPotentials ).min ()
+    self._reoptimise ()
+
+  def _resetCol (self, colSlot):
+
+    rowSlot = self.colToRow [colSlot]
+    if rowSlot != -1:
+      self.rowToCol [rowSlot] = -1
+      self.colToRow [colSlot] = -1
+
+    self.colPotentials [colSlot] = ( self.costMatrix [:, colSlot] - self.rowPotentials ).min ()
+    self._reoptimise ()
+
+  def _reoptimise (self):
+    HA.reoptimiseAssignment ( self.costMatrix, self.rowToCol, self.colToRow,
+                              self.rowPotentials, self.colPotentials )
+
+  def _addDummySlots (self):
+
+    '''
+    Grow the matrix by one dummy row and one dummy col, and match them up
+    optimally. Returns the two new slots.
+    '''
+
+    size = len ( self.rowLabels )
+
+    grownMatrix = numpy.zeros ( ( size + 1, size + 1 ) )
+    grownMatrix [:size, :size] = self.costMatrix
+    self.costMatrix = grownMatrix
+
+    self.rowLabels.append ( None )
+    self.colLabels.append ( None )
+
+    self.rowToCol = numpy.append ( self.rowToCol, -1 )
+    self.colToRow = numpy.append ( self.colToRow, -1 )
+
+    # Largest potentials keeping the new zero cost edges' reduced costs non-negative.
+    newColPotential = -self.rowPotentials.max () if size > 0 else 0.0
+    self.colPotentials = numpy.append ( self.colPotentials, newColPotential )
+    self.rowPotentials = numpy.append ( self.rowPotentials, -self.colPotentials.max () )
+
+    self._reoptimise ()
+    return size, size
+
+  def _removeSlots (self, rowSlot, colSlot):
+
+    '''
+    Delete a row slot and a col slot. Their partners are left free and
+    re-matched with one augmentation.
+    '''
+
+    partnerCol = self.rowToCol [rowSlot]
+    partnerRow = self.colToRow [colSlot]
+
+    self.colToRow [partnerCol] = -1
+    self.rowToCol [partnerRow] = -1
+
+    self.costMatrix = numpy.delete ( numpy.delete ( self.costMatrix, rowSlot, axis = 0 ), colSlot, axis = 1 )
+    self.rowPotentials = numpy.delete ( self.rowPotentials, rowSlot )
+    self.colPotentials = numpy.delete ( self.colPotentials, colSlot )
+    del self.rowLabels [rowSlot]
+    del self.colLabels [colSlot]
+
+    rowToCol = numpy.delete ( self.rowToCol, rowSlot )
+    colToRow = numpy.delete ( self.colToRow, colSlot )
+
+    # Shift the indices past the deleted slots down by one.
+    rowToCol [ rowToCol > colSlot ] -= 1
+    colToRow [ colToRow > rowSlot ] -= 1
+
+    self.rowToCol, self.colToRow = rowToCol, colToRow
+
+    logging.debug ( "DynamicAssignment removed slots " + str ( ( rowSlot, colSlot ) ) )
+    self._reoptimise ()
+
+  def _realSlots (self, labels):
+    return [ slot for slot, label in enumerate ( labels ) if label is not None ]
+
+  def _slot (self, labels, label):
+    if label is None or label not in labels:
+      raise KeyError ( label )
+    return labels.index ( label )
+
+  def _checkNewLabel (self, labels, label):
+    if label is None or label in labels:
+      raise ValueError ( "Vertex label must be new and not None: " + str ( label ) )
@@ -0,0 +1,160 @@
+
+# HeldKarpBound.py
+# Change Log
+# 18/10/2026    - Initial development: 1-tree bound with subgradient penalties
+
+import logging
+import numpy
+
+def oneTreeBound ( costMatrix, forbiddenEdges = None, penalties = None, upperBound = None, iterations = 100 ):
+
+  '''
+
+  Held-Karp lower bound on the cost of a tour of a symmetric costMatrix, for the
+  branch and bound in TSP.TSP (). It is usually within 1% of the optimum on
+  Euclidean instances, where the assignment bound is 10-20% short.
+
+  A 1-tree is a minimum spanning tree on nodes 1..n-1 plus the two cheapest
+  edges at node 0; every tour is a 1-tree, so its cost is a lower bound. Adding
+  a penalty pi[i] to every edge at node i adds 2 * sum(pi) to every tour, but
+  changes which 1-tree is cheapest. The bound is the 1-tree cost less
+  2 * sum(pi), and the penalties are improved by subgradient steps: up at nodes
+  of degree > 2 in the tree, down at leaves, with step size
+  lam * ( upperBound - bound ) / |degrees - 2|^2. lam is halved whenever the
+  bound has not improved for a few iterations.
+
+  Parameters:
+  -----------
+
+  costMatrix     : symmetric 2D numpy.array. The diagonal is ignored.
+  forbiddenEdges : ( i, j ) pairs which may not be used (either way round).
+  penalties      : starting penalties, e.g. from the parent node in a branch and
+                   bound, which needs far fewer iterations than starting at 0.
+  upperBound     : cost of the best known tour. The search stops as soon as the
+                   bound reaches it (the node can be pruned). If None, 1% over
+                   the current bound is used as the step target.
+  iterations     : maximum number of subgradient steps.
+
+  Returns ( bound, penalties, oneTree ): the best bound found (numpy.inf if the
+  forbidden edges leave no tour), the penalties which gave it and the edges of
+  that 1-tree as an n x 2 array. If every node of the 1-tree has degree 2 it is
+  a tour, and an optimal one.
+
+  '''
+
+  numNodes = len ( costMatrix )
+  costs = numpy.array ( costMatrix, dtype = float )
+  numpy.fill_diagonal ( costs, numpy.inf )
+
+  if forbiddenEdges is not None:
+    for i, j in forbiddenEdges:
+      costs [i, j] = costs [j, i] = numpy.inf
+
+  if numNodes < 3:
+    return 0.0, numpy.zeros ( numNodes ), numpy.zeros ( ( 0, 2 ), dtype = int )
+
+  penalties = numpy.zeros ( numNodes ) if penalties is None else numpy.array ( penalties, dtype = float )
+  tolerance = 1e-9 * max ( 1.0, abs ( costs [ numpy.isfinite ( costs ) ] ).max () )
+
+  bestBound = -numpy.inf
+  bestPenalties = penalties.copy ()
+  bestTree = None
+  stepScale = 2.0
+  sinceImprovement = 0
+
+  for iteration in range ( iterations ):
+
+    treeCost, degrees, oneTree = _minimumOneTree ( costs + penalties [:, None] + penalties [None, :] )
+    if numpy.isinf ( treeCost ):
+      return numpy.inf, bestPenalties, oneTree
+
+    bound = treeCost - 2 * penalties.sum ()
+    if bound > bestBound + tolerance:
+      bestBound, bestPenalties, bestTree = bound, penalties.copy (), oneTree
+      sinceImprovement = 0
+    else:
+      sinceImprovement = sinceImprovement + 1
+
+    subgradient = degrees - 2
+    if upperBound is not None and bestBound >= upperBound - tolerance:
+      break
+    if not subgradient.any ():
+      # The 1-tree is a tour, so this bound is the optimum.
+      break
+
+    if sinceImprovement >= 5:
+      stepScale = stepScale / 2
+      sinceImprovement = 0
+      if stepScale < 1e-4:
+        break
+
+    target = upperBound if upperBound is not None else bound + 0.01 * abs ( bound ) + tolerance
+    penalties = penalties + stepScale * ( target - bound ) / ( subgradient ** 2 ).sum () * subgradient
+
+  logging.debug ( "1-tree bound " + str ( bestBound ) + " after " + str ( iteration + 1 ) + " iterations" )
+
+  # Allow for rounding, so that a node is never pruned by a bound a hair too high.
+  return bestBound - tolerance, bestPenalties, bestTree
+
+def _minimumOneTree ( costs ):
+
+  '''
+  Cost, node degrees and edges of the minimum 1-tree: Prim's algorithm (one
+  numpy row operation per node) on nodes 1..n-1, then the two cheapest edges at
+  node 0.
+  '''
+
+  numNodes = len ( costs )
+  treeCosts = costs [1:, 1:]
+
+  # Nodes not yet in the tree have their cheapest edge to it in distances.
+  outside = numpy.ones ( numNodes - 1, dtype = bool )
+  outside [0] = False
+  distances = treeCosts [0].copy ()
+  distances [0] = numpy.inf
+  nearestInTree = numpy.zeros ( numNodes - 1, dtype = int )
+  edges = numpy.zeros ( ( numNodes, 2 ), dtype = int )
+  totalCost = 0.0
+
+  for step in range ( numNodes - 2 ):
+    node = distances.argmin ()
+    totalCost += distances [node]
+    edges [step] = nearestInTree [node] + 1, node + 1
+    outside [node] = False
+    distances [node] = numpy.inf
+
+    closer = ( treeCosts [node] < distances ) & outside
+    distances [closer] = treeCosts [node] [closer]
+    nearestInTree [closer] = node
+
+  cheapest = numpy.argpartition ( costs [0, 1:], 1 ) [:2] + 1
+  totalCost += costs [0, cheapest].sum ()
+  edges [numNodes - 2:, 0] = 0
+  edges [numNodes - 2:, 1] = cheapest
+
+  degrees = numpy.bincount ( edges.ravel (), minlength = numNodes )
+
+  return totalCost, degrees, edges
+
+def oneTreeTour ( oneTree ):
+
+  '''
+  The tour made by the edges of oneTree (as returned by oneTreeBound ()), or
+  None if some node does not have degree 2.
+  '''
+
+  numNodes = len ( oneTree )
+  if numNodes < 3 or ( numpy.bincount ( oneTree.ravel (), minlength = numNodes ) != 2 ).any ():
+    return None
+
+  adjacent = [ [] for node in range ( numNodes ) ]
+  for i, j in oneTree:
+    adjacent [i].append ( int ( j ) )
+    adjacent [j].append ( int ( i ) )
+
+  tour = [ 0, adjacent [0] [0] ]
+  while len ( tour ) < numNodes:
+    a, b = adjacent [ tour [-1] ]
+    tour.append ( b if a == tour [-2] else a )
+
+  return tour
@@ -0,0 +1,116 @@
+
+# HeldKarpDP.py
+# Change Log
+# 18/10/2026    - Initial development: bitmask dynamic programming, one layer per subset size
+
+import logging
+import numpy
+
+def HeldKarpDP ( costMatrix ):
+
+  '''
+
+  Exact TSP by the Held-Karp dynamic programme, for small instances (up to
+  about 20 nodes). Unlike the branch and bound in TSP.TSP () its running time
+  does not depend on the costs: O(2^n n^2) time, always.
+
+  With node 0 as the start, best [S, j] is the cheapest path from 0 through
+  every node of the set S, ending at j in S:
+
+     best [S, j] = min over i in S - {j} of best [S - {j}, i] + costMatrix [i, j]
+
+  Sets are bitmasks over nodes 1..n-1, and the programme runs one layer per
+  set size, each layer a ( sets of that size ) x ( n - 1 ) array with one
+  numpy operation per end node j. Only the last layer of costs is kept; for
+  the tour itself each layer keeps the best previous node as int8, 2^(n-1) n
+  bytes in all. At n = 20 that is 10 MB, and peak memory about 50 MB.
+
+  Parameters:
+  -----------
+
+  costMatrix : square 2D numpy.array, symmetric or not (numpy.inf to forbid an
+               arc). The diagonal is ignored.
+
+  Returns ( tour, cost ), tour a list of nodes starting at 0 and cost summed
+  from costMatrix in its own dtype (numpy.inf if the forbidden arcs leave no
+  tour).
+
+  Example (not for doctest)
+
+  tour, cost = HeldKarpDP ( numpy.array ( [ [0, 1, 9], [9, 0, 1], [1, 9, 0] ] ) )
+  # tour == [0, 1, 2], cost == 3
+
+  '''
+
+  originalCosts = numpy.asarray ( costMatrix )
+  costMatrix = originalCosts.astype ( float )
+  numNodes = len ( costMatrix )
+
+  if numNodes <= 2:
+    cost = originalCosts [0, 1] + originalCosts [1, 0] if numNodes == 2 else 0.0
+    return range ( numNodes ), cost
+
+  numOthers = numNodes - 1
+  costs = costMatrix [1:, 1:].copy ()
+  numpy.fill_diagonal ( costs, numpy.inf )
+
+  # The sets of each size, in increasing order, and each set's index in its layer.
+  setSizes = _bitCounts ( numOthers )
+  layers = [ numpy.flatnonzero ( setSizes == size ) for size in range ( numOthers + 1 ) ]
+  indexInLayer = numpy.zeros ( 1 << numOthers, dtype = numpy.int32 )
+  for layer in layers:
+    indexInLayer [layer] = numpy.arange ( len ( layer ), dtype = numpy.int32 )
+
+  # Size 1: straight from node 0.
+  best = numpy.full ( ( numOthers, numOthers ), numpy.inf )
+  best [ numpy.arange ( numOthers ), numpy.arange ( numOthers ) ] = costMatrix [0, 1:]
+  previousNodes = [ None, None ]
+
+  for size in range ( 2, numOthers + 1 ):
+
+    sets = layers [size]
+    newBest = numpy.full ( ( len ( sets ), numOthers ), numpy.inf )
+    previous = numpy.zeros ( ( len ( sets ), numOthers ), dtype = numpy.int8 )
+
+    for end in range ( numOthers ):
+      rows = numpy.flatnonzero ( sets & ( 1 << end ) )
+      pathCosts = best [ indexInLayer [ sets [rows] ^ ( 1 << end ) ] ] + costs [:, end]
+      previous [rows, end] = pathCosts.argmin ( axis = 1 )
+      newBest [rows, end] = pathCosts [ numpy.arange ( len ( rows ) ), previous [rows, end] ]
+
+    best = newBest
+    previousNodes.append ( previous )
+
+  closingCosts = best [0] + costMatrix [1:, 0]
+  end = int ( closingCosts.argmin () )
+  totalCost = closingCosts [end]
+  if numpy.isinf ( totalCost ):
+    return range ( numNodes ), numpy.inf
+
+  # Walk back through the layers.
+  path = []
+  remaining = ( 1 << numOthers ) - 1
+  for size in range ( numOthers, 0, -1 ):
+    path.append ( end + 1 )
+    if size > 1:
+      nextEnd = int ( previousNodes [size] [ indexInLayer [remaining], end ] )
+      remaining = remaining ^ ( 1 << end )
+      end = nextEnd
+
+  # Summed again in the matrix's own dtype, so that integer costs stay exact.
+  tour = [0] + path [::-1]
+  totalCost = originalCosts [ tour, numpy.roll ( tour, -1 ) ].sum ()
+  logging.debug ( "Held-Karp DP on " + str ( numNodes ) + " nodes, cost " + str ( totalCost ) )
+
+  return tour, totalCost
+
+def _bitCounts ( numBits ):
+
+  '''
+  Number of bits set in each of 0 .. 2^numBits - 1, built up a bit at a time.
+  '''
+
+  counts = numpy.zeros ( 1, dtype = numpy.int8 )
+  for bit in range ( numBits ):
+    counts = numpy.concatenate ( ( counts, counts + 1 ) )
+  return counts
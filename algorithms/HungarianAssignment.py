@@ -2,11 +2,14 @@
 # HungarianAssignment.py
 # Change Log
 # 14/08/2012    - Initial development
+# 18/10/2026    - Added the shortest augmenting path (Jonker-Volgenant) engine
+#               - Added HungarianAssignmentBatch for stacks of small problems
 
 import logging
+import multiprocessing
 import numpy
 
-def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix):
+def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix, engine = 'labelling'):
 
   '''
 
@@ -25,6 +28,10 @@ def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix):
   -----------
 
   costMatrix :  2D numpy.array of costs in square matrix form (See example)
+                A rectangular (m x n) matrix is also accepted. Then only min(m,n) pairs
+                are assigned, and the 'jv' engine is always used since the labelling 
+                procedure needs a square matrix. See getAssignedPairs () for reading
+                the result back in terms of the supply and demand lists.
  
   supplyVertexList, demandvertexList 
                 These lists' elements correspond to the elements in the cost matrix  
@@ -32,6 +39,11 @@ def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix):
                 TODO: these parameters are not in fact required if a client applications 
                       accepts ordered indices (so remove them, or use them properly)
 
+  engine :      'labelling' (default) runs the Dolan/Aldous labelling procedure below.
+                'jv' runs the shortest augmenting path method with dual potentials 
+                (Jonker-Volgenant), which is O(n^3) and so handles n in the thousands.
+                See shortestAugmentingPathAssignment ().
+
   Result:
   Returns a solution as a boolean numpy 2D array  
 
@@ -65,6 +77,20 @@ def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix):
 
   '''
 
+  if len ( supplyVertexList ) != costMatrix.shape[0] or len ( demandVertexList ) != costMatrix.shape[1]:
+    raise ValueError ( "Supply and demand lists do not match the cost matrix shape " + str ( costMatrix.shape ) )
+
+  if engine == 'labelling' and costMatrix.shape[0] != costMatrix.shape[1]:
+    logging.debug ("Rectangular cost matrix: using the jv engine")
+    engine = 'jv'
+
+  if engine == 'jv':
+    rowToCol, colToRow, rowPotentials, colPotentials = shortestAugmentingPathAssignment ( costMatrix )
+    return rowAssignmentToBoolMatrix ( rowToCol, costMatrix.shape[1] )
+
+  if engine != 'labelling':
+    raise ValueError ( "Unknown assignment engine: " + str ( engine ) )
+
   logging.debug ("--- NEW PROB --- with cost matrix ")
   logging.debug ("\n" + str (costMatrix ))
  
@@ -74,12 +100,14 @@ def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix):
   matrixSize = len(costMatrix)
 
   # Create an empty 'result' graph. Once there is a True in every row (according to the rules of 
-  # the algorithm, we'll have a complete assignment. 
-  MATCHEDGraphBoolMatrix = numpy.array ( [False]*matrixSize*matrixSize   ).reshape( matrixSize, matrixSize) 
+  # the algorithm, we'll have a complete assignment. Each matching improvement adds exactly
+  # one edge to it, so the number of matched edges is counted rather than re-scanned. 
+  MATCHEDGraphBoolMatrix = numpy.zeros ( ( matrixSize, matrixSize ), dtype = bool ) 
+  numberMatched = 0
 
   i = 0
 
-  while (not _labellingIsComplete(MATCHEDGraphBoolMatrix) ):
+  while ( numberMatched < matrixSize ):
 
     i = i + 1
     logging.debug ("--TSP: Main Loop with iter: " + str (i) )
@@ -103,9 +131,9 @@ def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix):
       # edge from the original partial graph to the MATCHED graph. I.e. gradually move towards
       # the solution
 
-      partialGraphMat, MATCHEDGraphMat = HA_Step3_MatchingImprovement \
-                                        ( partialGraphMatrix, MATCHEDGraphBoolMatrix, supplyLabelsList, \
-                                          demandLabelsList, demandBreakthrough )
+      HA_Step3_MatchingImprovement ( partialGraphMatrix, MATCHEDGraphBoolMatrix, supplyLabelsList, \
+                                     demandLabelsList, demandBreakthrough )
+      numberMatched = numberMatched + 1
 
       logging.debug('...did matching improvement')
 
@@ -118,22 +146,365 @@ def HungarianAssignment (  supplyVertexList, demandVertexList , costMatrix):
       # been labelled. It is now necessary to adjust the costs in order to create
       # another edge in the partial graph.
 
-      originalCostMatrix = costMatrix.copy()
-    
-      lowestCostDelta = _findLowestEdgeCost (supplyLabelsList, demandLabelsList, costMatrix)
-      costMatrix = _reviseCostMatrix (lowestCostDelta, costMatrix, supplyLabelsList, demandLabelsList )
+      _reviseCostMatrixInPlace ( costMatrix, partialGraphMatrix, supplyLabelsList, demandLabelsList )
+
+  logging.debug ("__ All done with results:")
+  logState (partialGraphMatrix, MATCHEDGraphBoolMatrix, None, None )    
+  return MATCHEDGraphBoolMatrix 
 
-      # This procedure will have created at least one more zero in the cost matrix. Locate it and
-      # update the partial graph accordingly.  See function doc if its return value seems confusing.
+def shortestAugmentingPathAssignment ( costMatrix ):
 
-      matrixCellsToUpdate =  _findNewEdgesFromUpdatedCostMatrix ( originalCostMatrix, costMatrix )
-      partialGraphMatrix [ matrixCellsToUpdate ] = True
+  '''
+  The 'jv' engine of HungarianAssignment ().
 
-      costMatrix = originalCostMatrix.copy()
+  Rather than re-labelling the whole graph after every cost revision, this keeps 
+  a dual potential on every supply (row) and demand (col) vertex, such that 
 
-  logging.debug ("__ All done with results:")
-  logState (partialGraphMatrix, MATCHEDGraphBoolMatrix,supplyLabelsList, demandLabelsList )    
-  return MATCHEDGraphMat 
+     costMatrix [i,j] - rowPotentials [i] - colPotentials [j] >= 0 
+
+  holds for every edge, with equality on matched edges. Each free supply vertex
+  is then matched by one Dijkstra style search for the shortest augmenting path 
+  over these reduced costs, which is O(n^2) per vertex and O(n^3) overall.
+  See Jonker & Volgenant, "A shortest augmenting path algorithm for dense and
+  sparse linear assignment problems" (1987).
+
+  Returns:
+  ( rowToCol, colToRow, rowPotentials, colPotentials ) 
+
+  rowToCol [i] is the demand index assigned to supply i (and colToRow the reverse).
+  The potentials are returned so that a caller can re-optimise after a small 
+  change to the costs (see algorithms.TSP).
+
+  costMatrix may be rectangular (m x n). Every vertex on the smaller side is then
+  assigned, and the others are left at -1 in rowToCol / colToRow. The search 
+  always runs from the smaller side, so the cost is O(min(m,n)^2 * max(m,n)) 
+  and no padding to a square matrix is needed.
+  '''
+
+  numRows, numCols = costMatrix.shape
+
+  rowToCol = numpy.array ( [-1] * numRows )
+  colToRow = numpy.array ( [-1] * numCols )
+  rowPotentials = numpy.zeros ( numRows )
+  colPotentials = numpy.zeros ( numCols )
+
+  # The column reduction would give unassigned columns a non-zero potential, 
+  # which is only optimal when every column ends up assigned.
+  if numRows == numCols:
+    _initialColumnReduction ( costMatrix, rowToCol, colToRow, colPotentials )
+
+  return reoptimiseAssignment ( costMatrix, rowToCol, colToRow, rowPotentials, colPotentials )
+
+def reoptimiseAssignment ( costMatrix, rowToCol, colToRow, rowPotentials, colPotentials ):
+
+  '''
+  Complete a partial assignment, e.g. one previously returned by 
+  shortestAugmentingPathAssignment () from which some edges have been removed.
+
+  The potentials must still be feasible for costMatrix, i.e. 
+  costMatrix [i,j] - rowPotentials [i] - colPotentials [j] >= 0, with equality on 
+  the edges still matched. This is always true when costs have only been 
+  increased since the potentials were computed (as when the TSP forbids an arc),
+  so a single broken edge is repaired by one O(n^2) augmentation instead of a 
+  full O(n^3) solve.
+
+  The arrays are modified in place and returned in the same order as 
+  shortestAugmentingPathAssignment ().
+  '''
+
+  if costMatrix.shape[0] > costMatrix.shape[1]:
+    # Augment from the smaller side: a transposed view swaps supply and demand. 
+    reoptimiseAssignment ( costMatrix.T, colToRow, rowToCol, colPotentials, rowPotentials )
+    return rowToCol, colToRow, rowPotentials, colPotentials
+
+  for freeRow in numpy.where ( rowToCol == -1 )[0]:
+    _augmentFromFreeRow ( costMatrix, rowToCol, colToRow, rowPotentials, colPotentials, freeRow )
+
+  return rowToCol, colToRow, rowPotentials, colPotentials
+
+def _initialColumnReduction ( costMatrix, rowToCol, colToRow, colPotentials ):
+
+  '''
+  Jonker-Volgenant initialisation: give each demand vertex its column minimum as 
+  a potential and match it to the row holding that minimum, if that row is free.
+  With all row potentials at zero every reduced cost is then non-negative and 
+  every matched edge has zero reduced cost, as _augmentFromFreeRow () requires.
+  '''
+
+  colPotentials [:] = costMatrix.min ( axis = 0 )
+  minRows = costMatrix.argmin ( axis = 0 )
+
+  for colIndex in range ( len ( minRows ) ):
+    rowIndex = minRows [colIndex]
+    if rowToCol [rowIndex] == -1:
+      rowToCol [rowIndex] = colIndex
+      colToRow [colIndex] = rowIndex
+
+def _augmentFromFreeRow ( costMatrix, rowToCol, colToRow, rowPotentials, colPotentials, freeRow ):
+
+  '''
+  Find the shortest augmenting path (over reduced costs) from the unmatched 
+  supply vertex freeRow to any unmatched demand vertex, update the potentials 
+  so that the reduced costs stay non-negative and flip the path so freeRow 
+  becomes matched. All four arrays are modified in place. 
+
+  Rows are scanned one at a time but each scan is a single numpy operation on
+  a row of the cost matrix, so this is O(n^2) with O(n) python-level steps.
+
+  Raises ValueError if no augmenting path of finite cost exists (i.e. every 
+  remaining edge from the labelled vertices is numpy.inf).
+  '''
+
+  numCols = len ( colToRow )
+
+  shortestPathCosts = numpy.empty ( numCols )
+  shortestPathCosts.fill ( numpy.inf )
+  pathRows  = numpy.array ( [-1] * numCols )
+  scannedCols = numpy.zeros ( numCols, dtype = bool )
+
+  minDistance = 0.0
+  rowIndex = freeRow
+
+  while True:
+
+    reducedCosts = minDistance + costMatrix [rowIndex] - rowPotentials [rowIndex] - colPotentials
+    improved = ( reducedCosts < shortestPathCosts ) & ~scannedCols
+    shortestPathCosts [improved] = reducedCosts [improved]
+    pathRows [improved] = rowIndex
+
+    candidateCosts = numpy.where ( scannedCols, numpy.inf, shortestPathCosts )
+    colIndex = candidateCosts.argmin ()
+    minDistance = candidateCosts [colIndex]
+
+    if minDistance == numpy.inf:
+      raise ValueError ( "No feasible assignment exists for supply vertex " + str ( freeRow ) )
+
+    scannedCols [colIndex] = True
+
+    if colToRow [colIndex] == -1:
+      sinkCol = colIndex
+      break
+
+    rowIndex = colToRow [colIndex]
+
+  # Update the potentials. Every scanned col (other than the sink) is matched, 
+  # and its row moves by the same amount as the col, keeping that edge tight.
+
+  rowPotentials [freeRow] += minDistance
+
+  scannedMatchedCols = numpy.where ( scannedCols )[0]
+  scannedMatchedCols = scannedMatchedCols [ scannedMatchedCols != sinkCol ]
+  deltas = minDistance - shortestPathCosts [scannedMatchedCols]
+
+  rowPotentials [ colToRow [scannedMatchedCols] ] += deltas
+  colPotentials [scannedMatchedCols] -= deltas
+
+  # Flip the alternating path back from the sink to freeRow.
+
+  colIndex = sinkCol
+  while True:
+    rowIndex = pathRows [colIndex]
+    colToRow [colIndex] = rowIndex
+    previousCol = rowToCol [rowIndex]
+    rowToCol [rowIndex] = colIndex
+    colIndex = previousCol
+    if rowIndex == freeRow:
+      break
+
+def rowAssignmentToBoolMatrix ( rowToCol, numCols ):
+
+  '''
+  Convert [2,0,1] (i.e. row 0 assigned to col 2 etc) to the boolean matrix 
+  form used throughout this module.
+  '''
+
+  resultMatrix = numpy.zeros ( ( len ( rowToCol ), numCols ), dtype = bool )
+  assignedRows = numpy.where ( rowToCol != -1 )[0]
+  resultMatrix [ assignedRows, rowToCol [assignedRows] ] = True
+  return resultMatrix
+
+def HungarianAssignmentBatch ( costs3d, processes = None ):
+
+  '''
+  Solve k independent n x n assignment problems held in a (k, n, n) array. 
+
+  This is for many small problems (10-50 nodes), where one HungarianAssignment ()
+  call each would be dominated by per-call overhead. The shortest augmenting path
+  method of shortestAugmentingPathAssignment () is run on all k problems at once: 
+  the row/column reductions, each Dijkstra step and each path flip are numpy 
+  operations over the whole batch, so the python-level work is the same as for a 
+  single problem.
+
+  processes : if given, the batch is split into that many chunks which are solved 
+              in a multiprocessing.Pool.
+
+  Returns:
+  ( resultMatrices, totalCosts ) 
+  
+  resultMatrices is a (k, n, n) boolean array, each laid out as HungarianAssignment ()
+  returns, and totalCosts is the vector of k optimal costs.
+  '''
+
+  costs3d = numpy.asarray ( costs3d )
+
+  if costs3d.ndim != 3 or costs3d.shape[1] != costs3d.shape[2]:
+    raise ValueError ( "Expected a (k, n, n) array of cost matrices, got shape " + str ( costs3d.shape ) )
+
+  if processes is None or processes <= 1 or len ( costs3d ) <= 1:
+    resultMatrices = _solveBatch ( costs3d )
+  else:
+    chunks = numpy.array_split ( costs3d, min ( processes, len ( costs3d ) ) )
+    pool = multiprocessing.Pool ( processes )
+    try:
+      resultMatrices = numpy.concatenate ( pool.map ( _solveBatch, chunks ) )
+    finally:
+      pool.close ()
+      pool.join ()
+
+  totalCosts = ( costs3d * resultMatrices ).sum ( axis = 2 ).sum ( axis = 1 )
+  return resultMatrices, totalCosts
+
+def _solveBatch ( costs3d ):
+
+  '''
+  Batched version of shortestAugmentingPathAssignment () - see HungarianAssignmentBatch ().
+  Module level so that it can be handed to a multiprocessing.Pool.
+  '''
+
+  numProblems, n = costs3d.shape[0], costs3d.shape[1]
+  resultMatrices = numpy.zeros ( costs3d.shape, dtype = bool )
+
+  if numProblems == 0 or n == 0:
+    return resultMatrices
+
+  # Row then column reduction gives feasible starting potentials.
+  rowPotentials = costs3d.min ( axis = 2 ).astype ( float )
+  colPotentials = ( costs3d - rowPotentials [:, :, None] ).min ( axis = 1 )
+
+  if not ( numpy.isfinite ( rowPotentials ).all () and numpy.isfinite ( colPotentials ).all () ):
+    raise ValueError ( "A cost matrix in the batch has a row or column with no finite cost" )
+
+  rowToCol = -numpy.ones ( ( numProblems, n ), dtype = int )
+  colToRow = -numpy.ones ( ( numProblems, n ), dtype = int )
+  problems = numpy.arange ( numProblems )
+
+  # Every row starts free, so row freeRow is augmented in all k problems together.
+  for freeRow in range ( n ):
+
+    shortestPathCosts = numpy.empty ( ( numProblems, n ) )
+    shortestPathCosts.fill ( numpy.inf )
+    pathRows    = -numpy.ones ( ( numProblems, n ), dtype = int )
+    scannedCols = numpy.zeros ( ( numProblems, n ), dtype = bool )
+    minDistances = numpy.zeros ( numProblems )
+    currentRows  = numpy.array ( [freeRow] * numProblems )
+    sinkCols     = -numpy.ones ( numProblems, dtype = int )
+
+    active = problems
+
+    while len ( active ) > 0:
+
+      rows = currentRows [active]
+      reducedCosts = minDistances [active, None] + costs3d [active, rows, :] \
+                     - rowPotentials [active, rows][:, None] - colPotentials [active]
+
+      activeShortest = shortestPathCosts [active]
+      activePaths    = pathRows [active]
+      improved = ( reducedCosts < activeShortest ) & ~scannedCols [active]
+      activeShortest [improved] = reducedCosts [improved]
+      activePaths [improved] = numpy.repeat ( rows, n ).reshape ( len ( active ), n ) [improved]
+      shortestPathCosts [active] = activeShortest
+      pathRows [active] = activePaths
+
+      candidateCosts = numpy.where ( scannedCols [active], numpy.inf, activeShortest )
+      cols = candidateCosts.argmin ( axis = 1 )
+      distances = candidateCosts [ numpy.arange ( len ( active ) ), cols ]
+
+      if not numpy.isfinite ( distances ).all ():
+        raise ValueError ( "No feasible assignment exists for a cost matrix in the batch" )
+
+      minDistances [active] = distances
+      scannedCols [active, cols] = True
+
+      nextRows = colToRow [active, cols]
+      finished = nextRows == -1
+      sinkCols [ active [finished] ] = cols [finished]
+      currentRows [ active [~finished] ] = nextRows [~finished]
+      active = active [~finished]
+
+    # Potential updates, as in _augmentFromFreeRow (). The sink has a zero delta.
+    rowPotentials [:, freeRow] += minDistances
+    deltas = numpy.where ( scannedCols, minDistances [:, None] - shortestPathCosts, 0.0 )
+    matchedProblems, matchedCols = numpy.where ( scannedCols & ( colToRow != -1 ) )
+    rowPotentials [ matchedProblems, colToRow [matchedProblems, matchedCols] ] += deltas [matchedProblems, matchedCols]
+    colPotentials -= deltas
+
+    # Flip each alternating path back to freeRow.
+    cols = sinkCols
+    active = problems
+    while len ( active ) > 0:
+      rows = pathRows [active, cols]
+      colToRow [active, cols] = rows
+      previousCols = rowToCol [active, rows]
+      rowToCol [active, rows] = cols
+      notDone = rows != freeRow
+      active = active [notDone]
+      cols = previousCols [notDone]
+
+  resultMatrices [ problems [:, None], numpy.arange ( n ) [None, :], rowToCol ] = True
+  return resultMatrices
+
+def getAssignedPairs ( supplyVertexList, demandVertexList, resultMatrix ):
+
+  '''
+  Translate a boolean result matrix from HungarianAssignment () into a list of 
+  ( supplyVertex, demandVertex ) tuples, using the caller's vertex labels. 
+  Supply or demand vertices which do not appear were left unassigned (which 
+  only happens with a rectangular cost matrix).
+
+  e.g. supply ['a','b'] , demand ['x','y','z'] -> [('a','z'), ('b','x')]
+  '''
+
+  rowIndices, colIndices = numpy.where ( resultMatrix )
+  return [ ( supplyVertexList [i], demandVertexList [j] ) for i, j in zip ( rowIndices, colIndices ) ]
+
+def _reviseCostMatrixInPlace ( costMatrix, partialGraphMatrix, supplyNodeLabels, demandNodeLabels ):
+
+  '''
+  The cost revision used by HungarianAssignment (): as _findLowestEdgeCost () followed
+  by _reviseCostMatrix (), but working on the reduced cost matrix in place through 
+  row and column index lists, and keeping the partial graph in step with it. 
+
+  d, the lowest cost from a labelled supply vertex to an unlabelled demand vertex, is 
+  subtracted from every such edge and added to every edge from an unlabelled supply
+  vertex to a labelled demand vertex. The first creates at least one new zero, i.e. 
+  partial graph edge. The second removes any partial graph edges in that block, which
+  keeps the partial graph equal to the zero cost edges outside MATCHED. (Edges in
+  MATCHED are never in either block, so they keep a zero cost.)
+
+  No copy of the whole matrix is made, and the matrix keeps its dtype. 
+  Returns d.
+  '''
+
+  logging.debug ( "*** _reviseCostMatrixInPlace ***")
+
+  supplyIsLabelled = numpy.array ( [ label != -1 for label in supplyNodeLabels ], dtype = bool )
+  demandIsLabelled = numpy.array ( [ label != -1 for label in demandNodeLabels ], dtype = bool )
+
+  labelledToUnlabelled = numpy.ix_ ( numpy.where ( supplyIsLabelled )[0], numpy.where ( ~demandIsLabelled )[0] )
+  unlabelledToLabelled = numpy.ix_ ( numpy.where ( ~supplyIsLabelled )[0], numpy.where ( demandIsLabelled )[0] )
+
+  lowestCostFound = costMatrix [labelledToUnlabelled].min ()
+
+  if lowestCostFound == numpy.inf:
+    raise ValueError ( "No feasible assignment exists: labelled supply vertices have no finite edges left" )
+
+  costMatrix [labelledToUnlabelled] -= lowestCostFound
+  costMatrix [unlabelledToLabelled] += lowestCostFound
+
+  partialGraphMatrix [labelledToUnlabelled] |= costMatrix [labelledToUnlabelled] == 0
+  partialGraphMatrix [unlabelledToLabelled] = False
+
+  return lowestCostFound
 
 def _findNewEdgesFromUpdatedCostMatrix ( oldCostMatrix, newCostMatrix ):
 
@@ -168,20 +539,12 @@ def _initialLabellingOfSupplyNodes (MATCHEDGraphBoolMatrix, supplyLabelsList  ):
   Helper routine to label with a '*' any supply node that does not access the 
   demand nodes via the MATCH graph.
   ''' 
-  numNodes = len ( MATCHEDGraphBoolMatrix )
 
   # Label each supply Label node with a '*' if it is NOT incident with 
   # any edge in MATCHED
 
-  for i in range ( numNodes  ):
-
-    # .where returns here returns a tuple. Each element in it is a list of matching
-    # indices. E.g. array ([0,0,0], array([0,1,2]) i.e. a match in row one / cols 0,1,2
-
-    matchedIndices = numpy.where ( MATCHEDGraphBoolMatrix [i:i+1, :] == False ) [0] #[0]row index
-
-    if len ( matchedIndices ) == numNodes  :
-      supplyLabelsList [i] = '*'
+  for i in numpy.where ( ~MATCHEDGraphBoolMatrix.any ( axis = 1 ) )[0]:
+    supplyLabelsList [i] = '*'
 
   return supplyLabelsList
 
@@ -224,14 +587,16 @@ def HA_Step1_ConstructInitialPartialGraph ( costMatrix ):
     
   supplyListCosts = costMatrix.min (axis=1) 
 
-  # Use numpy broadcasting to reduce every row's elemennt by it's row's cost
-  costMatrix = ( costMatrix.transpose() - supplyListCosts ).transpose()
+  # Use numpy broadcasting to reduce every row's elemennt by it's row's cost. 
+  # This is the one working copy of the matrix; the caller's matrix is untouched
+  # and its dtype (e.g. float32 or int32) is kept.
+  costMatrix = costMatrix - supplyListCosts [:, None]
 
   # Transfer column costs 
   demandListCosts = costMatrix.min (axis=0) 
 
   # Reduce every cols's elemennt by it's cols's cost
-  costMatrix = costMatrix - demandListCosts
+  costMatrix -= demandListCosts
 
   # represent a partial graph where each edge is represented as a TRUE
   partialGraphMatrix = costMatrix == 0
@@ -242,32 +607,24 @@ def HA_Step1_ConstructInitialPartialGraph ( costMatrix ):
 def findFirstBreakThroughIndex ( demandLabelsList, MATCHEDGraphBoolMatrix ):
 
   '''
-  Helper function called by : HA_Step2_LabellingProcedure ()
+  Helper function for the labelling procedure (see HA_Step2_LabellingProcedure ())
 
   The labelling process (part of finding the maximum matching) is complete when:
   - A DEMAND vertex whose demand has NOT been satisfied is labelled (a breakthrough)
     (here is meant that the vertex is not connected by the set of MATCH edges, so 
     an improvement is possible)
 
-  returns True or False
+  returns the lowest such demand index, or None
    
   ''' 
-  numNodes = len ( MATCHEDGraphBoolMatrix )
-
-  labelledDemandIndices =  numpy.where ( numpy.array ( demandLabelsList ) <> -1 )[0]
 
-  # If no labels then no breakthrough, obviously.
-  if len ( labelledDemandIndices) == 0 : return None
+  # Labelled cols entirely unconnected via the MATCHED graph are breakthroughs.
+  breakThroughs = ( numpy.array ( demandLabelsList ) != -1 ) & ~MATCHEDGraphBoolMatrix.any ( axis = 0 )
+  breakThroughIndices = numpy.where ( breakThroughs )[0]
 
-  # Now check those cols with labels. 
-  # If any of these are entirely unconnected via MATCHED graph, there is a breakthrough.
-   
-  for colIndex in labelledDemandIndices:
-    colEdges = MATCHEDGraphBoolMatrix [ :,colIndex:colIndex + 1 ].transpose ().tolist()[0]
-    if  colEdges ==  ( [False] * numNodes ):
-        return colIndex   
-  # No Breakthrough
-  return None
+  if len ( breakThroughIndices ) == 0: 
+    return None
+  return breakThroughIndices [0]
 
 def HA_Step2_LabellingProcedure ( partialGraphBoolMatrix, MATCHEDGraphBoolMatrix ):
 
@@ -277,8 +634,11 @@ def HA_Step2_LabellingProcedure ( partialGraphBoolMatrix, MATCHEDGraphBoolMatrix
   between supply- and demand-nodes.
   See 318 of  "Networks and Algorithms" by Dolan and Aldous
 
-  TODO This is one step where graph representation by matrix CAN work but may be 
-  improved by a memory data structure, e.g. based on sets or dict  
+  The labelling is done a whole frontier at a time rather than node by node: 
+  the newly labelled supply nodes label every demand node they reach in the 
+  partial graph in one boolean operation, and those demand nodes label their 
+  MATCHED supply nodes (at most one each) by a lookup in a "matched row of 
+  each column" vector. So each pass is a few numpy operations per frontier.
 
   Params: 
 
@@ -290,121 +650,68 @@ def HA_Step2_LabellingProcedure ( partialGraphBoolMatrix, MATCHEDGraphBoolMatrix
                            as MATCHED in the algorithm 
 
   Returns
+  breakThrough The lowest labelled demand node not covered by MATCHED, or None
   rowLabels    The main outupt which allows a minimum matching to take place in step 3
   colLabels    As above 
 
   ( the two graphs are not modified by this labelling procedure)    
 
-  TODO - break up into 2 or 3 functions for better testing.
   ''' 
 
   numNodes = len ( partialGraphBoolMatrix)
 
-  #  We numbers to be valid indices so 0 cannot be used to mean 'empty'
-
-  supplyLabelsList = [ -1 ] *  numNodes
-  demandLabelsList = [ -1 ] *  numNodes
-
-  # these are two queues of nodes just labelled, (As compared with the labels themselves, above)
-  # Below the Qs are built up and processed. Once exhausted the func. is complete
-  newSupplyLabelsQ = []
-  newDemandLabelsQ = []
-
-  # Label each supply Label node with a '*' if it is NOT incident with 
-  # any edge in MATCHED
-
-  supplyLabelsList = _initialLabellingOfSupplyNodes (MATCHEDGraphBoolMatrix, supplyLabelsList )
-
-  # Debug 
-  logging.debug ("Supply labels list: " + str ( supplyLabelsList) )
+  # Internally a supply label of -2 stands for '*' so the labels can live in int arrays.
+  supplyLabels = numpy.array ( [ -1 ] * numNodes )
+  demandLabels = numpy.array ( [ -1 ] * numNodes )
 
-  # Put the same values into a processing Q. 
-  for i in range ( len ( supplyLabelsList) ):
-    if supplyLabelsList [i] == '*' : 
-      newSupplyLabelsQ.append (i)  
-
-  # Debug 
-  logging.debug ("Supply labels list Q: " + str ( newSupplyLabelsQ))
-  logging.debug ("Demand labels list Q: " + str ( newDemandLabelsQ))
-
-  # Now continue labelling supply and demand nodes until a break-
-  # through is identified.
-
-  # JS modification of 24/08/2012 (See log at top of file)
-  numberOfOuterLoops = 0
-  
-  alreadyLabelledSupply_List = []
-  alreadyLabelledDemand_List = []
+  rowIsMatched = MATCHEDGraphBoolMatrix.any ( axis = 1 )
+  colIsMatched = MATCHEDGraphBoolMatrix.any ( axis = 0 )
+  matchedRowOfCol = MATCHEDGraphBoolMatrix.argmax ( axis = 0 )
 
-  # JS 
+  # Label each supply node with a '*' if it is NOT incident with any edge in MATCHED
+  supplyFrontier = numpy.where ( ~rowIsMatched )[0]
+  supplyLabels [supplyFrontier] = -2
 
-  while ( (len(newSupplyLabelsQ) > 0) or
-          (len(newDemandLabelsQ) > 0)  ):
+  supplyIsLabelled = ~rowIsMatched
+  demandIsLabelled = numpy.zeros ( numNodes, dtype = bool )
 
-#    numberOfOuterLoops = numberOfOuterLoops + 1
+  breakThrough = None
 
-    logging.debug ( numberOfOuterLoops)
+  while len ( supplyFrontier ) > 0:
 
+    logging.debug ( "...Supply frontier: " + str ( supplyFrontier ) )
 
-#    if (numberOfOuterLoops >= numNodes * numNodes): 
-#      logging.debug ( "All possible labelling complete" )
-#      return -1, supplyLabelsList, demandLabelsList
+    # Demand nodes reached from the frontier via the partial graph (NB: NOT the MATCH graph)
+    reached = partialGraphBoolMatrix [supplyFrontier] & ~demandIsLabelled
+    newDemandNodes = numpy.where ( reached.any ( axis = 0 ) )[0]
 
-    logging.debug ( "...Supply labels list Q: " + str ( newSupplyLabelsQ)  + " ... "  + str ( supplyLabelsList)  )
-    logging.debug ( "...Demand labels list Q: " + str ( newDemandLabelsQ)  + " ... "  + str ( demandLabelsList)  )
-
-    # Process all newly labelled supply nodes
-
-    while (  len (newSupplyLabelsQ) > 0 ):
-  
-      k = newSupplyLabelsQ.pop ()
-
-      # Label up all nodes in the set of demand nodes 
-      # which are linked via the partial graph (but NB: NOT the MATCH graph)
-      
-      foundDemandNodes = numpy.where ( partialGraphBoolMatrix [k:k+1, :] == True ) [1]
-       # ... [1]col index. 
-
-      logging.debug ( "....Found demand nodes: "+ str ( foundDemandNodes) )
-
-      for thisColIndex in foundDemandNodes:
-
-        if not thisColIndex in alreadyLabelledDemand_List:
-
-          alreadyLabelledDemand_List.append (thisColIndex) 
-          demandLabelsList [thisColIndex] = k   # This will be used in Matching Improvement func.
-          newDemandLabelsQ.append(thisColIndex) # We'll be popping this off in a few lines!
-
-    # Process all new demand nodes
-
-    while (  len (newDemandLabelsQ) > 0 ):
-
-      k = newDemandLabelsQ.pop () 
-
-      # Label up all nodes in the set of supply nodes 
-      # which are linked via the partial graph (but NB: NOT the MATCH graph)
-      
-      foundSupplyNodes = numpy.where ( MATCHEDGraphBoolMatrix [ : , k:k+1] == True ) [0]
-      # ... [0]row index
-  
-      for thisRowIndex in foundSupplyNodes:
-        if not thisRowIndex in alreadyLabelledSupply_List:
+    if len ( newDemandNodes ) == 0:
+      break
 
-          supplyLabelsList [thisRowIndex] = k # This will be used in Matching Improvement func.
-          newSupplyLabelsQ.append (thisRowIndex) # We'll be popping this off in a few lines!
-          alreadyLabelledSupply_List.append ( thisRowIndex )
+    # Each is labelled with the first frontier supply node reaching it. 
+    demandLabels [newDemandNodes] = supplyFrontier [ reached [:, newDemandNodes].argmax ( axis = 0 ) ]
+    demandIsLabelled [newDemandNodes] = True
 
     # Is there an opportunity to create an alternating path without looping further?
-    # If so, we can do the matching improvement now, and try for a "maximum matching" result.
+    unmatchedDemandNodes = newDemandNodes [ ~colIsMatched [newDemandNodes] ]
+    if len ( unmatchedDemandNodes ) > 0:
+      breakThrough = int ( unmatchedDemandNodes [0] )
+      break
 
-    breakThrough = findFirstBreakThroughIndex ( demandLabelsList, MATCHEDGraphBoolMatrix )
+    # Every new demand node is matched: label its MATCHED supply node.
+    nextSupplyNodes = matchedRowOfCol [newDemandNodes]
+    isNew = ~supplyIsLabelled [nextSupplyNodes]
+    supplyFrontier = nextSupplyNodes [isNew]
+    supplyLabels [supplyFrontier] = newDemandNodes [isNew]
+    supplyIsLabelled [supplyFrontier] = True
 
-    if breakThrough <> None:
-      return breakThrough, supplyLabelsList, demandLabelsList
+  supplyLabelsList = [ '*' if label == -2 else int ( label ) for label in supplyLabels ]
+  demandLabelsList = [ int ( label ) for label in demandLabels ]
 
-  # TODO Should we  really get here?
+  logging.debug ( "...Supply labels: " + str ( supplyLabelsList ) )
+  logging.debug ( "...Demand labels: " + str ( demandLabelsList ) )
 
-  return None, supplyLabelsList, demandLabelsList
+  return breakThrough, supplyLabelsList, demandLabelsList
 
 
 def HA_Step3_MatchingImprovement ( partialGraphBoolMatrix, MATCHEDGraphBoolMatrix, supplyLabels, demandLabels, demandBreakthrough ):
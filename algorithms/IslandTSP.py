@@ -0,0 +1,196 @@
+
+# IslandTSP.py
+# Change Log
+# 18/10/2026    - Initial development: parallel island multi-start
+
+import logging
+import multiprocessing
+import multiprocessing.sharedctypes
+import time
+import numpy
+import algorithms.LinKernighan as LK
+import algorithms.TourConstruction as TC
+
+def IslandTSP ( costMatrix, timeLimit = 10.0, processes = None, migrations = 4, seed = 0 ):
+
+  '''
+
+  Multi-start TSP heuristic using every core. One 'island' per process runs
+  IteratedLinKernighan () from its own start tour: island 0 from the greedy edge
+  tour, the others from randomised nearest neighbour tours.
+
+  The run is split into migrations + 1 equal epochs. Between epochs each
+  island is sent the best tour of the island before it (a ring), and breeds it
+  with its own by edge recombination crossover: the child is built mostly from
+  edges the two parents share or either has. The child is improved with LK and
+  replaces the island's tour if better. So good edges spread between islands
+  while the islands stay different.
+
+  The whole run, including start up, is kept within timeLimit seconds (wall
+  clock). The cost matrix is put in shared memory once and inherited by the
+  worker processes, rather than pickled to them with every task; only tours are
+  passed back and forth.
+
+  Parameters:
+  -----------
+
+  costMatrix : as TSP.TSP (), symmetric or not.
+  processes  : number of islands/processes, default multiprocessing.cpu_count ().
+               With 1 the island runs in this process.
+  seed       : for repeatable randomisation (the result still depends on timing).
+
+  Returns ( tour, cost ), the best tour found.
+
+  '''
+
+  costMatrix = numpy.asarray ( costMatrix, dtype = float )
+  numNodes = len ( costMatrix )
+  startTime = time.time ()
+
+  if numNodes <= 7:
+    return LK.LinKernighan ( costMatrix )
+
+  if processes is None:
+    processes = multiprocessing.cpu_count ()
+  numIslands = max ( 1, processes )
+
+  sharedCosts = multiprocessing.sharedctypes.RawArray ( 'd', numNodes * numNodes )
+  numpy.frombuffer ( sharedCosts ).reshape ( numNodes, numNodes ) [:] = costMatrix
+
+  if numIslands == 1:
+    _initIsland ( sharedCosts, numNodes )
+    pool = None
+    mapper = map
+  else:
+    pool = multiprocessing.Pool ( numIslands, _initIsland, ( sharedCosts, numNodes ) )
+    mapper = pool.map
+
+  islandTours = [None] * numIslands
+  migrants = [None] * numIslands
+  epochTime = timeLimit / float ( migrations + 1 )
+
+  try:
+    for epoch in range ( migrations + 1 ):
+
+      epochDeadline = startTime + ( epoch + 1 ) * epochTime
+      tasks = [ ( island, islandTours [island], migrants [island], seed * 1000003 + epoch * numIslands + island, epochDeadline )
+                for island in range ( numIslands ) ]
+
+      results = mapper ( _runIsland, tasks )
+
+      islandTours = [ result [0] for result in results ]
+      islandCosts = [ result [1] for result in results ]
+
+      # Ring migration: island i gets island i-1's best tour.
+      if numIslands > 1:
+        migrants = [ islandTours [ island - 1 ] for island in range ( numIslands ) ]
+
+      logging.debug ( "Island epoch " + str ( epoch ) + " costs " + str ( islandCosts ) )
+
+  finally:
+    if pool is not None:
+      pool.close ()
+      pool.join ()
+
+  best = numpy.argmin ( islandCosts )
+  return islandTours [best], islandCosts [best]
+
+def edgeRecombination ( parentA, parentB, costMatrix, randomState ):
+
+  '''
+  Edge recombination crossover of two tours. Starting from a random node, the
+  child always moves to a node adjacent (in either parent) to the current one,
+  choosing the one with fewest unused adjacencies left, a node adjacent in both
+  parents first. When none is left it moves to the cheapest unvisited node.
+  '''
+
+  numNodes = len ( parentA )
+
+  adjacency = [ dict () for node in range ( numNodes ) ]
+  for parent in ( parentA, parentB ):
+    for i in range ( numNodes ):
+      a, b = parent [i], parent [ ( i + 1 ) % numNodes ]
+      adjacency [a] [b] = adjacency [a].get ( b, 0 ) + 1
+      adjacency [b] [a] = adjacency [b].get ( a, 0 ) + 1
+
+  visited = numpy.zeros ( numNodes, dtype = bool )
+  current = parentA [ randomState.randint ( numNodes ) ]
+  child = [current]
+  visited [current] = True
+
+  while len ( child ) < numNodes:
+
+    for node in adjacency [current]:
+      del adjacency [node] [current]
+
+    options = adjacency [current]
+    if len ( options ) > 0:
+      # Shared edges first, then fewest remaining adjacencies, ties at random.
+      current = min ( options, key = lambda node : ( -options [node], len ( adjacency [node] ), randomState.rand () ) )
+    else:
+      # From the unvisited nodes themselves, as all of them may be at inf.
+      unvisited = numpy.flatnonzero ( ~ visited )
+      current = unvisited [ costMatrix [current, unvisited].argmin () ]
+
+    child.append ( int ( current ) )
+    visited [current] = True
+
+  return child
+
+def _randomisedNearestNeighbourTour ( costMatrix, randomState, choices = 3 ):
+
+  '''
+  Nearest neighbour tour from a random node, moving each time to one of the
+  choices cheapest unvisited nodes at random.
+  '''
+
+  numNodes = len ( costMatrix )
+  visited = numpy.zeros ( numNodes, dtype = bool )
+
+  tour = [ randomState.randint ( numNodes ) ]
+  visited [ tour [0] ] = True
+
+  for step in range ( numNodes - 1 ):
+    unvisited = numpy.flatnonzero ( ~ visited )
+    numChoices = min ( choices, len ( unvisited ) )
+    nearest = unvisited [ numpy.argpartition ( costMatrix [ tour [-1], unvisited ], numChoices - 1 ) [:numChoices] ]
+    nextNode = nearest [ randomState.randint ( numChoices ) ]
+    tour.append ( int ( nextNode ) )
+    visited [nextNode] = True
+
+  return tour
+
+# Worker side. The cost matrix is set once per process by _initIsland ().
+
+_islandCosts = None
+
+def _initIsland ( sharedCosts, numNodes ):
+  global _islandCosts
+  _islandCosts = numpy.frombuffer ( sharedCosts ).reshape ( numNodes, numNodes )
+
+def _runIsland ( task ):
+
+  '''
+  One epoch of one island: build its tour if it has none, else breed it with
+  the migrant, then run iterated LK until the deadline. Module level so that it
+  can be handed to a multiprocessing.Pool.
+  '''
+
+  island, tour, migrant, seed, deadline = task
+  costMatrix = _islandCosts
+  randomState = numpy.random.RandomState ( seed )
+
+  if tour is None:
+    if island == 0:
+      tour = TC.construct_tour ( costMatrix, 'greedyEdge' ) [0]
+    else:
+      tour = _randomisedNearestNeighbourTour ( costMatrix, randomState )
+
+  elif migrant is not None:
+    child = edgeRecombination ( tour, migrant, costMatrix, randomState )
+    child, childCost = LK.LinKernighan ( costMatrix, child, timeLimit = max ( 0, deadline - time.time () ) )
+    if childCost < TC.tourCost ( costMatrix, tour ):
+      tour = child
+
+  return LK.IteratedLinKernighan ( costMatrix, tour, timeLimit = max ( 0, deadline - time.time () ),
+                                   randomState = randomState )
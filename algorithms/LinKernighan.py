@@ -0,0 +1,493 @@
+
+# LinKernighan.py
+# Change Log
+# 18/10/2026    - Initial development: Lin-Kernighan k-opt improvement
+# 18/10/2026    - Iterated LK with double bridge kicks
+
+import collections
+import logging
+import time
+import numpy
+import algorithms.LocalSearch as LS
+import algorithms.TourConstruction as TC
+
+def LinKernighan ( costMatrix, tour = None, neighbourCount = 8, maxDepth = 30, breadth = ( 5, 3 ), timeLimit = None ):
+
+  '''
+
+  Lin-Kernighan improvement of a TSP tour, on the same cost matrix as TSP.TSP ().
+  Gives much better tours than LocalSearch.improve_tour () for a little more time,
+  and is the heuristic to use on 1k+ node instances.
+
+  Each improving move is a variable depth k-opt move built as a chain of
+  simple steps, as in Johnson and McGeoch's LK:
+
+  - Remove an edge ( t1, t2 ) of the tour. The tour is now a path with t2 at
+    the free end.
+  - Add an edge from the free end to one of its neighbourCount nearest nodes and
+    remove an edge so that the result is a path again, with a new free end. This
+    is either a 2-opt step (a flip of the tour array) or a sequential 3-opt step
+    which moves a segment without reversing it. Closing the path back to t1
+    always gives a tour.
+  - Keep going while the gain so far (removed minus added edge costs) is
+    positive, to at most maxDepth steps. An edge added in the chain is never
+    removed, nor a removed edge added.
+  - Keep the steps up to the best closed tour seen, if it is an improvement.
+
+  The first levels of the chain try several steps (breadth [i] at level i, best
+  first), deeper levels only the best. Nodes are taken from a queue with
+  don't-look bits as in LocalSearch.improve_tour ().
+
+  Asymmetric matrices are solved as the equivalent symmetric problem on 2n nodes
+  (Jonker and Volgenant): each city i is an in-node i and an out-node n+i, joined
+  by an edge which is always kept in the tour, and the out-node of i is joined
+  to the in-node of j at cost costMatrix [i,j]. The 2n x 2n matrix is not built.
+  Only the 3-opt steps keep the in/out edges, so they do all the work there.
+
+  The tour is a numpy array; a flip reverses whichever side of the tour is
+  shorter, and a 3-opt step rotates the shortest pair of segments.
+
+  Returns ( tour, cost ). The starting tour is a greedy edge tour
+  (TourConstruction) if not given. timeLimit, in seconds, stops the search early.
+
+  '''
+
+  costMatrix = numpy.asarray ( costMatrix, dtype = float )
+  numNodes = len ( costMatrix )
+
+  if tour is None:
+    tour, cost = TC.construct_tour ( costMatrix, 'greedyEdge' )
+  tour = [ int ( node ) for node in tour ]
+
+  if numNodes <= 4:
+    return tour, TC.tourCost ( costMatrix, tour )
+
+  search = _makeSearch ( costMatrix, tour, neighbourCount )
+
+  deadline = None if timeLimit is None else time.time () + timeLimit
+  search.improve ( maxDepth, breadth, deadline )
+
+  tour = search.costs.fromSymmetricTour ( search.tour )
+  return tour, TC.tourCost ( costMatrix, tour )
+
+def IteratedLinKernighan ( costMatrix, tour = None, timeLimit = 1.0, maxKicks = None, randomState = None,
+                           neighbourCount = 8, maxDepth = 30, breadth = ( 5, 3 ) ):
+
+  '''
+  Iterated Lin-Kernighan: after LinKernighan () converges, repeatedly kick the
+  tour with a random double bridge (a 4-opt move LK cannot undo in one step),
+  re-run LK from the kicked nodes only, and keep the result if it is cheaper.
+  Runs for timeLimit seconds or maxKicks kicks; randomState is a
+  numpy.random.RandomState, for repeatable runs.
+
+  Returns ( tour, cost ) as LinKernighan ().
+  '''
+
+  costMatrix = numpy.asarray ( costMatrix, dtype = float )
+  deadline = time.time () + timeLimit
+
+  if tour is None:
+    tour, cost = TC.construct_tour ( costMatrix, 'greedyEdge' )
+  tour = [ int ( node ) for node in tour ]
+
+  if len ( costMatrix ) <= 7:
+    return LinKernighan ( costMatrix, tour, neighbourCount, maxDepth, breadth )
+  if randomState is None:
+    randomState = numpy.random.RandomState ()
+
+  search = _makeSearch ( costMatrix, tour, neighbourCount )
+  search.improve ( maxDepth, breadth, deadline )
+  cost = search.tourCost ()
+
+  kicks = 0
+  while time.time () < deadline and ( maxKicks is None or kicks < maxKicks ):
+
+    savedTour = search.tour.copy ()
+    kickedNodes = search.doubleBridge ( randomState )
+    search.improve ( maxDepth, breadth, deadline, kickedNodes )
+
+    newCost = search.tourCost ()
+    if newCost < cost - search.costs.tolerance:
+      cost = newCost
+    else:
+      search.tour = savedTour
+      search.position [savedTour] = numpy.arange ( search.numNodes )
+    kicks = kicks + 1
+
+  logging.debug ( "Iterated Lin-Kernighan made " + str ( kicks ) + " kicks, cost " + str ( cost ) )
+
+  tour = search.costs.fromSymmetricTour ( search.tour )
+  return tour, TC.tourCost ( costMatrix, tour )
+
+def _makeSearch ( costMatrix, tour, neighbourCount ):
+  if ( costMatrix == costMatrix.T ).all ():
+    return _LKSearch ( _SymmetricCosts ( costMatrix, neighbourCount ), tour )
+  costs = _TransformedCosts ( costMatrix, neighbourCount )
+  return _LKSearch ( costs, costs.toSymmetricTour ( tour ) )
+
+class _SymmetricCosts:
+
+  def __init__ (self, costMatrix, neighbourCount):
+    self.numNodes = len ( costMatrix )
+    self.costMatrix = costMatrix
+    self.cost = costMatrix.item
+    self.neighbours = LS.nearestNeighbourLists ( costMatrix, neighbourCount ).tolist ()
+    self.fixedEdge = lambda a, b : False
+    self.tolerance = 1e-10 * max ( 1.0, abs ( costMatrix ).max () )
+
+  def fromSymmetricTour (self, tour):
+    return [ int ( node ) for node in tour ]
+
+  def tourCost (self, tour):
+    return self.costMatrix [ tour, numpy.roll ( tour, -1 ) ].sum ()
+
+class _TransformedCosts:
+
+  '''
+  Costs of the symmetric problem on in-nodes 0..n-1 and out-nodes n..2n-1 of an
+  asymmetric costMatrix. The in/out edge of a city is fixed in the tour; edges
+  between two in-nodes or two out-nodes are never used.
+  '''
+
+  def __init__ (self, costMatrix, neighbourCount):
+
+    cities = len ( costMatrix )
+    self.cities = cities
+    self.numNodes = 2 * cities
+    self.costMatrix = costMatrix
+    self.unusable = numpy.inf
+    self.tolerance = 1e-10 * max ( 1.0, abs ( costMatrix ).max () )
+
+    # In-node j's neighbours are the out-nodes of the cities nearest to it
+    # (by cost into j), out-node n+i's the in-nodes of the cities nearest from i.
+    k = min ( neighbourCount, cities - 1 )
+    offDiagonal = costMatrix + numpy.diag ( [numpy.inf] * cities )
+    nearestInto = offDiagonal.argsort ( axis = 0 ) [:k].T
+    nearestFrom = offDiagonal.argsort ( axis = 1 ) [:, :k]
+    self.neighbours = ( nearestInto + cities ).tolist () + nearestFrom.tolist ()
+
+  def cost (self, a, b):
+    if a >= self.cities:
+      a, b = b, a
+    if a >= self.cities or b < self.cities:
+      return self.unusable
+    if b - self.cities == a:
+      return 0.0
+    return self.costMatrix.item ( b - self.cities, a )
+
+  def fixedEdge (self, a, b):
+    return abs ( a - b ) == self.cities
+
+  def tourCost (self, tour):
+
+    # Either way round: each edge joins an in-node and an out-node.
+    nextNodes = numpy.roll ( tour, -1 )
+    inNodes = numpy.where ( tour < self.cities, tour, nextNodes )
+    outCities = numpy.where ( tour < self.cities, nextNodes, tour ) - self.cities
+    return numpy.where ( inNodes == outCities, 0.0, self.costMatrix [outCities, inNodes] ).sum ()
+
+  def toSymmetricTour (self, tour):
+    return [ node for city in tour for node in ( city, city + self.cities ) ]
+
+  def fromSymmetricTour (self, tour):
+
+    # Walk the tour in the direction where each in-node is followed by its out-node.
+    tour = [ int ( node ) for node in tour ]
+    if tour [0] < self.cities:
+      forwards = tour [1] == tour [0] + self.cities
+    else:
+      forwards = tour [-1] == tour [0] - self.cities
+    if not forwards:
+      tour = tour [::-1]
+    return [ node for node in tour if node < self.cities ]
+
+class _LKSearch:
+
+  '''
+  The tour as an array with a position index. Every change to it is recorded
+  as ( positions, previous nodes there ) so that a chain can be undone.
+  '''
+
+  def __init__ (self, costs, tour):
+
+    self.costs = costs
+    self.numNodes = costs.numNodes
+    self.tour = numpy.array ( tour, dtype = int )
+    self.position = numpy.empty ( self.numNodes, dtype = int )
+    self.position [self.tour] = numpy.arange ( self.numNodes )
+
+  # Tour access
+
+  def succ (self, node):
+    return self.tour.item ( ( self.position.item ( node ) + 1 ) % self.numNodes )
+
+  def pred (self, node):
+    return self.tour.item ( self.position.item ( node ) - 1 )
+
+  def _positions (self, start, length):
+    positions = numpy.arange ( start, start + length )
+    if start + length > self.numNodes:
+      positions %= self.numNodes
+    return positions
+
+  def _rewrite (self, positions, nodes):
+    change = ( positions, self.tour [positions] )
+    self.tour [positions] = nodes
+    self.position [nodes] = positions
+    return change
+
+  def undo (self, change):
+    positions, nodes = change
+    self.tour [positions] = nodes
+    self.position [nodes] = positions
+
+  def flip (self, first, last):
+
+    '''
+    Reverse the path from first forward to last. If that is more than half the
+    tour, reverse the rest instead, which gives the same (undirected) tour.
+    '''
+
+    n = self.numNodes
+    start = self.position.item ( first )
+    length = ( self.position.item ( last ) - start ) % n + 1
+
+    if length > n // 2:
+      start = ( self.position.item ( last ) + 1 ) % n
+      length = n - length
+
+    positions = self._positions ( start, length )
+    return self._rewrite ( positions, self.tour [ positions [::-1] ] )
+
+  def swap (self, startA, startB, startC):
+
+    '''
+    The tour is split into segments [startA, startB), [startB, startC) and
+    [startC, startA) of positions, going forward round it. Swap the first two
+    without reversing either, by swapping whichever two adjacent segments are
+    shortest (all give the same tour).
+    '''
+
+    n = self.numNodes
+    starts = [ startA, startB, startC ]
+    lengths = [ ( starts [ ( i + 1 ) % 3 ] - starts [i] ) % n for i in range ( 3 ) ]
+
+    i = min ( range ( 3 ), key = lambda i : lengths [i] + lengths [ ( i + 1 ) % 3 ] )
+    first, second = lengths [i], lengths [ ( i + 1 ) % 3 ]
+
+    positions = self._positions ( starts [i], first + second )
+    nodes = self.tour [positions]
+    return self._rewrite ( positions, numpy.concatenate ( ( nodes [first:], nodes [:first] ) ) )
+
+  # Search
+
+  def tourCost (self):
+    return self.costs.tourCost ( self.tour )
+
+  def doubleBridge (self, randomState, maxSegment = 50):
+
+    '''
+    Cut the tour at three nearby random places into A B C D and reconnect it as
+    A C B D, at edges that are not fixed. Returns the nodes at the cuts.
+    '''
+
+    n = self.numNodes
+    segmentLength = max ( 1, min ( maxSegment, n // 4 ) )
+
+    cuts = [ randomState.randint ( n ) ]
+    for i in range ( 2 ):
+      cuts.append ( cuts [-1] + 1 + randomState.randint ( segmentLength ) )
+
+    # A cut at position p is between tour [p-1] and tour [p]; move it past a fixed edge.
+    for i in range ( 3 ):
+      if self.costs.fixedEdge ( self.tour.item ( ( cuts [i] - 1 ) % n ), self.tour.item ( cuts [i] % n ) ):
+        cuts [i] = cuts [i] + 1
+      if i > 0 and cuts [i] <= cuts [i - 1]:
+        cuts [i] = cuts [i - 1] + 2
+
+    if cuts [2] - cuts [0] >= n:
+      return []
+
+    kickedNodes = [ self.tour.item ( ( cut + offset ) % n ) for cut in cuts for offset in ( -1, 0 ) ]
+    self.swap ( cuts [0] % n, cuts [1] % n, cuts [2] % n )
+    return kickedNodes
+
+  def improve (self, maxDepth, breadth, deadline, startNodes = None):
+
+    '''
+    Run LK from each node of startNodes (default all) and from the nodes whose
+    edges change, until no improving chain is left or the deadline passes.
+    '''
+
+    if startNodes is None:
+      startNodes = self.tour.tolist ()
+    queue = collections.deque ( startNodes )
+    queued = numpy.zeros ( self.numNodes, dtype = bool )
+    queued [startNodes] = True
+    improvements = 0
+
+    while len ( queue ) > 0:
+
+      if deadline is not None and time.time () > deadline:
+        break
+
+      t1 = queue.popleft ()
+      queued [t1] = False
+
+      for t2 in ( self.succ ( t1 ), self.pred ( t1 ) ):
+
+        touched = self.improveFrom ( t1, t2, maxDepth, breadth )
+        if touched is None:
+          continue
+
+        improvements = improvements + 1
+        for node in touched:
+          if not queued [node]:
+            queued [node] = True
+            queue.append ( node )
+        break
+
+    logging.debug ( "Lin-Kernighan made " + str ( improvements ) + " improving moves" )
+
+  def improveFrom (self, t1, t2, maxDepth, breadth):
+
+    '''
+    Search for an improving chain starting by removing ( t1, t2 ). If one is
+    found it is applied and the nodes whose edges changed are returned, else the
+    tour is left as it was and None is returned.
+    '''
+
+    if self.costs.fixedEdge ( t1, t2 ):
+      return None
+
+    self.t1 = t1
+    self.changes = []
+    self.chainNodes = []
+    self.bestGain = self.costs.tolerance
+    self.bestLength = 0
+    self.maxDepth = maxDepth
+    self.breadth = breadth
+    self.added = set ()
+    self.removed = set ( [ _edge ( t1, t2 ) ] )
+
+    self.step ( t2, self.costs.cost ( t1, t2 ), 0 )
+
+    while len ( self.changes ) > self.bestLength:
+      self.undo ( self.changes.pop () )
+      self.chainNodes.pop ()
+
+    if self.bestLength == 0:
+      return None
+    return [t1, t2] + [ node for nodes in self.chainNodes for node in nodes ]
+
+  def step (self, t2, gain, depth):
+
+    '''
+    One level of the chain: t2 is the free end, next to t1 in the tour, and gain
+    the removed minus added costs so far. Returns True once an improvement has
+    been found, leaving the changes in place.
+
+    Two kinds of step are tried, going forward from t1 to t2 round the tour:
+
+    - flip: add ( t2, t3 ), remove ( t3, t4 ) with t4 before t3 and reverse t2..t4.
+    - swap (sequential 3-opt): add ( t2, t3 ), remove ( t3, t4 ) with t4 after
+      t3, which would cut off t2..t3 as a cycle, then add ( t4, t5 ) for t5 on
+      that cycle and remove ( t5, t6 ) with t6 after t5. The segments t2..t5 and
+      t6..t3 change places, neither reversed. This is the only kind possible on
+      the transformed asymmetric problem.
+
+    Going backward from t1 to t2 is the mirror image.
+    '''
+
+    cost = self.costs.cost
+    fixedEdge = self.costs.fixedEdge
+    neighbours = self.costs.neighbours
+    t1 = self.t1
+    n = self.numNodes
+
+    forward = self.succ ( t1 ) == t2
+    ahead, behind = ( self.succ, self.pred ) if forward else ( self.pred, self.succ )
+    t2Position = self.position.item ( t2 )
+    offset = ( lambda node : ( self.position.item ( node ) - t2Position ) % n ) if forward else \
+             ( lambda node : ( t2Position - self.position.item ( node ) ) % n )
+
+    alternatives = []
+    for t3 in neighbours [t2]:
+
+      gainAfterT3 = gain - cost ( t2, t3 )
+      if gainAfterT3 <= 0:
+        break
+      if t3 == t1 or t3 == self.succ ( t2 ) or t3 == self.pred ( t2 ) or _edge ( t2, t3 ) in self.removed:
+        continue
+
+      t4 = behind ( t3 )
+      if not ( fixedEdge ( t3, t4 ) or _edge ( t3, t4 ) in self.added ):
+        alternatives.append ( ( gainAfterT3 + cost ( t3, t4 ), ( t3, t4 ) ) )
+
+      t4 = ahead ( t3 )
+      if fixedEdge ( t3, t4 ) or _edge ( t3, t4 ) in self.added:
+        continue
+      gainAfterT4 = gainAfterT3 + cost ( t3, t4 )
+      t3Offset = offset ( t3 )
+
+      for t5 in neighbours [t4]:
+
+        gainAfterT5 = gainAfterT4 - cost ( t4, t5 )
+        if gainAfterT5 <= 0:
+          break
+        if offset ( t5 ) >= t3Offset or _edge ( t4, t5 ) in self.removed:
+          continue
+
+        t6 = ahead ( t5 )
+        if fixedEdge ( t5, t6 ) or _edge ( t5, t6 ) in self.added:
+          continue
+
+        alternatives.append ( ( gainAfterT5 + cost ( t5, t6 ), ( t3, t4, t5, t6 ) ) )
+
+    alternatives.sort ( reverse = True )
+    width = self.breadth [depth] if depth < len ( self.breadth ) else 1
+
+    for newGain, nodes in alternatives [:width]:
+
+      if len ( nodes ) == 2:
+        t3, t4 = nodes
+        change = self.flip ( t2, t4 ) if forward else self.flip ( t4, t2 )
+        newEdges = [ _edge ( t2, t3 ) ], [ _edge ( t3, t4 ) ]
+        freeEnd = t4
+      else:
+        t3, t4, t5, t6 = nodes
+        pos = self.position.item
+        if forward:
+          change = self.swap ( pos ( t2 ), pos ( t6 ), pos ( t4 ) )
+        else:
+          change = self.swap ( pos ( t3 ), pos ( t5 ), pos ( t1 ) )
+        newEdges = [ _edge ( t2, t3 ), _edge ( t4, t5 ) ], [ _edge ( t3, t4 ), _edge ( t5, t6 ) ]
+        freeEnd = t6
+
+      self.changes.append ( change )
+      self.chainNodes.append ( ( t2, ) + nodes )
+
+      closedGain = newGain - cost ( freeEnd, t1 )
+      if closedGain > self.bestGain:
+        self.bestGain = closedGain
+        self.bestLength = len ( self.changes )
+
+      if depth + 1 < self.maxDepth:
+        self.added.update ( newEdges [0] )
+        self.removed.update ( newEdges [1] )
+        found = self.step ( freeEnd, newGain, depth + 1 )
+        self.added.difference_update ( newEdges [0] )
+        self.removed.difference_update ( newEdges [1] )
+        if found:
+          return True
+
+      if self.bestLength > 0:
+        return True
+
+      self.undo ( self.changes.pop () )
+      self.chainNodes.pop ()
+
+    return False
+
+def _edge ( a, b ):
+  return ( a, b ) if a < b else ( b, a )
@@ -0,0 +1,344 @@
+
+# LocalSearch.py
+# Change Log
+# 18/10/2026    - Initial development: 2-opt / Or-opt with neighbour lists
+# 18/10/2026    - Price moves for arrays of nodes, TourState public for TabuTSP
+
+import collections
+import logging
+import numpy
+
+'''
+
+Local search improvement of a TSP tour, on the same cost matrix as TSP.TSP ().
+The result is not guaranteed optimal, but a 2000 node tour is improved in
+around a second where the branch and bound could not finish at all.
+
+Tours are lists of node indices, as in algorithms.TourConstruction.
+
+'''
+
+def improve_tour ( costMatrix, tour, neighbourCount = 8, maxSegmentLength = 3 ):
+
+  '''
+  Apply improving 2-opt and Or-opt moves to tour until none is left.
+
+  - 2-opt removes two edges and reconnects the tour by reversing the path
+    between them.
+  - Or-opt moves a run of 1 to maxSegmentLength nodes elsewhere in the tour,
+    either way round.
+
+  The usual speed-ups are used:
+
+  - Only moves creating an edge from a node to one of its neighbourCount nearest
+    nodes are tried (neighbour lists, found once at the start).
+  - Don't-look bits: each node is examined in turn from a queue, and is dropped
+    from it when no improving move starts from it. It goes back on the queue
+    only when one of its tour edges changes.
+  - The tour is held as a numpy array with a position index per node. All the
+    moves for a node are priced in one vectorised step, and a reversal rewrites
+    only the shorter side of the tour (on symmetric matrices).
+
+  Asymmetric matrices are handled: the cost of walking a reversed path the other
+  way is included in the price of a 2-opt move.
+
+  Returns ( tour, cost ).
+  '''
+
+  search = TourState ( costMatrix, tour, neighbourCount )
+
+  queue = collections.deque ( search.tour )
+  queued = numpy.ones ( search.numNodes, dtype = bool )
+  movesMade = 0
+
+  while len ( queue ) > 0 and search.numNodes > 4:
+
+    node = queue.popleft ()
+    queued [node] = False
+
+    move = search.bestTwoOptMove ( node )
+    orOptMove = search.bestOrOptMove ( node, maxSegmentLength )
+    if orOptMove is not None and ( move is None or orOptMove [0] < move [0] ):
+      move = orOptMove
+
+    if move is None:
+      continue
+
+    touchedNodes = search.applyMove ( move )
+    movesMade = movesMade + 1
+
+    for touched in touchedNodes:
+      if not queued [touched]:
+        queued [touched] = True
+        queue.append ( touched )
+
+  logging.debug ( "Local search made " + str ( movesMade ) + " moves" )
+
+  tour = [ int ( node ) for node in search.tour ]
+  return tour, search.cost ()
+
+def nearestNeighbourLists ( costMatrix, neighbourCount ):
+
+  '''
+  For each node the neighbourCount nodes nearest to it (either way round, on an
+  asymmetric matrix), nearest first, as an n x neighbourCount array.
+  '''
+
+  numNodes = len ( costMatrix )
+  distances = numpy.minimum ( costMatrix, costMatrix.T ).astype ( float )
+  numpy.fill_diagonal ( distances, numpy.inf )
+
+  k = min ( neighbourCount, numNodes - 1 )
+  neighbours = numpy.argpartition ( distances, k - 1, axis = 1 ) [:, :k]
+  rows = numpy.arange ( numNodes ) [:, None]
+  return neighbours [ rows, distances [rows, neighbours].argsort ( axis = 1 ) ]
+
+class TourState:
+
+  '''
+  The tour array, the position of each node in it and, for asymmetric matrices,
+  prefix sums of the edge costs walked forwards and backwards, so that the cost of
+  any reversed path is two lookups.
+  '''
+
+  def __init__ (self, costMatrix, tour, neighbourCount):
+
+    self.costMatrix = numpy.asarray ( costMatrix, dtype = float )
+    self.numNodes = len ( tour )
+    self.tour = numpy.array ( tour, dtype = int )
+    self.position = numpy.empty ( self.numNodes, dtype = int )
+    self.position [self.tour] = numpy.arange ( self.numNodes )
+
+    self.symmetric = ( self.costMatrix == self.costMatrix.T ).all ()
+    self.neighbours = nearestNeighbourLists ( self.costMatrix, neighbourCount ) if self.numNodes > 1 else None
+
+    # Moves must gain more than this to count, so rounding cannot cause cycling.
+    self.tolerance = 1e-10 * max ( 1.0, abs ( self.costMatrix [ numpy.isfinite ( self.costMatrix ) ] ).max () ) \
+                     if self.costMatrix.size > 0 else 0
+
+    self._updatePrefixSums ()
+
+  def cost (self):
+    return self.costMatrix [ self.tour, numpy.roll ( self.tour, -1 ) ].sum ()
+
+  def _updatePrefixSums (self):
+
+    if self.symmetric:
+      return
+
+    forwardCosts  = self.costMatrix [ self.tour [:-1], self.tour [1:] ]
+    backwardCosts = self.costMatrix [ self.tour [1:], self.tour [:-1] ]
+    self.forwardPrefix  = numpy.concatenate ( ( [0.0], numpy.cumsum ( forwardCosts ) ) )
+    self.backwardPrefix = numpy.concatenate ( ( [0.0], numpy.cumsum ( backwardCosts ) ) )
+
+  def _reversalCosts (self, first, last):
+
+    '''
+    Extra cost of walking the path tour [first..last] backwards (first <= last).
+    Positions past the end (from moves that are not valid) are clipped.
+    '''
+
+    if self.symmetric:
+      return 0.0
+    first = numpy.minimum ( first, self.numNodes - 1 )
+    last = numpy.minimum ( last, self.numNodes - 1 )
+    return ( self.backwardPrefix [last] - self.backwardPrefix [first] ) - \
+           ( self.forwardPrefix [last] - self.forwardPrefix [first] )
+
+  # 2-opt
+
+  def twoOptMoves (self, nodes):
+
+    '''
+    Price every 2-opt move creating an edge between one of nodes and one of its
+    neighbours. A move is given by the positions lo < hi of the two edges removed,
+    ( tour[lo], tour[lo+1] ) and ( tour[hi], tour[hi+1] ); tour[lo+1..hi] is
+    reversed. Returns deltas, lo, hi as len(nodes) x 2k arrays, with numpy.inf for
+    the moves that are not valid, or whose delta is undefined (inf - inf, where
+    arcs are forbidden at inf cost).
+    '''
+
+    n = self.numNodes
+    nodePositions = self.position [nodes] [:, None]
+    neighbourPositions = self.position [ self.neighbours [nodes] ]
+
+    # Edges after each node and its neighbours, then edges before them.
+    edgesA = numpy.concatenate ( ( numpy.repeat ( nodePositions, neighbourPositions.shape [1], axis = 1 ),
+                                   numpy.repeat ( ( nodePositions - 1 ) % n, neighbourPositions.shape [1], axis = 1 ) ),
+                                 axis = 1 )
+    edgesB = numpy.concatenate ( ( neighbourPositions, ( neighbourPositions - 1 ) % n ), axis = 1 )
+
+    lo = numpy.minimum ( edgesA, edgesB )
+    hi = numpy.maximum ( edgesA, edgesB )
+    valid = ( hi - lo >= 2 ) & ~ ( ( lo == 0 ) & ( hi == n - 1 ) )
+
+    x, xNext = self.tour [lo], self.tour [ ( lo + 1 ) % n ]
+    y, yNext = self.tour [hi], self.tour [ ( hi + 1 ) % n ]
+
+    c = self.costMatrix
+    with numpy.errstate ( invalid = 'ignore' ):
+      deltas = c [x, y] + c [xNext, yNext] - c [x, xNext] - c [y, yNext] + self._reversalCosts ( lo + 1, hi )
+    deltas [ ~valid | numpy.isnan ( deltas ) ] = numpy.inf
+
+    return deltas, lo, hi
+
+  def bestTwoOptMove (self, node):
+
+    '''
+    The best improving move from twoOptMoves () for node, as ( gain, '2opt', lo, hi ),
+    or None.
+    '''
+
+    deltas, lo, hi = self.twoOptMoves ( [node] )
+
+    best = deltas.argmin ()
+    if deltas.flat [best] >= -self.tolerance:
+      return None
+    return ( deltas.flat [best], '2opt', lo.flat [best], hi.flat [best] )
+
+  # Or-opt
+
+  def orOptMoves (self, nodes, lengths):
+
+    '''
+    Price moving the run of lengths [i] nodes starting at nodes [i] to just after
+    one of the neighbours of its first or last node, forwards or reversed.
+    Returns deltas, starts, candidates: deltas is len(nodes) x 4k, the forward
+    moves after each of the 2k candidates then the reversed ones, with numpy.inf
+    for moves that are not valid or whose delta is undefined (as for
+    twoOptMoves ()). starts are the run positions.
+    '''
+
+    n = self.numNodes
+    c = self.costMatrix
+    lengths = numpy.asarray ( lengths )
+
+    starts = self.position [nodes]
+    validStarts = ( starts + lengths <= n ) & ( lengths <= n - 3 )
+    starts = numpy.minimum ( starts, n - lengths )
+
+    first = self.tour [starts]
+    last  = self.tour [ starts + lengths - 1 ]
+    before = self.tour [ ( starts - 1 ) % n ]
+    after  = self.tour [ ( starts + lengths ) % n ]
+
+    with numpy.errstate ( invalid = 'ignore' ):
+      removalGains = c [before, after] - c [before, first] - c [last, after]
+
+    if self.symmetric or lengths.max () == 1:
+      internalReversals = 0.0
+    else:
+      # Edges inside each run, padded to the longest with zero cost self loops.
+      steps = numpy.arange ( lengths.max () - 1 )
+      fromPositions = numpy.minimum ( starts [:, None] + steps, n - 1 )
+      toPositions = numpy.where ( steps < lengths [:, None] - 1, numpy.minimum ( fromPositions + 1, n - 1 ), fromPositions )
+      fromNodes, toNodes = self.tour [fromPositions], self.tour [toPositions]
+      with numpy.errstate ( invalid = 'ignore' ):
+        internalReversals = ( c [toNodes, fromNodes] - c [fromNodes, toNodes] ).sum ( axis = 1 ) [:, None]
+
+    candidates = numpy.concatenate ( ( self.neighbours [first], self.neighbours [last] ), axis = 1 )
+    candidatePositions = self.position [candidates]
+
+    # The run goes between candidate and its successor, which must both be outside it.
+    outside = ( ( candidatePositions < starts [:, None] ) | ( candidatePositions >= ( starts + lengths ) [:, None] ) ) & \
+              ( candidates != before [:, None] ) & validStarts [:, None]
+    successors = self.tour [ ( candidatePositions + 1 ) % n ]
+
+    with numpy.errstate ( invalid = 'ignore' ):
+      removalGains = removalGains [:, None] - c [candidates, successors]
+      deltas = numpy.concatenate ( ( removalGains + c [candidates, first [:, None]] + c [last [:, None], successors],
+                                     removalGains + c [candidates, last [:, None]] + c [first [:, None], successors]
+                                     + internalReversals ), axis = 1 )
+    deltas [ ~ numpy.tile ( outside, 2 ) | numpy.isnan ( deltas ) ] = numpy.inf
+
+    return deltas, starts, candidates
+
+  def orOptMove (self, deltas, starts, candidates, lengths, row, col):
+
+    '''
+    The move at ( row, col ) of the arrays from orOptMoves () as
+    ( gain, 'oropt', start, length, after, reversed ).
+    '''
+
+    numCandidates = candidates.shape [1]
+    return ( deltas [row, col], 'oropt', starts [row], lengths [row], candidates [row, col % numCandidates],
+             col >= numCandidates )
+
+  def bestOrOptMove (self, node, maxSegmentLength):
+
+    '''
+    The best improving move from orOptMoves () for node over runs of 1 to
+    maxSegmentLength nodes, or None.
+    '''
+
+    if maxSegmentLength < 1:
+      return None
+
+    lengths = numpy.arange ( 1, maxSegmentLength + 1 )
+    deltas, starts, candidates = self.orOptMoves ( [node] * maxSegmentLength, lengths )
+
+    row, col = numpy.unravel_index ( deltas.argmin (), deltas.shape )
+    if deltas [row, col] >= -self.tolerance:
+      return None
+    return self.orOptMove ( deltas, starts, candidates, lengths, row, col )
+
+  # Applying moves
+
+  def applyMove (self, move):
+
+    '''
+    Apply a move from bestTwoOptMove () or bestOrOptMove (), and return the nodes
+    whose tour edges changed.
+    '''
+
+    if move [1] == '2opt':
+      gain, kind, lo, hi = move
+      touched = [ self.tour [lo], self.tour [lo + 1], self.tour [hi], self.tour [ ( hi + 1 ) % self.numNodes ] ]
+      self._reverse ( lo + 1, hi )
+    else:
+      gain, kind, start, length, after, isReversed = move
+      n = self.numNodes
+      touched = [ self.tour [ ( start - 1 ) % n ], self.tour [start], self.tour [ start + length - 1 ],
+                  self.tour [ ( start + length ) % n ], after, self.tour [ ( self.position [after] + 1 ) % n ] ]
+      self._moveSegment ( start, length, self.position [after], isReversed )
+
+    self._updatePrefixSums ()
+    return touched
+
+  def _reverse (self, first, last):
+
+    '''
+    Reverse tour [first..last]. On a symmetric matrix, if that is more than half
+    the tour, reverse the rest instead (which gives the same circuit).
+    '''
+
+    n = self.numNodes
+    length = last - first + 1
+
+    if self.symmetric and length > n // 2:
+      indices = ( last + 1 + numpy.arange ( n - length ) ) % n
+    else:
+      indices = numpy.arange ( first, last + 1 )
+
+    self.tour [indices] = self.tour [ indices [::-1] ]
+    self.position [ self.tour [indices] ] = indices
+
+  def _moveSegment (self, start, length, afterPosition, isReversed):
+
+    '''
+    Move tour [start : start+length] to just after position afterPosition,
+    shifting only the nodes in between.
+    '''
+
+    segment = self.tour [ start : start + length ].copy ()
+    if isReversed:
+      segment = segment [::-1]
+
+    if afterPosition > start:
+      span = numpy.arange ( start, afterPosition + 1 )
+      self.tour [span] = numpy.concatenate ( ( self.tour [ start + length : afterPosition + 1 ], segment ) )
+    else:
+      span = numpy.arange ( afterPosition + 1, start + length )
+      self.tour [span] = numpy.concatenate ( ( segment, self.tour [ afterPosition + 1 : start ] ) )
+
+    self.position [ self.tour [span] ] = span
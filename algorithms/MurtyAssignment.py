@@ -0,0 +1,135 @@
+
+# MurtyAssignment.py
+# Change Log
+# 18/10/2026    - Initial development: lazy k-best assignments
+
+import heapq
+import logging
+import numpy
+import algorithms.HungarianAssignment as HA
+
+def iter_best_assignments ( costMatrix ):
+
+  '''
+
+  Generate the assignments of costMatrix in order of increasing total cost: the
+  optimum (as HungarianAssignment () finds it), then the 2nd best, 3rd best and
+  so on, e.g. for fallback dispatch plans.
+
+  This is Murty's method. Each solution found stands for a partition of the
+  solutions not yet generated. When that solution is taken, its partition is
+  split in two for each of its assigned pairs p1, p2, .. : child k keeps p1..pk-1
+  (all other edges in those rows and cols are forbidden) and forbids pk. Every
+  other solution in the partition falls in exactly one child. The best solution
+  of each child goes on a priority queue and the cheapest is generated next.
+
+  Work is only done on demand. A partition is split when the next solution is
+  requested, not when its own solution is generated. A child's solution is
+  found by warm-starting from the parent's matching and dual potentials (see
+  HA.reoptimiseAssignment ()): only the forbidden pair is broken, so one O(n^2)
+  augmentation repairs it. Splitting one partition is therefore O(n^3) and k
+  solutions cost O(k.n^3).
+
+  Parameters:
+  -----------
+
+  costMatrix : 2D numpy.array of costs (as HungarianAssignment ()). numpy.inf
+               may be used for forbidden pairs.
+
+  Yields ( resultMatrix, totalCost ) where resultMatrix is a boolean matrix laid
+  out as HungarianAssignment () returns it. The generator stops once every
+  feasible assignment has been generated.
+
+  Example (not for doctest)
+
+  for resultMatrix, totalCost in iter_best_assignments ( costMatrix ):
+    if totalCost > budget: break
+
+  '''
+
+  costMatrix = numpy.asarray ( costMatrix )
+  workingMatrix = costMatrix.astype ( float )
+
+  try:
+    rootState = HA.shortestAugmentingPathAssignment ( workingMatrix )
+  except ValueError:
+    return
+
+  queue = []
+  counter = 0
+  heapq.heappush ( queue, ( _totalCost ( costMatrix, rootState [0] ), counter, [], [], rootState ) )
+
+  while len ( queue ) > 0:
+
+    totalCost, ignore, forcedPairs, forbiddenPairs, state = heapq.heappop ( queue )
+
+    yield HA.rowAssignmentToBoolMatrix ( state [0], costMatrix.shape [1] ), totalCost
+
+    # Partition the remaining solutions. workingMatrix is re-used for each child
+    # in turn: it is rebuilt once, then pair k is forced after child k is solved.
+
+    workingMatrix [:] = costMatrix
+    _applyConstraints ( workingMatrix, forcedPairs, forbiddenPairs )
+
+    forcedRows = set ( [ pair [0] for pair in forcedPairs ] )
+    freePairs = [ ( row, col ) for row, col in enumerate ( state [0] ) if col != -1 and row not in forcedRows ]
+
+    for k in range ( len ( freePairs ) ):
+
+      row, col = freePairs [k]
+      childForbidden = forbiddenPairs + [ ( row, col ) ]
+
+      savedCost = workingMatrix [row, col]
+      workingMatrix [row, col] = numpy.inf
+
+      childState = _reoptimiseWithout ( workingMatrix, state, row, col )
+
+      workingMatrix [row, col] = savedCost
+
+      if childState is not None:
+        counter = counter + 1
+        heapq.heappush ( queue, ( _totalCost ( costMatrix, childState [0] ), counter,
+                                  forcedPairs + freePairs [:k], childForbidden, childState ) )
+
+      _forcePair ( workingMatrix, row, col )
+
+    logging.debug ( "Murty queue holds " + str ( len ( queue ) ) + " partitions" )
+
+def _reoptimiseWithout ( workingMatrix, parentState, row, col ):
+
+  '''
+  Copy the parent's matching and potentials, break the pair ( row, col ) and
+  repair it. Returns None when the child partition has no feasible assignment.
+  '''
+
+  rowToCol, colToRow, rowPotentials, colPotentials = [ a.copy () for a in parentState ]
+  rowToCol [row] = -1
+  colToRow [col] = -1
+
+  try:
+    return HA.reoptimiseAssignment ( workingMatrix, rowToCol, colToRow, rowPotentials, colPotentials )
+  except ValueError:
+    return None
+
+def _applyConstraints ( workingMatrix, forcedPairs, forbiddenPairs ):
+
+  for row, col in forcedPairs:
+    _forcePair ( workingMatrix, row, col )
+  for row, col in forbiddenPairs:
+    workingMatrix [row, col] = numpy.inf
+
+def _forcePair ( workingMatrix, row, col ):
+
+  '''
+  Forbid every other edge in row and col, so that any assignment must use ( row, col ).
+  Costs only go up, so dual potentials that were feasible stay feasible.
+  '''
+
+  savedCost = workingMatrix [row, col]
+  workingMatrix [row, :] = numpy.inf
+  workingMatrix [:, col] = numpy.inf
+  workingMatrix [row, col] = savedCost
+
+def _totalCost ( costMatrix, rowToCol ):
+  assignedRows = numpy.where ( rowToCol != -1 )[0]
+  return costMatrix [ assignedRows, rowToCol [assignedRows] ].sum ()
@@ -3,7 +3,47 @@
 
 import numpy
 import heapq
+import cPickle
+import collections
+import hashlib
+import logging
+import multiprocessing
+import multiprocessing.sharedctypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+import algorithms.AdditiveBound as AdditiveBound
 import algorithms.HungarianAssignment as HA
+import algorithms.HeldKarpBound as HeldKarpBound
+import algorithms.HeldKarpDP as HeldKarpDP
+import algorithms.LinKernighan as LinKernighan
+import algorithms.TourConstruction as TourConstruction
+
+# Subgradient iterations for the 1-tree bound at the root, and at a child which
+# starts from its parent's penalties.
+_ROOT_ONE_TREE_ITERATIONS  = 100
+_CHILD_ONE_TREE_ITERATIONS = 30
+
+# Smaller instances are solved by dynamic programming (about 1 second at 20 nodes),
+# which takes about this many seconds per 2^n n^2.
+_DYNAMIC_PROGRAMMING_BELOW  = 21
+_DYNAMIC_PROGRAMMING_SECONDS = 3e-9
+
+# Cost of a forbidden arc, as AssignmentProblem.infinity.
+_INFINITY = 100000000
+
+# Queued sub-problems at which search = 'hybrid' starts diving depth first,
+# unless TSP () is given a cap of its own.
+_MAX_QUEUED_NODES = 100000
+
+# Sub-problems remembered to drop duplicates (see _SubProblemMemo).
+_MEMO_SIZE = 100000
+
+# Seconds between checkpoints (see resume ()), and their format.
+_CHECKPOINT_INTERVAL = 300
+_CHECKPOINT_VERSION  = 1
 
 ''' 
 
@@ -111,6 +151,10 @@ class AssignmentProblem:
     cell in the costMatrix. That cell will be set to infinity before the 
     assignment procedure is undertaken.
 
+  - engine: 
+    Passed through to HA.HungarianAssignment. Defaults to the O(n^3) 
+    shortest augmenting path engine ('jv'). 
+
   Different instances of AssignmentProblem can be compared because __eq__, 
   __gt__ etc have been over-ridden to use self.getTotalCost () which provides
   the total cost of this assignment. This means that different assignments
@@ -123,15 +167,22 @@ class AssignmentProblem:
   circuits produced. There is an obvious method for this but nb that the 
   list of circuits produced is in fact a heapq priority list so that  
 
+  With the 'jv' engine the optimal matching and dual potentials are kept on 
+  the instance (assignmentState). A child which only adds constraints to its
+  parent can call warmStartFrom (parent) before doAssignment () so that only
+  the edges broken by the new constraints are repaired, in O(n^2) rather than 
+  re-solving from scratch.
+
   It is possible to set the result (total cost) to infinity. This is so that, 
   once it's children are processed, this Assignment can be de-prioritized (i.e.
   will always be higher than anything else). 
 
   '''
 
-  def __init__ (self, originalCostMatrix, startingConstraints = None):
+  def __init__ (self, originalCostMatrix, startingConstraints = None, engine = 'jv'):
 
     self.constraints = []
+    self.engine = engine
     self.costMatrix = originalCostMatrix
     self.matrixLen  = len (self.costMatrix)
 
@@ -145,6 +196,9 @@ class AssignmentProblem:
 
     self.hasInfiniteTotalCost   = False
 
+    self.assignmentState = None
+    self.warmStartState  = None
+
   def setDiagonalInfinite (self):
     for i in range ( self.matrixLen ):
       self.costMatrix [i:i+1,i:i+1] = self.infinity
@@ -160,8 +214,43 @@ class AssignmentProblem:
 #    print " "
 #    print costMatrixCopy
 
+    if self.engine == 'jv':
+      self._doShortestAugmentingPathAssignment ( costMatrixCopy )
+      return
+
     indices = range (0,  self.matrixLen  )
-    self.booleanMatrix = HA.HungarianAssignment ( indices, indices, costMatrixCopy)
+    self.booleanMatrix = HA.HungarianAssignment ( indices, indices, costMatrixCopy, self.engine)
+
+  def _doShortestAugmentingPathAssignment (self, costMatrixCopy):
+
+    if self.warmStartState is None:
+      self.assignmentState = HA.shortestAugmentingPathAssignment ( costMatrixCopy )
+    else:
+      rowToCol, colToRow, rowPotentials, colPotentials = [ a.copy() for a in self.warmStartState ]
+
+      # Break any matched edge which the constraints now forbid. 
+      for thisConstraint in self.constraints :
+        xIndex =  int (thisConstraint [0])    
+        yIndex =  int (thisConstraint [1])    
+        if rowToCol [xIndex] == yIndex:
+          rowToCol [xIndex] = -1
+          colToRow [yIndex] = -1
+
+      self.assignmentState = HA.reoptimiseAssignment ( costMatrixCopy, rowToCol, colToRow, 
+                                                       rowPotentials, colPotentials )
+      self.warmStartState = None
+
+    self.booleanMatrix = HA.rowAssignmentToBoolMatrix ( self.assignmentState [0], self.matrixLen )
+
+  def warmStartFrom (self, parentProblem):
+
+    '''
+    Re-use the parent's optimal matching and potentials in the next 
+    doAssignment (). Only valid when this problem's constraints include all of 
+    the parent's (which is how TSP () builds its children).
+    '''
+    if parentProblem.engine == self.engine and parentProblem.assignmentState is not None:
+      self.warmStartState = parentProblem.assignmentState
 
   def getTotalCost (self):
     if self.hasInfiniteTotalCost:
@@ -188,78 +277,1285 @@ class AssignmentProblem:
 
   # Magic functions for incorporation in the priority Q.
   def __gt__(self, other):
-    return self.getTotalCost > other.getTotalCost ()  
+    return self.getTotalCost () > other.getTotalCost ()  
   def __lt__(self, other):
-    return self.getTotalCost < other.getTotalCost ()
+    return self.getTotalCost () < other.getTotalCost ()
   def __eq__(self, other):
-    return self.getTotalCost == other.getTotalCost ()  
+    return self.getTotalCost () == other.getTotalCost ()  
   def __ge__(self, other):
-    return self.getTotalCost >= other.getTotalCost ()  
+    return self.getTotalCost () >= other.getTotalCost ()  
   def __le__(self, other):
-    return self.getTotalCost <= other.getTotalCost () 
+    return self.getTotalCost () <= other.getTotalCost () 
+
+def _assignmentFromTour ( costMatrix, tour ):
+
+  '''
+  Wrap a tour (see algorithms.TourConstruction) as an AssignmentProblem whose 
+  result is that single circuit, so that it can stand as TSP's best solution.
+  '''
+
+  tourProblem = AssignmentProblem ( costMatrix )
+  tourProblem.booleanMatrix = TourConstruction.tourToBooleanMatrix ( tour )
+  return tourProblem
+
+class BranchNode (object):
+
+  '''
+
+  A sub-problem of the branch and bound in TSP (). Many thousands of these
+  can be queued at once, so a node keeps nothing of size n x n:
+
+  - parent, constraint, forced: the arcs this node forbids, and forces, on
+    top of its parent's, each as a pair of int32 arrays ( fromNodes, toNodes )
+    (forced None if there are none). The whole sets are gathered up the
+    parents by getConstraints () and getForcedArcs () and applied to a copy
+    of the cost matrix only while the node is solved (see _constrainedCosts ()).
+  - bound: the cached lower bound, which orders the priority Q (__lt__).
+  - assignmentCost, successors: the optimal assignment, successors [i] (int32)
+    being the node after i.
+  - rowPotentials, colPotentials: its dual potentials, from which the
+    children's assignments are warm started.
+  - penalties, oneTree: the Held-Karp node penalties and 1-tree (n x 2,
+    int32) with bound = 'heldKarp'.
+
+  Once its children are made a node is release ()d, after which only the
+  parent pointer and constraints are kept for its descendants.
+
+  '''
+
+  __slots__ = ( 'parent', 'constraint', 'forced', 'bound', 'assignmentCost', 'successors',
+                'rowPotentials', 'colPotentials', 'penalties', 'oneTree' )
+
+  def __init__ (self, parent = None, constraint = None, forced = None):
+
+    self.parent         = parent
+    self.constraint     = constraint
+    self.forced         = forced
+    self.bound          = None
+    self.assignmentCost = None
+    self.successors     = None
+    self.rowPotentials  = None
+    self.colPotentials  = None
+    self.penalties      = None
+    self.oneTree        = None
+
+  def getConstraints (self):
+
+    '''
+    Every arc forbidden at this node, as ( fromNodes, toNodes ).
+    '''
 
-def TSP (costMatrix):
+    return self._gatherArcs ( 'constraint' )
 
+  def getForcedArcs (self):
+
+    '''
+    Every arc this node's assignment must use, as ( fromNodes, toNodes ).
+    '''
+
+    return self._gatherArcs ( 'forced' )
+
+  def _gatherArcs (self, slot):
+
+    fromParts, toParts = [], []
+    node = self
+    while node is not None:
+      arcs = getattr ( node, slot )
+      if arcs is not None:
+        fromParts.append ( arcs [0] )
+        toParts.append ( arcs [1] )
+      node = node.parent
+
+    if len ( fromParts ) == 0:
+      return numpy.zeros ( 0, dtype = numpy.int32 ), numpy.zeros ( 0, dtype = numpy.int32 )
+    return numpy.concatenate ( fromParts ), numpy.concatenate ( toParts )
+
+  def getAllCircuits (self):
+
+    '''
+    The circuits of the assignment, each a list of nodes in order, each found
+    from the lowest node not yet on a circuit (as _findCircuits () does).
+    '''
+
+    numNodes = len ( self.successors )
+    onCircuit = numpy.zeros ( numNodes, dtype = bool )
+    circuits = []
+
+    for start in range ( numNodes ):
+      if onCircuit [start]:
+        continue
+      circuit = []
+      node = start
+      while not onCircuit [node]:
+        onCircuit [node] = True
+        circuit.append ( node )
+        node = int ( self.successors [node] )
+      circuits.append ( circuit )
+
+    return circuits
+
+  def getOneTreeTour (self):
+    if self.oneTree is None or numpy.isinf ( self.bound ):
+      return None
+    return HeldKarpBound.oneTreeTour ( self.oneTree )
+
+  def getSolveState (self):
+
+    '''
+    What a worker process sends back in place of the node (see _ChildSolver).
+    '''
+
+    return ( self.bound, self.assignmentCost, self.successors, self.rowPotentials,
+             self.colPotentials, self.penalties, self.oneTree )
+
+  def setSolveState (self, solveState):
+    ( self.bound, self.assignmentCost, self.successors, self.rowPotentials,
+      self.colPotentials, self.penalties, self.oneTree ) = solveState
+
+  def getMemory (self):
+
+    '''
+    Bytes held in this node's own arrays (not its parents').
+    '''
+
+    arrays = [ self.successors, self.rowPotentials, self.colPotentials, self.penalties, self.oneTree ]
+    arrays = arrays + list ( self.constraint or () ) + list ( self.forced or () )
+    return sum ( [ array.nbytes for array in arrays if array is not None ] )
+
+  def release (self):
+    self.successors    = None
+    self.rowPotentials = None
+    self.colPotentials = None
+    self.penalties     = None
+    self.oneTree       = None
+
+  def __lt__(self, other):
+    return self.bound < other.bound
+
+def _constrainedCosts ( node, costMatrix ):
+
+  '''
+  A copy of costMatrix with every arc forbidden at node set to _INFINITY. A
+  forced arc i -> j also forbids every other arc out of i and into j, and
+  each path of forced arcs may not be closed into a subtour.
   '''
 
-  - This is a branch and bound implementation of the TSP. 
+  fromNodes, toNodes = node.getConstraints ()
+  constrainedCosts = costMatrix.copy ()
+  constrainedCosts [ fromNodes, toNodes ] = _INFINITY
 
-  - This works by utilizing the least cost assignment procedure which 
-    returns multiple mini-circuits. 
+  forcedFrom, forcedTo = node.getForcedArcs ()
+  if len ( forcedFrom ) > 0:
+    forcedCosts = constrainedCosts [ forcedFrom, forcedTo ]
+    constrainedCosts [ forcedFrom, : ] = _INFINITY
+    constrainedCosts [ :, forcedTo ] = _INFINITY
+    constrainedCosts [ forcedFrom, forcedTo ] = forcedCosts
+
+    pathEnds, pathStarts = _forcedPaths ( forcedFrom, forcedTo, len ( costMatrix ) )
+    constrainedCosts [ pathEnds, pathStarts ] = _INFINITY
+
+  return constrainedCosts
+
+def _forcedPaths ( forcedFrom, forcedTo, numNodes ):
+
+  '''
+  The ( ends, starts ) of the paths made by the forced arcs, leaving out a
+  path through every node, which only its closing arc can make a tour.
+  '''
+
+  nextNode = - numpy.ones ( numNodes, dtype = int )
+  nextNode [forcedFrom] = forcedTo
+  hasPrevious = numpy.zeros ( numNodes, dtype = bool )
+  hasPrevious [forcedTo] = True
+
+  ends, starts = [], []
+  for start in numpy.flatnonzero ( ( nextNode >= 0 ) & ~ hasPrevious ):
+    end, numArcs = start, 0
+    while nextNode [end] >= 0:
+      end, numArcs = nextNode [end], numArcs + 1
+    if numArcs < numNodes - 1:
+      ends.append ( end )
+      starts.append ( start )
+
+  return numpy.array ( ends, dtype = int ), numpy.array ( starts, dtype = int )
+
+def _assignNode ( node, constrainedCosts ):
+
+  '''
+
+  Solve node's assignment. Forced arcs are contracted: each takes its row and
+  column out of the assignment, so only the rows and columns still free are
+  solved. If the parent has not been released its matching and potentials
+  on those are repaired, only the matched arcs now forbidden being broken.
+
+  The potentials are kept for every node, a forced arc i -> j taking
+  rowPotentials [i] = its cost and colPotentials [j] = 0, so that with
+  constrainedCosts they are feasible duals of the whole problem.
+
+  '''
+
+  numNodes = len ( constrainedCosts )
+  forcedFrom, forcedTo = node.getForcedArcs ()
+
+  freeRows = numpy.ones ( numNodes, dtype = bool )
+  freeRows [forcedFrom] = False
+  freeCols = numpy.ones ( numNodes, dtype = bool )
+  freeCols [forcedTo] = False
+  rows, cols = numpy.flatnonzero ( freeRows ), numpy.flatnonzero ( freeCols )
+  reducedCosts = constrainedCosts [ numpy.ix_ ( rows, cols ) ]
+
+  parent = node.parent
+
+  if parent is None or parent.successors is None:
+    rowToCol, colToRow, rowPotentials, colPotentials = HA.shortestAugmentingPathAssignment ( reducedCosts )
+  else:
+    colIndices = - numpy.ones ( numNodes, dtype = int )
+    colIndices [cols] = numpy.arange ( len ( cols ) )
+    rowToCol = colIndices [ parent.successors [rows] ]
+
+    matched = numpy.flatnonzero ( rowToCol >= 0 )
+    broken = matched [ reducedCosts [ matched, rowToCol [matched] ] >= _INFINITY ]
+    rowToCol [broken] = -1
+
+    colToRow = - numpy.ones ( len ( cols ), dtype = int )
+    matched = numpy.flatnonzero ( rowToCol >= 0 )
+    colToRow [ rowToCol [matched] ] = matched
+
+    rowToCol, colToRow, rowPotentials, colPotentials = HA.reoptimiseAssignment ( reducedCosts, rowToCol, colToRow,
+                                                                                 parent.rowPotentials [rows],
+                                                                                 parent.colPotentials [cols] )
+
+  node.successors = numpy.empty ( numNodes, dtype = numpy.int32 )
+  node.successors [forcedFrom] = forcedTo
+  node.successors [rows] = cols [rowToCol]
+
+  node.rowPotentials = numpy.zeros ( numNodes )
+  node.rowPotentials [rows] = rowPotentials
+  node.rowPotentials [forcedFrom] = constrainedCosts [ forcedFrom, forcedTo ]
+  node.colPotentials = numpy.zeros ( numNodes )
+  node.colPotentials [cols] = colPotentials
+
+  node.assignmentCost = constrainedCosts [ numpy.arange ( numNodes ), node.successors ].sum ()
+  node.bound          = node.assignmentCost
+
+def _boundNode ( node, costMatrix, constrainedCosts, bound, incumbentCost, integerCosts ):
+
+  '''
+  Raise node.bound above its assignment cost, as TSP () was asked to:
+
+  - 'heldKarp': the 1-tree bound (see algorithms.HeldKarpBound), starting
+    from the parent's node penalties if it has any. An edge is forbidden to
+    the 1-tree only when it is forbidden both ways round, since a tour can
+    use either.
+  - 'additive': the assignment cost plus an arborescence bound on the reduced
+    costs left by its potentials (see algorithms.AdditiveBound).
+
+  With integer costs the bound is rounded up.
+  '''
+
+  if bound == 'heldKarp':
+    numNodes = len ( costMatrix )
+    fromNodes, toNodes = [ nodes.astype ( int ) for nodes in node.getConstraints () ]
+    bothWays = numpy.in1d ( fromNodes * numNodes + toNodes, toNodes * numNodes + fromNodes ) & ( fromNodes < toNodes )
+    forbiddenEdges = zip ( fromNodes [bothWays], toNodes [bothWays] )
+
+    startingPenalties, iterations = None, _ROOT_ONE_TREE_ITERATIONS
+    if node.parent is not None and node.parent.penalties is not None:
+      startingPenalties, iterations = node.parent.penalties, _CHILD_ONE_TREE_ITERATIONS
+
+    lowerBound, node.penalties, oneTree = HeldKarpBound.oneTreeBound ( costMatrix, forbiddenEdges, startingPenalties,
+                                                                       incumbentCost, iterations )
+    node.oneTree = oneTree.astype ( numpy.int32 )
+
+  elif bound == 'additive':
+    costs = constrainedCosts.astype ( float )
+    costs [ costs >= _INFINITY ] = numpy.inf
+    lowerBound = AdditiveBound.additiveBound ( costs, node.rowPotentials, node.colPotentials )
+
+  else:
+    return
+
+  if integerCosts and numpy.isfinite ( lowerBound ):
+    lowerBound = numpy.ceil ( lowerBound - 1e-9 * max ( 1.0, abs ( lowerBound ) ) )
+  node.bound = max ( node.assignmentCost, lowerBound )
+
+def _solveNode ( node, costMatrix, bound, incumbentCost, integerCosts ):
+
+  '''
+  Solve node's assignment and, unless it is a tour or already costs at least
+  incumbentCost, bound it.
+  '''
+
+  constrainedCosts = _constrainedCosts ( node, costMatrix )
+  _assignNode ( node, constrainedCosts )
+
+  if len ( node.getAllCircuits () ) > 1 and ( incumbentCost is None or node.bound < incumbentCost ):
+    _boundNode ( node, costMatrix, constrainedCosts, bound, incumbentCost, integerCosts )
+
+def _branchConstraints ( node, costMatrix, useOneTree ):
+
+  '''
+
+  The ( constraint, forced ) arcs of each child of node, split so that every
+  tour of node falls to a child:
+
+  - On the assignment's circuits (Carpaneto-Toth): take the circuit with the
+    fewest arcs not yet forced, and those arcs a1 .. ak. Child r forbids ar
+    and forces a1 .. ar-1, so each tour of node falls to the child of the
+    first of them it leaves out (it cannot use them all).
+  - With the 1-tree bound, on the 1-tree (which must not be a tour): at a
+    node v of the highest degree take its two cheapest 1-tree edges v-a,
+    v-b and a third. No tour uses all three, so it either leaves out v-a,
+    leaves out v-b, or uses both and so no other edge at v. Edges are
+    forbidden both ways round, and none are forced. A tour which leaves out
+    both v-a and v-b falls to two children, so the same sub-problem can be
+    reached twice (see _SubProblemMemo).
+
+  '''
+
+  def arcs ( fromNodes, toNodes ):
+    return numpy.array ( fromNodes, dtype = numpy.int32 ), numpy.array ( toNodes, dtype = numpy.int32 )
+
+  if not useOneTree:
+    forcedOut = numpy.zeros ( len ( costMatrix ), dtype = bool )
+    forcedOut [ node.getForcedArcs () [0] ] = True
+
+    circuit = min ( node.getAllCircuits (), key = lambda circuit: ( ~ forcedOut [circuit] ).sum () )
+    circuitArcs = zip ( circuit, circuit [1:] + circuit [:1] )
+    freeArcs = [ ( i, j ) for i, j in reversed ( circuitArcs ) if not forcedOut [i] ]
+
+    branches = []
+    for r, ( i, j ) in enumerate ( freeArcs ):
+      forced = None
+      if r > 0:
+        forced = arcs ( [ arc [0] for arc in freeArcs [:r] ], [ arc [1] for arc in freeArcs [:r] ] )
+      branches.append ( ( arcs ( [i], [j] ), forced ) )
+    return branches
+
+  numNodes = len ( costMatrix )
+  degrees = numpy.bincount ( node.oneTree.ravel (), minlength = numNodes )
+  v = degrees.argmax ()
+  incident = node.oneTree [ ( node.oneTree == v ).any ( axis = 1 ) ]
+  others = incident.sum ( axis = 1 ) - v
+  a, b = others [ numpy.argsort ( costMatrix [v, others] ) [:2] ]
+
+  def bothWays ( nodes ):
+    hub = [v] * len ( nodes )
+    return arcs ( hub + list ( nodes ), list ( nodes ) + hub )
+
+  usesBoth = [ other for other in range ( numNodes ) if other not in ( v, a, b ) ]
+  return [ ( bothWays ( [a] ), None ), ( bothWays ( [b] ), None ), ( bothWays ( usesBoth ), None ) ]
+
+def _tourCost ( costMatrix, tour ):
+  return costMatrix [ tour, numpy.roll ( tour, -1 ) ].sum ()
+
+def _solution ( costMatrix, tour ):
+  # TSP () returns the best tour as an AssignmentProblem, None if there is none.
+  if tour is None:
+    return None
+  return _assignmentFromTour ( costMatrix, tour )
+
+def TSP (costMatrix, initialTourMethod = 'best', bound = 'assignment',
+         dynamicProgrammingBelow = _DYNAMIC_PROGRAMMING_BELOW, processes = 1, nodesPerBatch = None,
+         search = 'bestFirst', maxQueuedNodes = None, maxQueueBytes = None, spillDirectory = None,
+         checkpointPath = None, checkpointInterval = _CHECKPOINT_INTERVAL, memoSize = _MEMO_SIZE,
+         statistics = None):
+
+  '''
+
+  - This is a branch and bound implementation of the TSP.
+
+  - This works by utilizing the least cost assignment procedure which
+    returns multiple mini-circuits.
 
   - By systematically increasing the costs on edges in the mini-circuits,
-    the circuits coalesce into larger ones. 
+    the circuits coalesce into larger ones. Each child of a sub-problem
+    forbids one arc of a circuit and forces the arcs before it (see
+    _branchConstraints ()), so the children share no tours; forced arcs are
+    contracted out of the assignment, which shrinks as the search deepens.
+
+  - Each sub-problem is a BranchNode, which keeps only the arcs it forbids
+    beyond its parent's, its bound, and its O(n) assignment; the full set of
+    constraints is applied to a copy of the cost matrix only while it is
+    solved, from its parent's assignment.
+
+  - The search starts with a tour built by TourConstruction.construct_tour
+    (initialTourMethod, None to skip) and improved by
+    LinKernighan.LinKernighan () as the best solution so far. Sub-problems
+    whose bound is at least the cost of the best solution are never
+    queued, so pruning starts from the first node.
+
+  - bound = 'heldKarp' (symmetric matrices only) bounds each sub-problem by
+    the better of its assignment cost and its Held-Karp 1-tree bound
+    (see _boundNode ()), which is much the tighter. Each child starts its
+    subgradient search from its parent's node penalties. Since the 1-tree
+    bound can only rise when an edge is forbidden both ways round,
+    sub-problems are then split on the 1-tree rather than the assignment's
+    circuits, at a node where it has three edges or more (see
+    _branchConstraints ()). A sub-problem whose 1-tree is a tour is solved
+    by that tour.
+
+  - bound = 'additive' (for asymmetric matrices) adds a Fischetti-Toth
+    arborescence bound on the reduced costs left by each sub-problem's
+    assignment on to its assignment cost.
+
+  - Instances of fewer than dynamicProgrammingBelow nodes are instead solved
+    by HeldKarpDP.HeldKarpDP (), whose time does not depend on the costs, so
+    they never take the branch and bound's worst case. Set it to 0 to always
+    branch and bound.
+
+  - processes > 1 (None for every core) solves the children of the best
+    nodesPerBatch sub-problems (default 4 per process) at a time across a
+    pool of processes, each child bounded against the best tour known when
+    the batch started. For a given nodesPerBatch the search, and so the tour
+    returned, is the same with any number of processes.
+
+  - search picks the next sub-problems to expand: 'bestFirst' (lowest bound
+    first, the fewest expanded but an unbounded queue), 'depthFirst' (the
+    latest children first, finding tours early in little memory) or 'hybrid'
+    (best first, diving depth first while maxQueuedNodes, default 100000, or
+    maxQueueBytes are queued). Given a spillDirectory, sub-problems beyond
+    the cap are instead written to disk there, and the search stays best
+    first. See _SearchQueue.
+
+  - To stop early, on a time or node limit or within a gap of the bound, see
+    solve (), or improvingSolutions () for each better tour as it is found.
+
+  - With a checkpointPath the state of the search is written there every
+    checkpointInterval seconds (in the background) and when it stops, and
+    resume ( checkpointPath ) carries it on, e.g. after the process is
+    killed. See _BranchAndBound.
+
+  - With bound = 'heldKarp' a sub-problem reached again down another branch
+    is dropped before it is solved, while its constraints are among the
+    memoSize (0 for none) last seen. Given a dict as statistics, the memo's
+    memoHits and memoMisses are put in it, with its memoEntries and the
+    nodesExpanded, to size it by. See _SubProblemMemo.
 
-  ''' 
+  '''
+
+  tour = None
+  for tour, cost, lowerBound, gap in _branchAndBound ( costMatrix, None, None, 0.0, initialTourMethod, bound,
+                                                       dynamicProgrammingBelow, processes, nodesPerBatch,
+                                                       search, maxQueuedNodes, maxQueueBytes, spillDirectory,
+                                                       checkpointPath, checkpointInterval, memoSize, statistics ):
+    pass
+
+  return _solution ( costMatrix, tour )
+
+def solve ( costMatrix, timeLimit = None, nodeLimit = None, gap = 0.0, **tspOptions ):
+
+  '''
+
+  The branch and bound of TSP (), stopped early if need be: after timeLimit
+  seconds, after nodeLimit sub-problems have been expanded, or once the best
+  tour is within gap (a fraction of its cost) of the lower bound. Any other
+  keyword arguments are passed as for TSP ().
+
+  timeLimit is a soft limit, and counts the work at the root too: the
+  constructed tour is taken (and yielded by improvingSolutions ()) before
+  Lin-Kernighan improves it in the time left, and small instances are only
+  solved by dynamic programming if it should finish in time, else they are
+  branched and bounded. It can be overrun by one step of the search, e.g.
+  the root's assignment, or a sub-problem's bound.
+
+  Returns ( tour, cost, lowerBound, gap ): the best tour found (a list of
+  nodes) and its cost, the lowest bound of any sub-problem left (so no tour
+  costs less), and ( cost - lowerBound ) / cost, 0.0 when the tour is
+  optimal.
+
+  Example (not for doctest)
+
+  tour, cost, lowerBound, gap = solve ( costMatrix, timeLimit = 10, bound = 'heldKarp' )
+
+  '''
+
+  result = None
+  for result in improvingSolutions ( costMatrix, timeLimit, nodeLimit, gap, **tspOptions ):
+    pass
+  return result
+
+def improvingSolutions ( costMatrix, timeLimit = None, nodeLimit = None, gap = 0.0, **tspOptions ):
+
+  '''
+
+  As solve (), but a generator of its ( tour, cost, lowerBound, gap ) each
+  time a better tour is found, the first being the initial tour. The last is
+  yielded when the search stops, and so may repeat the tour before it with a
+  higher lowerBound. The time limit runs from the first next ().
+
+  Example (not for doctest)
+
+  for tour, cost, lowerBound, gap in improvingSolutions ( costMatrix, timeLimit = 60 ):
+    planner.useTour ( tour )
+
+  '''
+
+  return _branchAndBound ( costMatrix, timeLimit, nodeLimit, gap, **tspOptions )
+
+def resume ( path, timeLimit = None, nodeLimit = None, gap = None, statistics = None ):
+
+  '''
 
+  Carry on a run of TSP (), solve () or improvingSolutions () which was given
+  a checkpointPath, from the checkpoint it last wrote at path, e.g. after the
+  process was killed. Returns as solve ().
+
+  The limits default to those the run was started with; the time and the
+  sub-problems expanded count from the start of the first run. Checkpoints
+  go on being written to the same path. The open sub-problems are read back
+  with their bounds and constraints only, and are solved again as they are
+  taken. statistics is as for TSP (); the memo starts empty, so its counts
+  are of this run alone.
+
+  Example (not for doctest)
+
+  tour, cost, lowerBound, gap = resume ( '/var/tmp/depots.checkpoint' )
+
+  '''
+
+  with open ( path, 'rb' ) as checkpointFile:
+    checkpoint = cPickle.load ( checkpointFile )
+
+  if checkpoint.get ( 'version' ) != _CHECKPOINT_VERSION:
+    raise ValueError ( path + " is not a TSP checkpoint" )
+
+  limits = [ limit if limit is not None else savedLimit
+             for limit, savedLimit in zip ( ( timeLimit, nodeLimit, gap ), checkpoint ['limits'] ) ]
+
+  checkpoint ['options'] ['statistics'] = statistics
+  _initStatistics ( statistics )
+
+  result = None
+  for result in _BranchAndBound.fromCheckpoint ( checkpoint, limits ).search ():
+    pass
+  return result
+
+def _branchAndBound ( costMatrix, timeLimit, nodeLimit, gap, initialTourMethod = 'best', bound = 'assignment',
+                      dynamicProgrammingBelow = _DYNAMIC_PROGRAMMING_BELOW, processes = 1, nodesPerBatch = None,
+                      search = 'bestFirst', maxQueuedNodes = None, maxQueueBytes = None, spillDirectory = None,
+                      checkpointPath = None, checkpointInterval = _CHECKPOINT_INTERVAL, memoSize = _MEMO_SIZE,
+                      statistics = None ):
+
+  '''
+  Check the options, and return the generator of solutions of _searchTours ().
+  '''
 
-  currentAssignmentProblem = AssignmentProblem ( costMatrix )
-  currentAssignmentProblem.doAssignment ()
+  if bound not in ( 'assignment', 'heldKarp', 'additive' ):
+    raise ValueError ( "Unknown bound " + str ( bound ) )
+  if search not in ( 'bestFirst', 'depthFirst', 'hybrid' ):
+    raise ValueError ( "Unknown search " + str ( search ) )
 
-  if (len ( currentAssignmentProblem.getAllCircuits ()  )  == 1   ):
-    return currentAssignmentProblem
+  if bound == 'heldKarp':
+    offDiagonal = ~ numpy.eye ( len ( costMatrix ), dtype = bool )
+    if not ( costMatrix == costMatrix.T ) [offDiagonal].all ():
+      raise ValueError ( "The heldKarp bound needs a symmetric cost matrix" )
 
-  subProblemsOrderedByCost = []
+  if nodesPerBatch is None:
+    nodesPerBatch = 1 if processes == 1 else 4 * processes
+
+  options = dict ( initialTourMethod = initialTourMethod, bound = bound, dynamicProgrammingBelow = dynamicProgrammingBelow,
+                   processes = processes, nodesPerBatch = nodesPerBatch, search = search, maxQueuedNodes = maxQueuedNodes,
+                   maxQueueBytes = maxQueueBytes, spillDirectory = spillDirectory, checkpointPath = checkpointPath,
+                   checkpointInterval = checkpointInterval, memoSize = memoSize, statistics = statistics )
+  _initStatistics ( statistics )
+
+  return _searchTours ( costMatrix, ( timeLimit, nodeLimit, gap ), options )
+
+def _initStatistics ( statistics ):
+  # Until _BranchAndBound.updateStatistics (), as for a search settled without branching.
+  if statistics is not None:
+    statistics.update ( memoHits = 0, memoMisses = 0, memoEntries = 0, nodesExpanded = 0 )
+
+def _result ( tour, cost, lowerBound ):
+  # As yielded by _searchTours ().
+  if tour is None:
+    return None, numpy.inf, lowerBound, numpy.inf
+  lowerBound = min ( lowerBound, cost )
+  if lowerBound >= cost:
+    return tour, cost, lowerBound, 0.0
+  return tour, cost, lowerBound, ( cost - lowerBound ) / float ( abs ( cost ) )
+
+def _searchTours ( costMatrix, limits, options ):
+
+  '''
+  Solve the root and, unless that settles it, branch and bound from it (see
+  _BranchAndBound), yielding ( tour, cost, lowerBound, gap ) as described
+  for improvingSolutions ().
+  '''
+
+  startTime = time.time ()
+  timeLimit = limits [0]
+  numNodes = len ( costMatrix )
+
+  def timeLeft ():
+    if timeLimit is None:
+      return None
+    return max ( 0.0, timeLimit - ( time.time () - startTime ) )
+
+  # With a time limit the dynamic programme waits for the initial tour, and
+  # is only run if it should finish in the time left.
+  dynamicProgramming = numNodes < options ['dynamicProgrammingBelow']
+  if dynamicProgramming and timeLimit is None:
+    tour, cost = HeldKarpDP.HeldKarpDP ( costMatrix )
+    for result in _settledSearch ( costMatrix, limits, options, tour, cost, startTime ):
+      yield result
+    return
+
+  bound = options ['bound']
+  numpy.fill_diagonal ( costMatrix, _INFINITY )
+  integerCosts = ( costMatrix == numpy.round ( costMatrix ) ).all ()
+
+  currentNode = BranchNode ()
+  rootCosts = costMatrix.copy ()
+  _assignNode ( currentNode, rootCosts )
+
+  rootCircuits = currentNode.getAllCircuits ()
+  if len ( rootCircuits ) == 1:
+    for result in _settledSearch ( costMatrix, limits, options, rootCircuits [0], currentNode.assignmentCost, startTime ):
+      yield result
+    return
 
   lowestCost = 1000000000000000000
-  minCostProb = None
+  incumbentTour = None
+
+  if options ['initialTourMethod'] is not None:
+    initialTour, initialCost = TourConstruction.construct_tour ( costMatrix, options ['initialTourMethod'] )
+    constructedCost = _tourCost ( costMatrix, initialTour )
+
+    # Under a time limit the constructed tour is usable at once, and
+    # Lin-Kernighan gets only the time left.
+    if timeLimit is not None and currentNode.bound < constructedCost:
+      yield _result ( initialTour, constructedCost, currentNode.bound )
+
+    tourCosts = numpy.array ( costMatrix, dtype = float )
+    numpy.fill_diagonal ( tourCosts, 0 )
+    incumbentTour, initialCost = LinKernighan.LinKernighan ( tourCosts, initialTour, timeLimit = timeLeft () )
+    lowestCost = _tourCost ( costMatrix, incumbentTour )
+
+    if currentNode.bound >= lowestCost:
+      for result in _settledSearch ( costMatrix, limits, options, incumbentTour, lowestCost, startTime ):
+        yield result
+      return
+    if timeLimit is None or lowestCost < constructedCost:
+      yield _result ( incumbentTour, lowestCost, currentNode.bound )
+
+  if dynamicProgramming:
+    if _DYNAMIC_PROGRAMMING_SECONDS * 2 ** numNodes * numNodes ** 2 <= timeLeft ():
+      tour, cost = HeldKarpDP.HeldKarpDP ( costMatrix )
+      for result in _settledSearch ( costMatrix, limits, options, tour, cost, startTime ):
+        yield result
+      return
+    logging.debug ( "No time for dynamic programming on " + str ( numNodes ) + " nodes" )
+
+  # Once time is up the search stops at the root, on its assignment bound.
+  if timeLeft () != 0:
+    _boundNode ( currentNode, costMatrix, rootCosts, bound,
+                 lowestCost if incumbentTour is not None else None, integerCosts )
+
+  oneTreeTour = currentNode.getOneTreeTour ()
+  if oneTreeTour is not None and currentNode.bound < lowestCost:
+    incumbentTour, lowestCost = oneTreeTour, _tourCost ( costMatrix, oneTreeTour )
+  if currentNode.bound >= lowestCost or oneTreeTour is not None:
+    for result in _settledSearch ( costMatrix, limits, options, incumbentTour, lowestCost, startTime ):
+      yield result
+    return
+
+  branchAndBound = _BranchAndBound ( costMatrix, limits, options, integerCosts, incumbentTour, lowestCost, 0,
+                                     time.time () - startTime, [ currentNode ] )
+  for result in branchAndBound.search ():
+    yield result
+
+def _settledSearch ( costMatrix, limits, options, tour, cost, startTime ):
 
-  while (True):
+  '''
+  The result of a search settled without branching, which is optimal, as
+  _searchTours () yields it, with a checkpoint written too if asked for.
+  '''
 
-    if len ( subProblemsOrderedByCost ) > 0:
-     currentAssignmentProblem  = heapq.heappop ( subProblemsOrderedByCost )
+  if options ['checkpointPath'] is None:
+    yield _result ( tour, cost, cost )
+    return
 
-     if currentAssignmentProblem.getTotalCost () > lowestCost:
-       # Our lowest unconstrained problem is better than our best 
-       # constrained solution. No further branching needed.
+  branchAndBound = _BranchAndBound ( costMatrix, limits, options, False, tour, cost, 0, time.time () - startTime, [] )
+  for result in branchAndBound.search ():
+    yield result
 
-       return minCostProb
+class _BranchAndBound:
 
-    allCircuitsList = currentAssignmentProblem.getAllCircuits ()
-    smallestCircuitTuplesList = allCircuitsList [0]
+  '''
 
-    while (len ( smallestCircuitTuplesList) > 0):
-  
-      # In turn, make infinite each of the arcs in the first circuit
+  The branch and bound of _searchTours () once the root is solved: its state
+  (the costs and options, the open sub-problems, the best tour and the
+  counters) and the search through it, search ().
 
-      thisTuple = smallestCircuitTuplesList.pop ()
+  With a checkpointPath the state is written there every checkpointInterval
+  seconds, and when the search stops, from which resume () can carry on.
+  A checkpoint holds the open sub-problems' bounds, and the constraints each
+  adds to its parent's for them and their ancestors, each only once. So the
+  same parent is not stored for each of its children, and no assignment
+  is stored at all: a sub-problem read back is solved again (cold) when
+  it is taken, keeping the higher of its old and new bounds.
 
-      childAssignment = AssignmentProblem ( currentAssignmentProblem.costMatrix, 
-                                            currentAssignmentProblem.getAllConstraints() )
+  '''
 
-      childAssignment.addConstraint ( thisTuple ) 
-      childAssignment.doAssignment ()
+  def __init__ (self, costMatrix, limits, options, integerCosts, incumbentTour, lowestCost, nodesExpanded, elapsed,
+                openNodes):
+
+    self.costMatrix    = costMatrix
+    self.timeLimit, self.nodeLimit, self.gap = limits
+    self.options       = options
+    self.integerCosts  = integerCosts
+    self.incumbentTour = incumbentTour
+    self.lowestCost    = lowestCost
+    self.nodesExpanded = nodesExpanded
+    self.startTime     = time.time () - elapsed
+    self.openNodes     = openNodes
+
+    self.subProblems  = None
+    self.childSolver  = None
+    # Only the 1-tree's children can meet again (see _SubProblemMemo).
+    memoSize = options.get ( 'memoSize', _MEMO_SIZE ) if options ['bound'] == 'heldKarp' else 0
+    self.memo         = _SubProblemMemo ( memoSize )
+    self.checkpointer = _Checkpointer ( options ['checkpointPath'], options ['checkpointInterval'] )
+
+  def getIncumbentCost (self):
+    if self.incumbentTour is None:
+      return None
+    return self.lowestCost
+
+  def updateStatistics (self):
+    statistics = self.options.get ( 'statistics' )
+    if statistics is not None:
+      statistics.update ( memoHits = self.memo.hits, memoMisses = self.memo.misses,
+                          memoEntries = len ( self.memo.keys ), nodesExpanded = self.nodesExpanded )
+
+  def search (self):
 
-      if ( len ( childAssignment.getAllCircuits () ) == 1 ):
+    '''
+    Generator of ( tour, cost, lowerBound, gap ) for each better tour found,
+    and once the search stops.
+    '''
 
-        # We have found a solution, this may be THE solution
-        # once all searching is complete.
- 
-        if childAssignment.getTotalCost () < lowestCost:
-          print "lowest cost set"
-          lowestCost  = childAssignment.getTotalCost () 
-          minCostProb = childAssignment
+    bound = self.options ['bound']
+    useOneTree = bound == 'heldKarp'
+
+    self.subProblems = _SearchQueue ( self.options ['search'], self.options ['maxQueuedNodes'],
+                                      self.options ['maxQueueBytes'], self.options ['spillDirectory'] )
+    self.subProblems.push ( self.openNodes )
+    self.openNodes = None
+
+    try:
+      self.childSolver = _ChildSolver ( self.costMatrix, self.options ['processes'] )
+      currentNode = self.subProblems.pop ( self.lowestCost )
+
+      while currentNode is not None:
+
+        limitReached = ( ( self.timeLimit is not None and time.time () - self.startTime >= self.timeLimit ) or
+                         ( self.nodeLimit is not None and self.nodesExpanded >= self.nodeLimit ) )
+        if limitReached or ( self.gap > 0 and self.incumbentTour is not None ):
+          lowerBound = min ( currentNode.bound, self.subProblems.getLowestBound () )
+          if limitReached or _result ( self.incumbentTour, self.lowestCost, lowerBound ) [3] <= self.gap:
+            self.checkpointer.write ( self.getCheckpoint ( [ currentNode ] ), wait = True )
+            self.updateStatistics ()
+            yield _result ( self.incumbentTour, self.lowestCost, lowerBound )
+            return
+
+        if self.checkpointer.isDue ():
+          self.checkpointer.write ( self.getCheckpoint ( [ currentNode ] ) )
+
+        # Expand up to nodesPerBatch of the next sub-problems at once. All their
+        # children are solved against the incumbent as it was at the start of
+        # the batch, then taken in order, so the search does not depend on
+        # which process finishes first.
+        batch = [ currentNode ]
+        while len ( batch ) < self.options ['nodesPerBatch']:
+          nextNode = self.subProblems.pop ( self.lowestCost )
+          if nextNode is None:
+            break
+          batch.append ( nextNode )
+
+        # Sub-problems read back from a checkpoint are solved again, and
+        # then taken as children are.
+        restored = [ node for node in batch if node.successors is None ]
+        batch = [ node for node in batch if node.successors is not None ]
+        for node in restored:
+          savedBound = node.bound
+          _solveNode ( node, self.costMatrix, bound, self.getIncumbentCost (), self.integerCosts )
+          node.bound = max ( node.bound, savedBound )
+
+        self.nodesExpanded = self.nodesExpanded + len ( batch )
+
+        tasks = [ ( parentNode, constraint, forced ) for parentNode in batch
+                  for constraint, forced in _branchConstraints ( parentNode, self.costMatrix, useOneTree ) ]
+        tasks = self.memo.dropDuplicates ( tasks, len ( self.costMatrix ) )
+        children = restored + self.childSolver.solve ( tasks, bound, self.getIncumbentCost (), self.integerCosts )
+
+        for parentNode in batch:
+          parentNode.release ()
+
+        improved = False
+        openChildren = []
+        for childNode in children:
+
+          circuits = childNode.getAllCircuits ()
+
+          if ( len ( circuits ) == 1 ):
+
+            # We have found a solution, this may be THE solution
+            # once all searching is complete.
+
+            if childNode.assignmentCost < self.lowestCost:
+              self.lowestCost    = childNode.assignmentCost
+              self.incumbentTour = circuits [0]
+              improved           = True
+
+          elif childNode.getOneTreeTour () is not None:
+
+            # A 1-tree which is a tour solves the child outright.
+            if childNode.bound < self.lowestCost:
+              self.incumbentTour = childNode.getOneTreeTour ()
+              self.lowestCost    = _tourCost ( self.costMatrix, self.incumbentTour )
+              improved           = True
+
+          elif childNode.bound < self.lowestCost:
+            openChildren.append ( childNode )
+
+        self.subProblems.push ( openChildren )
+        currentNode = self.subProblems.pop ( self.lowestCost )
+
+        if improved and currentNode is not None:
+          logging.debug ( "Better tour of cost " + str ( self.lowestCost ) + " after " + str ( self.nodesExpanded ) + " sub-problems" )
+          self.updateStatistics ()
+          yield _result ( self.incumbentTour, self.lowestCost, min ( currentNode.bound, self.subProblems.getLowestBound () ) )
+
+      # No sub-problem left is bounded below our best constrained
+      # solution. No further branching needed.
+
+      self.checkpointer.write ( self.getCheckpoint ( [] ), wait = True )
+      logging.debug ( "Sub-problem memo: " + str ( self.memo.hits ) + " hits, " + str ( self.memo.misses ) + " misses" )
+      self.updateStatistics ()
+      yield _result ( self.incumbentTour, self.lowestCost, self.lowestCost )
+
+    finally:
+      if self.childSolver is not None:
+        self.childSolver.close ()
+      self.subProblems.close ()
+      self.checkpointer.close ()
+
+  def getCheckpoint (self, openNodes):
+
+    '''
+    The state to write to a checkpoint, with openNodes taken out of the queue
+    but not yet expanded.
+    '''
+
+    openNodes = list ( openNodes ) + self.subProblems.getNodes ()
+
+    # The open nodes and their ancestors, each ancestor before its descendants.
+    indices = {}
+    parents, constraints, forced = [], [], []
+    for node in openNodes:
+      newNodes = []
+      while node is not None and id ( node ) not in indices:
+        newNodes.append ( node )
+        node = node.parent
+      for node in reversed ( newNodes ):
+        indices [ id ( node ) ] = len ( parents )
+        parents.append ( -1 if node.parent is None else indices [ id ( node.parent ) ] )
+        constraints.append ( node.constraint )
+        forced.append ( node.forced )
+
+    return dict ( version = _CHECKPOINT_VERSION, costMatrix = self.costMatrix, options = dict ( self.options, statistics = None ),
+                  limits = ( self.timeLimit, self.nodeLimit, self.gap ), integerCosts = self.integerCosts,
+                  incumbentTour = self.incumbentTour, lowestCost = self.lowestCost,
+                  nodesExpanded = self.nodesExpanded, elapsed = time.time () - self.startTime,
+                  parents = numpy.array ( parents, dtype = numpy.int32 ),
+                  constraints = _packArcs ( constraints ), forced = _packArcs ( forced ),
+                  openNodes = numpy.array ( [ indices [ id ( node ) ] for node in openNodes ], dtype = numpy.int32 ),
+                  bounds = numpy.array ( [ node.bound for node in openNodes ], dtype = float ) )
+
+  @staticmethod
+  def fromCheckpoint (checkpoint, limits):
+
+    nodes = []
+    for parent, constraint, forced in zip ( checkpoint ['parents'], _unpackArcs ( checkpoint ['constraints'] ),
+                                            _unpackArcs ( checkpoint ['forced'] ) ):
+      nodes.append ( BranchNode ( nodes [parent] if parent >= 0 else None, constraint, forced ) )
+
+    openNodes = [ nodes [index] for index in checkpoint ['openNodes'] ]
+    for node, bound in zip ( openNodes, checkpoint ['bounds'] ):
+      node.bound = bound
+
+    return _BranchAndBound ( checkpoint ['costMatrix'], limits, checkpoint ['options'], checkpoint ['integerCosts'],
+                             checkpoint ['incumbentTour'], checkpoint ['lowestCost'], checkpoint ['nodesExpanded'],
+                             checkpoint ['elapsed'], openNodes )
+
+def _packArcs ( arcsList ):
+
+  '''
+  A list of ( fromNodes, toNodes ) (or None) as three flat arrays: all of the
+  fromNodes, all of the toNodes, and where each list item's start.
+  '''
+
+  arcsList = [ arcs if arcs is not None else ( [], [] ) for arcs in arcsList ]
+  lengths = [ len ( arcs [0] ) for arcs in arcsList ]
+  starts = numpy.concatenate ( ( [0], numpy.cumsum ( lengths ) ) ).astype ( numpy.int64 )
+  fromNodes = numpy.concatenate ( [ arcs [0] for arcs in arcsList ] + [ [] ] ).astype ( numpy.int32 )
+  toNodes = numpy.concatenate ( [ arcs [1] for arcs in arcsList ] + [ [] ] ).astype ( numpy.int32 )
+  return fromNodes, toNodes, starts
+
+def _unpackArcs ( packedArcs ):
+  fromNodes, toNodes, starts = packedArcs
+  return [ ( fromNodes [start:end], toNodes [start:end] ) if end > start else None
+           for start, end in zip ( starts [:-1], starts [1:] ) ]
+
+class _Checkpointer:
+
+  '''
+  Writes the checkpoints of a _BranchAndBound to path (if not None), each
+  in a background thread, first to a temporary file which is then renamed
+  over the last checkpoint, so that the one on disk is always whole.
+  '''
+
+  def __init__ (self, path, interval):
+    self.path      = path
+    self.interval  = interval
+    self.lastWrite = time.time ()
+    self.writer    = None
+
+  def isDue (self):
+    return ( self.path is not None and time.time () - self.lastWrite >= self.interval and
+             ( self.writer is None or not self.writer.is_alive () ) )
+
+  def write (self, checkpoint, wait = False):
+    if self.path is None:
+      return
+    self.close ()
+    self.lastWrite = time.time ()
+    self.writer = threading.Thread ( target = _writeCheckpoint, args = ( checkpoint, self.path ) )
+    self.writer.start ()
+    if wait:
+      self.close ()
+
+  def close (self):
+    if self.writer is not None:
+      self.writer.join ()
+      self.writer = None
+
+def _writeCheckpoint ( checkpoint, path ):
+  temporaryPath = path + '.tmp'
+  with open ( temporaryPath, 'wb' ) as checkpointFile:
+    cPickle.dump ( checkpoint, checkpointFile, cPickle.HIGHEST_PROTOCOL )
+  os.rename ( temporaryPath, path )
+  logging.debug ( "Checkpoint written to " + path )
+
+class _SearchQueue:
+
+  '''
+
+  The sub-problems TSP () has yet to expand, taken in the order of search:
+
+  - 'bestFirst': lowest bound first, from a heap. The fewest sub-problems
+    are expanded, but the heap can grow without limit.
+  - 'depthFirst': the latest children first, from a stack, the child of
+    lowest bound on top. Tours, and so pruning, are found early, and only
+    the siblings along the current path are kept.
+  - 'hybrid': best first until the heap holds maxQueuedNodes sub-problems,
+    or maxQueueBytes of arrays (see BranchNode.getMemory ()). While it is
+    full, children go to the stack instead, so each node taken from the heap
+    starts a depth first dive, and the heap does not grow.
+
+  With a spillDirectory a full heap instead has its worse half written to a
+  file there (and read back once it holds the lowest bound), so the search
+  is best first within a fixed memory budget. Spilled nodes are written
+  with all of their constraints and read back standing alone, as the
+  worker processes' parents are (see _solveChildInWorker ()).
+
+  '''
+
+  def __init__ (self, search, maxQueuedNodes = None, maxQueueBytes = None, spillDirectory = None):
+
+    self.search = search
+    self.heap   = []
+    self.stack  = []
+    self.queuedBytes = 0
+
+    if maxQueuedNodes is None and maxQueueBytes is None and ( search == 'hybrid' or spillDirectory is not None ):
+      maxQueuedNodes = _MAX_QUEUED_NODES
+    self.maxQueuedNodes = maxQueuedNodes
+    self.maxQueueBytes  = maxQueueBytes
+
+    self.spillDirectory = None
+    self.spillFiles     = []  # heap of ( lowest bound, path )
+    self.numSpills      = 0
+    if spillDirectory is not None:
+      self.spillDirectory = tempfile.mkdtemp ( prefix = 'tsp-', dir = spillDirectory )
+
+  def isFull (self):
+    return ( ( self.maxQueuedNodes is not None and len ( self.heap ) >= self.maxQueuedNodes ) or
+             ( self.maxQueueBytes is not None and self.queuedBytes >= self.maxQueueBytes ) )
+
+  def push (self, nodes):
+
+    '''
+    Queue the children of the last sub-problems expanded.
+    '''
+
+    if self.search == 'depthFirst' or ( self.search == 'hybrid' and self.spillDirectory is None and self.isFull () ):
+      self.stack.extend ( sorted ( nodes, key = lambda node: node.bound, reverse = True ) )
+      return
+
+    for node in nodes:
+      heapq.heappush ( self.heap, node )
+      self.queuedBytes += node.getMemory ()
+
+    if self.spillDirectory is not None and self.isFull ():
+      self._spill ()
+
+  def pop (self, upperBound):
+
+    '''
+    The next sub-problem to expand, None once no sub-problem left has a bound
+    below upperBound.
+    '''
+
+    while len ( self.stack ) > 0:
+      node = self.stack.pop ()
+      if node.bound < upperBound:
+        return node
+
+    if len ( self.spillFiles ) > 0 and ( len ( self.heap ) == 0 or self.spillFiles [0] [0] < self.heap [0].bound ):
+      self._unspill ()
+
+    if len ( self.heap ) == 0 or self.heap [0].bound >= upperBound:
+      return None
+
+    node = heapq.heappop ( self.heap )
+    self.queuedBytes -= node.getMemory ()
+    return node
+
+  def getLowestBound (self):
+
+    '''
+    The lowest bound of any sub-problem queued (numpy.inf if none are).
+    '''
+
+    bounds = [ node.bound for node in self.stack ]
+    if len ( self.heap ) > 0:
+      bounds.append ( self.heap [0].bound )
+    if len ( self.spillFiles ) > 0:
+      bounds.append ( self.spillFiles [0] [0] )
+    return min ( bounds ) if len ( bounds ) > 0 else numpy.inf
+
+  def __len__ (self):
+    return len ( self.heap ) + len ( self.stack )
+
+  def _spill (self):
+
+    nodes = sorted ( self.heap )
+    keep = len ( nodes ) // 2
+    self.heap = nodes [:keep]  # sorted, so still a heap
+    self.queuedBytes = sum ( [ node.getMemory () for node in self.heap ] )
+
+    path = os.path.join ( self.spillDirectory, 'nodes' + str ( self.numSpills ) + '.pickle' )
+    self.numSpills = self.numSpills + 1
+    with open ( path, 'wb' ) as spillFile:
+      cPickle.dump ( [ ( node.getConstraints (), node.getForcedArcs (), node.getSolveState () ) for node in nodes [keep:] ],
+                     spillFile, cPickle.HIGHEST_PROTOCOL )
+    heapq.heappush ( self.spillFiles, ( nodes [keep].bound, path ) )
+
+    logging.debug ( "Spilled " + str ( len ( nodes ) - keep ) + " sub-problems to " + path )
+
+  def _unspill (self):
+
+    lowestBound, path = heapq.heappop ( self.spillFiles )
+    for node in self._readSpillFile ( path ):
+      heapq.heappush ( self.heap, node )
+      self.queuedBytes += node.getMemory ()
+    os.remove ( path )
+
+  def _readSpillFile (self, path):
+
+    with open ( path, 'rb' ) as spillFile:
+      records = cPickle.load ( spillFile )
+
+    nodes = []
+    for constraints, forced, solveState in records:
+      node = BranchNode ( None, constraints, forced )
+      node.setSolveState ( solveState )
+      nodes.append ( node )
+    return nodes
+
+  def getNodes (self):
+
+    '''
+    Every sub-problem queued, those spilled read back standing alone.
+    '''
+
+    nodes = self.stack + self.heap
+    for lowestBound, path in self.spillFiles:
+      nodes = nodes + self._readSpillFile ( path )
+    return nodes
+
+  def close (self):
+    if self.spillDirectory is not None:
+      shutil.rmtree ( self.spillDirectory, ignore_errors = True )
+
+class _SubProblemMemo:
+
+  '''
+
+  The keys of the last maxSize sub-problems (none if 0) TSP () has reached,
+  least recently used dropped first: a hash of the whole set of arcs each
+  forbids and of those it forces (see key ()), kept as an OrderedDict with
+  no values.
+
+  The Carpaneto-Toth children of a sub-problem share no tours, so cannot
+  meet again, but the 1-tree's can: a child forbidding v-a whose child
+  forbids v-b is the same sub-problem as its sibling forbidding v-b whose
+  child forbids v-a. Whichever is reached second is a duplicate, whose
+  tours are searched (or were pruned) from the first, and is dropped before
+  it is solved or queued.
+
+  hits counts the duplicates, misses the sub-problems solved, to size it by.
+  A sub-problem whose key has been dropped is solved again.
+
+  '''
+
+  def __init__ (self, maxSize):
+    self.maxSize = maxSize
+    self.keys    = collections.OrderedDict ()
+    self.hits    = 0
+    self.misses  = 0
+
+  @staticmethod
+  def key ( forbidden, forced, numNodes ):
+
+    '''
+    The same for any two sub-problems forbidding, and forcing, the same
+    sets of arcs ( fromNodes, toNodes ), in whatever order: a hash of each
+    set's sorted arcs i * numNodes + j.
+    '''
+
+    forbiddenKeys, forcedKeys = [ numpy.unique ( arcs [0].astype ( numpy.int64 ) * numNodes + arcs [1] ).tobytes ()
+                                  for arcs in ( forbidden, forced ) ]
+    return hashlib.sha1 ( str ( len ( forbiddenKeys ) ) + ':' + forbiddenKeys + forcedKeys ).digest ()
+
+  def dropDuplicates (self, tasks, numNodes):
+
+    '''
+    The ( parentNode, constraint, forced ) tasks of _ChildSolver.solve ()
+    whose children have not been seen before, or earlier in tasks.
+    '''
+
+    if self.maxSize <= 0:
+      return tasks
+
+    def withArcs ( arcs, moreArcs ):
+      if moreArcs is None:
+        return arcs
+      return numpy.concatenate ( ( arcs [0], moreArcs [0] ) ), numpy.concatenate ( ( arcs [1], moreArcs [1] ) )
+
+    parentArcs = {}
+    newTasks = []
+    for task in tasks:
+
+      parentNode, constraint, forced = task
+      if id ( parentNode ) not in parentArcs:
+        parentArcs [ id ( parentNode ) ] = parentNode.getConstraints (), parentNode.getForcedArcs ()
+      forbiddenArcs, forcedArcs = parentArcs [ id ( parentNode ) ]
+      key = self.key ( withArcs ( forbiddenArcs, constraint ), withArcs ( forcedArcs, forced ), numNodes )
+
+      if key in self.keys:
+        self.keys [key] = self.keys.pop ( key )
+        self.hits = self.hits + 1
+        continue
+
+      self.misses = self.misses + 1
+      self.keys [key] = None
+      newTasks.append ( task )
+
+    while len ( self.keys ) > self.maxSize:
+      self.keys.popitem ( last = False )
+
+    return newTasks
+
+class _ChildSolver:
+
+  '''
+  Solves the children of a batch of sub-problems for TSP (), in this process
+  or across a pool of processes. The pool's processes get the cost matrix
+  once, in shared memory and in its own dtype (so their costs are exactly
+  those of this process), and are sent only each parent's constraints and
+  warm start state, never the chain of parents; they send back each child's
+  getSolveState ().
+  '''
+
+  def __init__ (self, costMatrix, processes):
+
+    self.costMatrix = costMatrix
+    self.pool = None
+
+    if processes is None:
+      processes = multiprocessing.cpu_count ()
+
+    if processes > 1:
+      numNodes = len ( costMatrix )
+      sharedCosts = multiprocessing.sharedctypes.RawArray ( 'b', costMatrix.nbytes )
+      numpy.frombuffer ( sharedCosts, dtype = costMatrix.dtype ).reshape ( numNodes, numNodes ) [:] = costMatrix
+      self.pool = multiprocessing.Pool ( processes, _initWorker, ( sharedCosts, costMatrix.dtype, numNodes ) )
+
+  def solve (self, tasks, bound, incumbentCost, integerCosts):
+
+    '''
+    tasks are ( parentNode, constraint, forced ). Returns the children, in
+    the same order.
+    '''
+
+    children = [ BranchNode ( parentNode, constraint, forced ) for parentNode, constraint, forced in tasks ]
+
+    if self.pool is None:
+      for childNode in children:
+        _solveNode ( childNode, self.costMatrix, bound, incumbentCost, integerCosts )
+      return children
+
+    parentConstraints = {}
+    for parentNode, constraint, forced in tasks:
+      if id ( parentNode ) not in parentConstraints:
+        parentConstraints [ id ( parentNode ) ] = ( parentNode.getConstraints (), parentNode.getForcedArcs () )
+
+    states = self.pool.map ( _solveChildInWorker,
+                             [ parentConstraints [ id ( parentNode ) ] +
+                               ( parentNode.getSolveState (), constraint, forced, bound, incumbentCost, integerCosts )
+                               for parentNode, constraint, forced in tasks ] )
+
+    for childNode, state in zip ( children, states ):
+      childNode.setSolveState ( state )
+
+    return children
+
+  def close (self):
+    if self.pool is not None:
+      self.pool.close ()
+      self.pool.join ()
+
+# Worker side. The cost matrix is set once per process by _initWorker ().
+
+_workerCosts = None
+
+def _initWorker ( sharedCosts, dtype, numNodes ):
+  global _workerCosts
+  _workerCosts = numpy.frombuffer ( sharedCosts, dtype = dtype ).reshape ( numNodes, numNodes )
+
+def _solveChildInWorker ( task ):
 
-      heapq.heappush (  subProblemsOrderedByCost , childAssignment ) 
+  parentConstraints, parentForced, parentState, constraint, forced, bound, incumbentCost, integerCosts = task
 
+  # The parent stands alone, holding all of its constraints itself.
+  parentNode = BranchNode ( None, parentConstraints, parentForced )
+  parentNode.setSolveState ( parentState )
 
+  childNode = BranchNode ( parentNode, constraint, forced )
+  _solveNode ( childNode, _workerCosts, bound, incumbentCost, integerCosts )
+  return childNode.getSolveState ()
@@ -0,0 +1,267 @@
+
+# TabuTSP.py
+# Change Log
+# 18/10/2026    - Initial development: tabu search over 2-opt or Or-opt moves
+
+import logging
+import time
+import numpy
+import algorithms.LocalSearch as LS
+import algorithms.TourConstruction as TC
+
+# Longest run of nodes an Or-opt move shifts.
+_OR_OPT_LENGTH = 3
+
+def TabuTSP ( costMatrix, tour = None, timeLimit = 1.0, maxIterations = None, tenure = None, neighbourCount = 8 ):
+
+  '''
+
+  Tabu search heuristic for the TSP, for instances (1k-5k nodes) far too large
+  for the branch and bound in TSP.TSP (). Takes the same cost matrix, symmetric
+  or not.
+
+  The starting tour (a greedy edge tour from TourConstruction.construct_tour () if
+  not given) is first taken to a local optimum with LocalSearch.improve_tour (). Then
+  each iteration makes the best 2-opt or Or-opt move over the neighbour lists, even
+  when it makes the tour worse, so that the search climbs out of local optima:
+
+  - Tabu list: an edge removed by a move may not be added back for tenure
+    iterations. This stops the search undoing its last moves.
+  - Aspiration: a tabu move is allowed anyway if it gives a tour better than the
+    best found so far.
+  - Move-delta cache: the best allowed move of every node is kept, so an
+    iteration does not re-price the whole neighbourhood. After a move only the
+    nodes it touched, the nodes having them as neighbours and the ends of edges
+    coming off the tabu list are re-priced. Since other entries can go stale (a reversal
+    changes which moves are valid), the node picked from the cache is always
+    re-priced before its move is made, and if it is no longer the best another is
+    tried.
+
+  The search stops after timeLimit seconds, maxIterations iterations (default
+  100 n) or when no move is allowed.
+
+  Returns ( tour, cost, costHistory ): the best tour found, its cost, and the cost
+  of the current tour after each iteration, starting with the local optimum.
+
+  Example (not for doctest)
+
+  tour, cost, costHistory = TabuTSP ( costMatrix, timeLimit = 5.0 )
+
+  '''
+
+  costMatrix = numpy.asarray ( costMatrix, dtype = float )
+  numNodes = len ( costMatrix )
+
+  deadline = time.time () + timeLimit
+
+  if tour is None:
+    tour, cost = TC.construct_tour ( costMatrix, 'greedyEdge' )
+  tour, cost = LS.improve_tour ( costMatrix, tour, neighbourCount )
+
+  if numNodes <= 4:
+    return tour, cost, [cost]
+
+  if maxIterations is None:
+    maxIterations = 100 * numNodes
+  if tenure is None:
+    tenure = max ( 2, min ( numNodes // 4, 20 ) )
+
+  search = LS.TourState ( costMatrix, tour, neighbourCount )
+  tabu = _TabuList ( search, tenure )
+
+  currentCost = bestCost = cost
+  bestTour = search.tour.copy ()
+  costHistory = [cost]
+
+  cachedDeltas = tabu.price ( numpy.arange ( numNodes ), 0, currentCost, bestCost ) [0]
+
+  for iteration in range ( 1, maxIterations + 1 ):
+
+    if time.time () > deadline:
+      break
+
+    move = _takeBestMove ( search, tabu, cachedDeltas, iteration, currentCost, bestCost )
+    if move is None:
+      break
+
+    removedEdges = _removedEdges ( search, move )
+    touchedNodes = search.applyMove ( move )
+    tabu.makeTabu ( removedEdges, iteration )
+
+    currentCost = currentCost + move [0]
+    costHistory.append ( currentCost )
+
+    if currentCost < bestCost - search.tolerance:
+      bestCost = currentCost
+      bestTour = search.tour.copy ()
+
+    staleNodes = tabu.nodesToReprice ( touchedNodes, iteration + 1 )
+    cachedDeltas [staleNodes] = tabu.price ( staleNodes, iteration + 1, currentCost, bestCost ) [0]
+
+  logging.debug ( "Tabu search made " + str ( len ( costHistory ) - 1 ) + " moves, best cost " + str ( bestCost ) )
+
+  bestTour = [ int ( node ) for node in bestTour ]
+  return bestTour, TC.tourCost ( costMatrix, bestTour ), costHistory
+
+def _takeBestMove ( search, tabu, cachedDeltas, iteration, currentCost, bestCost ):
+
+  '''
+  The node with the best cached move is re-priced; its move is taken if it is
+  still the best in the cache. Returns the move as LocalSearch.TourState.applyMove ()
+  takes it, or None if no move is allowed.
+  '''
+
+  while True:
+
+    node = cachedDeltas.argmin ()
+    if numpy.isinf ( cachedDeltas [node] ):
+      return None
+
+    deltas, move = tabu.price ( numpy.array ( [node] ), iteration, currentCost, bestCost )
+    cachedDeltas [node] = deltas [0]
+
+    if not numpy.isinf ( deltas [0] ) and deltas [0] <= cachedDeltas.min ():
+      return move ( 0 )
+
+def _removedEdges ( search, move ):
+
+  tour, n = search.tour, search.numNodes
+
+  if move [1] == '2opt':
+    delta, kind, lo, hi = move
+    return [ ( tour [lo], tour [lo + 1] ), ( tour [hi], tour [ ( hi + 1 ) % n ] ) ]
+
+  delta, kind, start, length, after, isReversed = move
+  return [ ( tour [ ( start - 1 ) % n ], tour [start] ), ( tour [ start + length - 1 ], tour [ ( start + length ) % n ] ),
+           ( after, tour [ ( search.position [after] + 1 ) % n ] ) ]
+
+class _TabuList:
+
+  '''
+  The edges removed in the last tenure iterations, as sorted keys min*n + max
+  so that whole arrays of moves can be checked with one searchsorted (). Also
+  the nodes that have each node in their neighbour list, which must be re-priced
+  when its edges change.
+  '''
+
+  def __init__ (self, search, tenure):
+
+    self.search = search
+    self.tenure = tenure
+    self.tabuKeys = numpy.zeros ( 0, dtype = int )
+    self.tabuUntil = numpy.zeros ( 0, dtype = int )
+    self.onTabuEdge = numpy.zeros ( search.numNodes, dtype = bool )
+
+    # Reverse neighbour lists, in CSR layout.
+    numNodes, k = search.neighbours.shape
+    listedNodes = search.neighbours.ravel ()
+    order = listedNodes.argsort ( kind = 'mergesort' )
+    self.reverseNeighbours = numpy.repeat ( numpy.arange ( numNodes ), k ) [order]
+    self.reverseIndptr = numpy.concatenate ( ( [0], numpy.cumsum ( numpy.bincount ( listedNodes, minlength = numNodes ) ) ) )
+
+  def _keys (self, fromNodes, toNodes):
+    return numpy.minimum ( fromNodes, toNodes ) * self.search.numNodes + numpy.maximum ( fromNodes, toNodes )
+
+  def makeTabu (self, removedEdges, iteration):
+
+    '''
+    removedEdges is a list of ( fromNode, toNode ). Expired edges are dropped.
+    '''
+
+    current = self.tabuUntil > iteration
+    newKeys = self._keys ( numpy.array ( [ edge [0] for edge in removedEdges ] ),
+                           numpy.array ( [ edge [1] for edge in removedEdges ] ) )
+
+    keys = numpy.concatenate ( ( self.tabuKeys [current], newKeys ) )
+    untils = numpy.concatenate ( ( self.tabuUntil [current], [ iteration + self.tenure ] * len ( newKeys ) ) )
+
+    order = keys.argsort ()
+    self.tabuKeys, self.tabuUntil = keys [order], untils [order]
+
+    # Only an edge between two of these can be tabu.
+    self.onTabuEdge = numpy.zeros ( self.search.numNodes, dtype = bool )
+    self.onTabuEdge [ keys // self.search.numNodes ] = True
+    self.onTabuEdge [ keys % self.search.numNodes ] = True
+
+  def nodesToReprice (self, touchedNodes, iteration):
+
+    '''
+    The touched nodes and every node having one of them as a neighbour, and the
+    ends of the edges coming off the tabu list at iteration.
+    '''
+
+    listing = [ self.reverseNeighbours [ self.reverseIndptr [node] : self.reverseIndptr [node + 1] ]
+                for node in touchedNodes ]
+
+    expiringKeys = self.tabuKeys [ self.tabuUntil == iteration ]
+    expiringNodes = [ expiringKeys // self.search.numNodes, expiringKeys % self.search.numNodes ]
+
+    return numpy.unique ( numpy.concatenate ( [touchedNodes] + listing + expiringNodes ) ).astype ( int )
+
+  def _isTabu (self, fromNodes, toNodes, iteration):
+
+    isTabu = self.onTabuEdge [fromNodes] & self.onTabuEdge [toNodes]
+    if not isTabu.any ():
+      return isTabu
+
+    fromNodes, toNodes = numpy.broadcast_arrays ( fromNodes, toNodes )
+    suspects = isTabu.copy ()
+    keys = self._keys ( fromNodes [suspects], toNodes [suspects] )
+    found = numpy.minimum ( self.tabuKeys.searchsorted ( keys ), len ( self.tabuKeys ) - 1 )
+    isTabu [suspects] = ( self.tabuKeys [found] == keys ) & ( self.tabuUntil [found] > iteration )
+    return isTabu
+
+  def price (self, nodes, iteration, currentCost, bestCost):
+
+    '''
+    The best allowed move of each of nodes: 2-opt, or Or-opt of a run of 1 to 3
+    nodes starting there (see LocalSearch.TourState). A move is tabu if it adds
+    back a removed edge. Returns the deltas, numpy.inf where nothing is allowed,
+    and a function giving the move of the i'th node.
+    '''
+
+    search = self.search
+    n = search.numNodes
+    tour = search.tour
+    numNodes = len ( nodes )
+
+    twoOptDeltas, lo, hi = search.twoOptMoves ( nodes )
+    x, xNext = tour [lo], tour [ ( lo + 1 ) % n ]
+    y, yNext = tour [hi], tour [ ( hi + 1 ) % n ]
+    forbidden = self._isTabu ( x, y, iteration ) | self._isTabu ( xNext, yNext, iteration )
+    self._forbid ( twoOptDeltas, forbidden, currentCost, bestCost )
+
+    # Or-opt for each run length, one row per ( node, length ).
+    lengths = numpy.repeat ( numpy.arange ( 1, _OR_OPT_LENGTH + 1 ), numNodes )
+    orOptDeltas, starts, candidates = search.orOptMoves ( numpy.tile ( nodes, _OR_OPT_LENGTH ), lengths )
+
+    first, last = tour [starts], tour [ starts + lengths - 1 ]
+    before, after = tour [ ( starts - 1 ) % n ], tour [ ( starts + lengths ) % n ]
+    successors = tour [ ( search.position [candidates] + 1 ) % n ]
+    forbidden = self._isTabu ( before, after, iteration ) [:, None] | self._isTabu ( candidates, successors, iteration )
+    forbidden = numpy.concatenate ( ( forbidden | self._isTabu ( candidates, first [:, None], iteration )
+                                                | self._isTabu ( last [:, None], successors, iteration ),
+                                      forbidden | self._isTabu ( candidates, last [:, None], iteration )
+                                                | self._isTabu ( first [:, None], successors, iteration ) ), axis = 1 )
+    self._forbid ( orOptDeltas, forbidden, currentCost, bestCost )
+
+    # Side by side: the 2-opt moves then each run length's Or-opt moves.
+    orOptWidth = orOptDeltas.shape [1]
+    orOptByNode = orOptDeltas.reshape ( _OR_OPT_LENGTH, numNodes, orOptWidth ).transpose ( 1, 0, 2 )
+    deltas = numpy.concatenate ( ( twoOptDeltas, orOptByNode.reshape ( numNodes, -1 ) ), axis = 1 )
+
+    best = deltas.argmin ( axis = 1 )
+    bestDeltas = deltas [ numpy.arange ( numNodes ), best ]
+
+    def move ( i ):
+      col = best [i]
+      if col < twoOptDeltas.shape [1]:
+        return ( twoOptDeltas [i, col], '2opt', lo [i, col], hi [i, col] )
+      length, col = divmod ( col - twoOptDeltas.shape [1], orOptWidth )
+      return search.orOptMove ( orOptDeltas, starts, candidates, lengths, length * numNodes + i, col )
+
+    return bestDeltas, move
+
+  def _forbid (self, deltas, forbidden, currentCost, bestCost):
+    aspiration = currentCost + deltas < bestCost - self.search.tolerance
+    deltas [ forbidden & ~aspiration ] = numpy.inf
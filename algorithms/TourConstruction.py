@@ -0,0 +1,367 @@
+
+# TourConstruction.py
+# Change Log
+# 18/10/2026    - Initial development: construction heuristics for TSP tours
+
+import logging
+import numpy
+
+'''
+
+Fast construction heuristics for the TSP on the same cost matrix that TSP.TSP ()
+takes. The tours are not optimal but are found in well under a second for
+thousands of nodes. They are useful as the initial incumbent (upper bound) of the
+branch and bound in TSP.TSP (), and as starting points for local search.
+
+A tour is a list of node indices, each node once, e.g. [0,3,1,2] stands for the
+circuit 0->3->1->2->0. Costs are read as costMatrix [from, to], so asymmetric
+matrices are handled. The diagonal is ignored.
+
+'''
+
+METHODS = [ 'nearestNeighbour', 'greedyEdge', 'cheapestInsertion', 'spaceFillingCurve' ]
+
+def construct_tour ( costMatrix, method = 'best', coordinates = None ):
+
+  '''
+  Build a tour with one of the heuristics below:
+
+  'nearestNeighbour'   from node 0 always go to the cheapest unvisited node
+  'greedyEdge'         take the cheapest edges that keep the partial solution a
+                       set of paths, then join up the paths
+  'cheapestInsertion'  grow a circuit by inserting, at each step, the node which
+                       is cheapest to insert anywhere
+  'spaceFillingCurve'  visit the nodes in Hilbert curve order of their positions
+                       (coordinates, if given as an n x 2 array, otherwise a 2D
+                       embedding of the cost matrix)
+  'best'               run all of the above and keep the cheapest
+
+  Returns ( tour, cost ).
+  '''
+
+  if method == 'best':
+    results = [ construct_tour ( costMatrix, thisMethod, coordinates ) for thisMethod in METHODS ]
+    return min ( results, key = lambda result : result [1] )
+
+  if method not in METHODS:
+    raise ValueError ( "Unknown tour construction method: " + str ( method ) )
+
+  costMatrix = numpy.asarray ( costMatrix, dtype = float )
+  numNodes = len ( costMatrix )
+
+  if numNodes <= 2:
+    tour = range ( numNodes )
+  elif method == 'nearestNeighbour':
+    tour = _nearestNeighbourTour ( costMatrix )
+  elif method == 'greedyEdge':
+    tour = _greedyEdgeTour ( costMatrix )
+  elif method == 'cheapestInsertion':
+    tour = _cheapestInsertionTour ( costMatrix )
+  else:
+    tour = _spaceFillingCurveTour ( costMatrix, coordinates )
+
+  tour = [ int ( node ) for node in tour ]
+  cost = tourCost ( costMatrix, tour )
+  logging.debug ( method + " tour of cost " + str ( cost ) )
+  return tour, cost
+
+def tourCost ( costMatrix, tour ):
+
+  '''
+  Total cost of the circuit through the nodes of tour, back to the first.
+  '''
+
+  tour = numpy.asarray ( tour )
+  if len ( tour ) < 2:
+    return 0
+  return costMatrix [ tour, numpy.roll ( tour, -1 ) ].sum ()
+
+def tourToBooleanMatrix ( tour ):
+
+  '''
+  The tour as a boolean successor matrix, i.e. in the form HungarianAssignment ()
+  returns (so a tour can be handled like a single circuit assignment).
+  '''
+
+  tour = numpy.asarray ( tour )
+  booleanMatrix = numpy.zeros ( ( len ( tour ), len ( tour ) ), dtype = bool )
+  booleanMatrix [ tour, numpy.roll ( tour, -1 ) ] = True
+  return booleanMatrix
+
+def _offDiagonal ( costMatrix ):
+  workingMatrix = costMatrix.copy ()
+  numpy.fill_diagonal ( workingMatrix, numpy.inf )
+  return workingMatrix
+
+def _nearestNeighbourTour ( costMatrix ):
+
+  numNodes = len ( costMatrix )
+  visited = numpy.zeros ( numNodes, dtype = bool )
+
+  tour = [0]
+  visited [0] = True
+
+  for step in range ( numNodes - 1 ):
+    # Chosen from the unvisited nodes themselves, as all of them may be at inf.
+    unvisited = numpy.flatnonzero ( ~ visited )
+    nextNode = unvisited [ costMatrix [ tour [-1], unvisited ].argmin () ]
+    tour.append ( nextNode )
+    visited [nextNode] = True
+
+  return tour
+
+def _greedyEdgeTour ( costMatrix, candidatesPerNode = 10 ):
+
+  '''
+  Only the candidatesPerNode cheapest edges out of each node are considered for
+  the greedy phase, which keeps it O(n.k log(n.k)). The resulting paths are then
+  joined up, nearest first (see _joinPaths ()).
+
+  On a symmetric matrix the edges are undirected: a node may take any two edges,
+  and a path may be walked either way. Otherwise each node takes one edge out 
+  and one edge in.
+  '''
+
+  numNodes = len ( costMatrix )
+  workingMatrix = _offDiagonal ( costMatrix )
+  symmetric = ( workingMatrix == workingMatrix.T ).all ()
+
+  k = min ( candidatesPerNode, numNodes - 1 )
+  candidateCols = numpy.argpartition ( workingMatrix, k - 1, axis = 1 ) [:, :k]
+  candidateRows = numpy.repeat ( numpy.arange ( numNodes ), k )
+  candidateCols = candidateCols.ravel ()
+  order = workingMatrix [candidateRows, candidateCols].argsort ( kind = 'mergesort' )
+
+  outEdges = [ [] for node in range ( numNodes ) ]
+  inEdges  = [ [] for node in range ( numNodes ) ]
+
+  # otherEnd [end] is the node at the far end of the path ending at end, which
+  # is what is needed to stop an edge closing a circuit early.
+  otherEnd = numpy.arange ( numNodes )
+  edgesAdded = 0
+
+  for index in order:
+
+    i, j = candidateRows [index], candidateCols [index]
+
+    if symmetric:
+      if len ( outEdges [i] ) + len ( inEdges [i] ) == 2 or len ( outEdges [j] ) + len ( inEdges [j] ) == 2:
+        continue
+    elif len ( outEdges [i] ) == 1 or len ( inEdges [j] ) == 1:
+      continue
+
+    if otherEnd [i] == j:
+      continue
+
+    outEdges [i].append ( j )
+    inEdges [j].append ( i )
+    farEndOfI, farEndOfJ = otherEnd [i], otherEnd [j]
+    otherEnd [farEndOfI] = farEndOfJ
+    otherEnd [farEndOfJ] = farEndOfI
+    edgesAdded = edgesAdded + 1
+
+    if edgesAdded == numNodes - 1:
+      break
+
+  # Walk each path from one of its ends.
+  paths = []
+  visited = numpy.zeros ( numNodes, dtype = bool )
+  for node in range ( numNodes ):
+
+    if visited [node]:
+      continue
+    if symmetric and len ( outEdges [node] ) + len ( inEdges [node] ) == 2:
+      continue
+    if not symmetric and len ( inEdges [node] ) == 1:
+      continue
+
+    path = []
+    while node is not None:
+      path.append ( node )
+      visited [node] = True
+      neighbours = outEdges [node] + inEdges [node] if symmetric else outEdges [node]
+      unvisited = [ neighbour for neighbour in neighbours if not visited [neighbour] ]
+      node = unvisited [0] if len ( unvisited ) > 0 else None
+    paths.append ( path )
+
+  return _joinPaths ( workingMatrix, paths, symmetric )
+
+def _joinPaths ( workingMatrix, paths, reversible ):
+
+  '''
+  Chain the paths into one tour: from the end of the tour so far, go to the
+  cheapest first node (or, if the paths are reversible, either end node) of a 
+  path not yet used.
+  '''
+
+  firstNodes = numpy.array ( [ path [0] for path in paths ] )
+  lastNodes  = numpy.array ( [ path [-1] for path in paths ] )
+  unused = numpy.ones ( len ( paths ), dtype = bool )
+
+  tour = list ( paths [0] )
+  unused [0] = False
+
+  for step in range ( len ( paths ) - 1 ):
+
+    remaining = numpy.where ( unused )[0]
+    toFirst = workingMatrix [ tour [-1], firstNodes [remaining] ]
+    best = toFirst.argmin ()
+    reverse = False
+
+    if reversible:
+      toLast = workingMatrix [ tour [-1], lastNodes [remaining] ]
+      if toLast.min () < toFirst [best]:
+        best = toLast.argmin ()
+        reverse = True
+
+    pathIndex = remaining [best]
+    tour.extend ( paths [pathIndex] [::-1] if reverse else paths [pathIndex] )
+    unused [pathIndex] = False
+
+  return tour
+
+def _cheapestInsertionTour ( costMatrix ):
+
+  '''
+  The circuit is held as a successor array. For every node not yet in the
+  circuit the cheapest edge to insert it into is kept; after an insertion only
+  the nodes whose cheapest edge was the one just split are re-priced against the
+  whole circuit, the others are compared with the two new edges. All of the
+  pricing is vectorised.
+  '''
+
+  numNodes = len ( costMatrix )
+  workingMatrix = _offDiagonal ( costMatrix )
+
+  # Start from the cheapest two node circuit through node 0.
+  second = 1 + ( workingMatrix [0, 1:] + workingMatrix [1:, 0] ).argmin ()
+
+  successor = numpy.array ( [-1] * numNodes )
+  successor [0], successor [second] = second, 0
+  inTour = numpy.zeros ( numNodes, dtype = bool )
+  inTour [ [0, second] ] = True
+
+  # Insertion of node k into edge i->j costs c[i,k] + c[k,j] - c[i,j] (inf
+  # where forbidden arcs leave that undefined).
+  def _insertionCosts ( starts, nodes ):
+    ends = successor [starts]
+    with numpy.errstate ( invalid = 'ignore' ):
+      costs = workingMatrix [ starts [:, None], nodes [None, :] ] + workingMatrix [ nodes [None, :], ends [:, None] ] \
+              - workingMatrix [starts, ends] [:, None]
+    costs [ numpy.isnan ( costs ) ] = numpy.inf
+    return costs
+
+  nodes = numpy.arange ( numNodes )
+  tourNodes = numpy.array ( [0, second] )
+  initialCosts = _insertionCosts ( tourNodes, nodes )
+  bestEdgeStart = tourNodes [ initialCosts.argmin ( axis = 0 ) ]
+  bestCost = initialCosts.min ( axis = 0 )
+  bestCost [inTour] = numpy.inf
+
+  for step in range ( numNodes - 2 ):
+
+    # From the nodes outside, as all of them may be at inf.
+    outside = numpy.flatnonzero ( ~inTour )
+    node = outside [ bestCost [outside].argmin () ]
+    i = bestEdgeStart [node]
+    j = successor [i]
+
+    successor [i] = node
+    successor [node] = j
+    inTour [node] = True
+    bestCost [node] = numpy.inf
+
+    outside = numpy.where ( ~inTour )[0]
+    if len ( outside ) == 0:
+      break
+
+    # Nodes which wanted the edge i->j: re-price against the whole circuit.
+    stale = outside [ bestEdgeStart [outside] == i ]
+    if len ( stale ) > 0:
+      tourNodes = numpy.where ( inTour )[0]
+      staleCosts = _insertionCosts ( tourNodes, stale )
+      bestEdgeStart [stale] = tourNodes [ staleCosts.argmin ( axis = 0 ) ]
+      bestCost [stale] = staleCosts.min ( axis = 0 )
+
+    # Everyone else: compare with the new edges i->node and node->j.
+    fresh = outside [ bestEdgeStart [outside] != i ]
+    for newStart in [ i, node ]:
+      newCosts = _insertionCosts ( numpy.array ( [newStart] ), fresh ) [0]
+      better = newCosts < bestCost [fresh]
+      bestCost [ fresh [better] ] = newCosts [better]
+      bestEdgeStart [ fresh [better] ] = newStart
+
+  tour = [0]
+  while successor [ tour [-1] ] != 0:
+    tour.append ( successor [ tour [-1] ] )
+  return tour
+
+def _spaceFillingCurveTour ( costMatrix, coordinates = None ):
+
+  if coordinates is None:
+    coordinates = _embedInPlane ( costMatrix )
+
+  coordinates = numpy.asarray ( coordinates, dtype = float )
+  return list ( _hilbertIndex ( coordinates ).argsort ( kind = 'mergesort' ) )
+
+def _embedInPlane ( costMatrix, iterations = 50 ):
+
+  '''
+  Classical multidimensional scaling of the symmetrised costs to 2D, with the two
+  leading eigenvectors found by subspace iteration (O(n^2) per iteration rather
+  than a full O(n^3) eigen-decomposition).
+  '''
+
+  numNodes = len ( costMatrix )
+
+  distances = ( costMatrix + costMatrix.T ) / 2.0
+  numpy.fill_diagonal ( distances, 0 )
+  finite = numpy.isfinite ( distances )
+  if not finite.all ():
+    distances [~finite] = distances [finite].max ()
+
+  squared = distances ** 2
+  centred = squared - squared.mean ( axis = 0 ) [None, :] - squared.mean ( axis = 1 ) [:, None] + squared.mean ()
+  gram = -0.5 * centred
+
+  # Shift so that the leading eigenvalues are the largest in magnitude.
+  shift = abs ( gram ).sum ( axis = 1 ).max ()
+  basis = numpy.random.RandomState ( 0 ).rand ( numNodes, 2 )
+
+  for iteration in range ( iterations ):
+    basis, ignore = numpy.linalg.qr ( gram.dot ( basis ) + shift * basis )
+
+  return basis
+
+def _hilbertIndex ( coordinates, order = 16 ):
+
+  '''
+  Position along a Hilbert curve of each point, after scaling the points to a
+  2^order x 2^order grid. Vectorised over the points, looping over the bits.
+  '''
+
+  side = 2 ** order
+  lowest = coordinates.min ( axis = 0 )
+  spread = coordinates.max ( axis = 0 ) - lowest
+  spread [spread == 0] = 1
+
+  grid = ( ( coordinates - lowest ) / spread * ( side - 1 ) ).astype ( numpy.int64 )
+  x, y = grid [:, 0].copy (), grid [:, 1].copy ()
+  index = numpy.zeros ( len ( coordinates ), dtype = numpy.int64 )
+
+  s = side // 2
+  while s > 0:
+    rx = ( x & s ) > 0
+    ry = ( y & s ) > 0
+    index += s * s * ( ( 3 * rx ) ^ ry )
+
+    # Rotate the quadrant.
+    flip = ~ry & rx
+    x [flip] = side - 1 - x [flip]
+    y [flip] = side - 1 - y [flip]
+    swap = ~ry
+    x [swap], y [swap] = y [swap].copy (), x [swap].copy ()
+
+    s = s // 2
+
+  return index
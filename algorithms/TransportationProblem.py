@@ -0,0 +1,235 @@
+
+# TransportationProblem.py
+# Change Log
+# 18/10/2026    - Initial development: transportation simplex
+
+import logging
+import numpy
+
+def TransportationProblem ( supplyQuantities, demandQuantities, costMatrix ):
+
+  '''
+
+  Given supply nodes holding supplyQuantities [i] units and demand nodes needing
+  demandQuantities [j] units, find how many units to send from each supply node
+  to each demand node so that all demand is met at least total cost. costMatrix
+  [i,j] is the cost per unit sent from supply i to demand j.
+
+  This generalises HungarianAssignment () (where every quantity is 1) without
+  expanding a supply node into one row per unit, so 5 depots x 400 units stays a
+  5 row problem. The method is the transportation simplex (MODI), i.e. network
+  simplex on the bipartite supply/demand graph:
+
+  - The starting basis is built greedily, cheapest cell first, on the costs after
+    the same row and column reductions as HA_Step1_ConstructInitialPartialGraph ().
+    This usually starts close to the optimum.
+  - Each iteration computes potentials u, v with u[i] + v[j] = cost for the basic
+    cells (a spanning tree of the graph), picks the cell with the most negative
+    reduced cost c[i,j] - u[i] - v[j], and moves as many units as possible round
+    the cycle it makes with the tree.
+
+  An iteration is O(m.n) in numpy plus O(m+n) in python, so the run time depends
+  on the number of supply and demand nodes and not on the quantities.
+
+  Parameters:
+  -----------
+
+  supplyQuantities, demandQuantities : sequences of non-negative quantities. Total
+      supply may exceed total demand (the surplus is left at the supply nodes), but
+      not the other way round.
+
+  costMatrix : 2D numpy.array, one row per supply node and one col per demand node.
+
+  Result:
+  A numpy 2D array of the quantities sent, laid out as costMatrix.
+
+  Example (not for doctest)
+
+  >>> TransportationProblem ( [5,3], [4,4], numpy.array ( [1,3, 2,1] ).reshape (2,2) )
+  array([[4, 1],
+         [0, 3]])
+
+  '''
+
+  supplyQuantities = numpy.array ( supplyQuantities )
+  demandQuantities = numpy.array ( demandQuantities )
+  costMatrix = numpy.asarray ( costMatrix )
+
+  numRows, numCols = costMatrix.shape
+
+  if len ( supplyQuantities ) != numRows or len ( demandQuantities ) != numCols:
+    raise ValueError ( "Supply and demand quantities do not match the cost matrix shape " + str ( costMatrix.shape ) )
+
+  surplus = supplyQuantities.sum () - demandQuantities.sum ()
+  if surplus < 0:
+    raise ValueError ( "Total demand exceeds total supply" )
+
+  if numRows == 0 or numCols == 0:
+    return numpy.zeros ( costMatrix.shape, dtype = supplyQuantities.dtype )
+
+  # Surplus supply goes to a dummy demand node at zero cost.
+  workingCosts = numpy.zeros ( ( numRows, numCols + 1 ) )
+  workingCosts [:, :numCols] = costMatrix
+  demandQuantities = numpy.append ( demandQuantities, surplus )
+
+  flows, basis = _initialBasis ( workingCosts, supplyQuantities, demandQuantities )
+
+  iterations = 0
+
+  while True:
+
+    rowPotentials, colPotentials = _potentials ( workingCosts, basis )
+    reducedCosts = workingCosts - rowPotentials [:, None] - colPotentials [None, :]
+
+    enteringCell = numpy.unravel_index ( reducedCosts.argmin (), reducedCosts.shape )
+    if reducedCosts [enteringCell] >= -1e-9 * max ( 1.0, abs ( workingCosts ).max () ):
+      break
+
+    _pivot ( flows, basis, enteringCell )
+    iterations = iterations + 1
+
+  logging.debug ( "Transportation simplex finished after " + str ( iterations ) + " pivots" )
+
+  return flows [:, :numCols]
+
+def _initialBasis ( costs, supplyQuantities, demandQuantities ):
+
+  '''
+  Greedy 'matrix minimum' starting solution on the reduced costs. Returns the
+  flows and the basis as [ rowAdjacency, colAdjacency ]: the sets of basic cols
+  in each row and basic rows in each col. There are always m+n-1 basic cells
+  (some may carry zero flow) forming a spanning tree.
+  '''
+
+  numRows, numCols = costs.shape
+
+  reducedCosts = costs - costs.min ( axis = 1 ) [:, None]
+  reducedCosts -= reducedCosts.min ( axis = 0 )
+
+  flows = numpy.zeros ( costs.shape, dtype = numpy.result_type ( supplyQuantities, demandQuantities ) )
+  supplyLeft = supplyQuantities.astype ( flows.dtype )
+  demandLeft = demandQuantities.astype ( flows.dtype )
+
+  rowOpen = numpy.ones ( numRows, dtype = bool )
+  colOpen = numpy.ones ( numCols, dtype = bool )
+  openRows = numRows
+
+  rowAdjacency = [ set () for i in range ( numRows ) ]
+  colAdjacency = [ set () for j in range ( numCols ) ]
+  basisSize = 0
+
+  for flatIndex in reducedCosts.argsort ( axis = None, kind = 'mergesort' ):
+
+    i, j = divmod ( flatIndex, numCols )
+    if not ( rowOpen [i] and colOpen [j] ):
+      continue
+
+    quantity = min ( supplyLeft [i], demandLeft [j] )
+    flows [i, j] = quantity
+    supplyLeft [i] -= quantity
+    demandLeft [j] -= quantity
+
+    rowAdjacency [i].add ( j )
+    colAdjacency [j].add ( i )
+    basisSize = basisSize + 1
+
+    # Close one line per basic cell so the basis stays a tree. When both run out
+    # the col stays open with nothing left, and gets a zero flow basic cell later.
+    if supplyLeft [i] == 0 and openRows > 1:
+      rowOpen [i] = False
+      openRows = openRows - 1
+    else:
+      colOpen [j] = False
+
+    if basisSize == numRows + numCols - 1:
+      break
+
+  return flows, [ rowAdjacency, colAdjacency ]
+
+def _potentials ( costs, basis ):
+
+  '''
+  Solve u[i] + v[j] = costs[i,j] over the basic cells, with u[0] = 0, by walking
+  the basis tree.
+  '''
+
+  rowAdjacency, colAdjacency = basis
+
+  rowPotentials = numpy.zeros ( len ( rowAdjacency ) )
+  colPotentials = numpy.zeros ( len ( colAdjacency ) )
+
+  rowsToVisit = [0]
+  rowSeen = numpy.zeros ( len ( rowAdjacency ), dtype = bool )
+  colSeen = numpy.zeros ( len ( colAdjacency ), dtype = bool )
+  rowSeen [0] = True
+
+  while len ( rowsToVisit ) > 0:
+    i = rowsToVisit.pop ()
+    for j in rowAdjacency [i]:
+      if colSeen [j]:
+        continue
+      colSeen [j] = True
+      colPotentials [j] = costs [i, j] - rowPotentials [i]
+      for k in colAdjacency [j]:
+        if not rowSeen [k]:
+          rowSeen [k] = True
+          rowPotentials [k] = costs [k, j] - colPotentials [j]
+          rowsToVisit.append ( k )
+
+  return rowPotentials, colPotentials
+
+def _pivot ( flows, basis, enteringCell ):
+
+  '''
+  Add enteringCell to the basis, shift flow round the cycle it closes and drop
+  the basic cell whose flow reaches zero first.
+  '''
+
+  rowAdjacency, colAdjacency = basis
+  enteringRow, enteringCol = enteringCell
+
+  # Path through the tree from row enteringRow to col enteringCol, as a list of
+  # cells. Nodes are ('r', i) or ('c', j).
+  parents = { ('r', enteringRow) : None }
+  nodesToVisit = [ ('r', enteringRow) ]
+
+  while ('c', enteringCol) not in parents:
+    node = nodesToVisit.pop ()
+    if node [0] == 'r':
+      neighbours = [ ('c', j) for j in rowAdjacency [ node [1] ] ]
+    else:
+      neighbours = [ ('r', i) for i in colAdjacency [ node [1] ] ]
+    for neighbour in neighbours:
+      if neighbour not in parents:
+        parents [neighbour] = node
+        nodesToVisit.append ( neighbour )
+
+  pathCells = []
+  node = ('c', enteringCol)
+  while parents [node] is not None:
+    parent = parents [node]
+    if node [0] == 'c':
+      pathCells.append ( ( parent [1], node [1] ) )
+    else:
+      pathCells.append ( ( node [1], parent [1] ) )
+    node = parent
+
+  # pathCells runs from the cell in col enteringCol back to the cell in row
+  # enteringRow. Going round the cycle from the entering cell the signs alternate
+  # -, +, -, ... along it.
+  decreasingCells = pathCells [0::2]
+  increasingCells = pathCells [1::2]
+
+  leavingCell = min ( decreasingCells, key = lambda cell : flows [cell] )
+  theta = flows [leavingCell]
+
+  for cell in decreasingCells:
+    flows [cell] -= theta
+  for cell in increasingCells:
+    flows [cell] += theta
+  flows [enteringCell] += theta
+
+  rowAdjacency [ leavingCell [0] ].discard ( leavingCell [1] )
+  colAdjacency [ leavingCell [1] ].discard ( leavingCell [0] )
+  rowAdjacency [enteringRow].add ( enteringCol )
+  colAdjacency [enteringCol].add ( enteringRow )
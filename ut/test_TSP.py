@@ -1,10 +1,19 @@
 
 import unittest
 from algorithms import TSP as TSP
+from algorithms import HeldKarpBound
+from algorithms import HungarianAssignment as HA
+from algorithms import LinKernighan
 import numpy
 import heapq
 import random
 import time
+import itertools
+import cPickle
+import os
+import shutil
+import tempfile
+from ut.tsp_instances import distanceMatrix, randomInstance
 
 class HungarianAlgorithm_TestCase ( unittest.TestCase):
 
@@ -85,6 +94,432 @@ class HungarianAlgorithm_TestCase ( unittest.TestCase):
     self.failUnless ( cheapestAssignment <> 16)
 
 
+  def testWarmStartedChildMatchesColdSolve (self):
+
+    randomState = numpy.random.RandomState ( 11 )
+
+    for trial in range ( 20 ):
+
+      n = randomState.randint ( 3, 12 )
+      costMatrix = randomState.randint ( 1, 50, ( n, n ) )
+
+      parent = TSP.AssignmentProblem ( costMatrix )
+      parent.doAssignment ()
+
+      for thisTuple in parent.getSmallestCircuit ():
+
+        warmChild = TSP.AssignmentProblem ( costMatrix, parent.getAllConstraints () )
+        warmChild.addConstraint ( thisTuple )
+        warmChild.warmStartFrom ( parent )
+        warmChild.doAssignment ()
+
+        coldChild = TSP.AssignmentProblem ( costMatrix, parent.getAllConstraints () )
+        coldChild.addConstraint ( thisTuple )
+        coldChild.doAssignment ()
+
+        self.failUnless ( warmChild.getTotalCost () == coldChild.getTotalCost () )
+        self.failUnless ( not warmChild.booleanMatrix [ thisTuple ] )
+
+  def testBranchNodeMatchesAssignmentProblem (self):
+
+    '''
+    A BranchNode keeps only O(n) arrays, and solves as an AssignmentProblem
+    with all of its constraints would.
+    '''
+
+    randomState = numpy.random.RandomState ( 12 )
+
+    for trial in range ( 20 ):
+
+      n = randomState.randint ( 3, 12 )
+      costMatrix = randomState.randint ( 1, 50, ( n, n ) )
+      numpy.fill_diagonal ( costMatrix, TSP._INFINITY )
+
+      node = TSP.BranchNode ()
+      TSP._solveNode ( node, costMatrix, 'assignment', None, True )
+      self.failUnless ( not hasattr ( node, '__dict__' ) )
+
+      for depth in range ( 3 ):
+
+        constraint, forced = TSP._branchConstraints ( node, costMatrix, False ) [0]
+        child = TSP.BranchNode ( node, constraint, forced )
+        TSP._solveNode ( child, costMatrix, 'assignment', None, True )
+
+        fromNodes, toNodes = child.getConstraints ()
+        problem = TSP.AssignmentProblem ( costMatrix, zip ( fromNodes, toNodes ) )
+        problem.doAssignment ()
+
+        self.failUnless ( child.assignmentCost == problem.getTotalCost () )
+        self.failUnless ( child.successors.dtype == numpy.int32 and child.successors.shape == ( n, ) )
+        self.failUnless ( child.rowPotentials.shape == ( n, ) )
+        self.failUnless ( len ( constraint [0] ) == 1 )
+
+        node.release ()
+        self.failUnless ( node.successors is None )
+        if len ( child.getAllCircuits () ) == 1:
+          break
+        node = child
+
+  def testIncludeExcludeChildrenPartitionTours (self):
+
+    '''
+    Every tour of a sub-problem is a tour of exactly one of its children, and
+    each child's assignment is the cheapest which keeps to its constraints.
+    '''
+
+    def keepsTo ( tour, node ):
+      successors = numpy.roll ( tour, -1 ) [ numpy.argsort ( tour ) ]
+      fromNodes, toNodes = node.getConstraints ()
+      forcedFrom, forcedTo = node.getForcedArcs ()
+      return ( successors [fromNodes] != toNodes ).all () and ( successors [forcedFrom] == forcedTo ).all ()
+
+    randomState = numpy.random.RandomState ( 21 )
+    n = 7
+    costMatrix = randomState.randint ( 1, 50, ( n, n ) )
+    numpy.fill_diagonal ( costMatrix, TSP._INFINITY )
+    tours = [ [0] + list ( rest ) for rest in itertools.permutations ( range ( 1, n ) ) ]
+
+    nodes = [ TSP.BranchNode () ]
+    TSP._solveNode ( nodes [0], costMatrix, 'assignment', None, True )
+
+    while len ( nodes ) > 0:
+
+      node = nodes.pop ()
+      if len ( node.getAllCircuits () ) == 1 or node.assignmentCost >= TSP._INFINITY:
+        continue
+
+      children = []
+      for constraint, forced in TSP._branchConstraints ( node, costMatrix, False ):
+        child = TSP.BranchNode ( node, constraint, forced )
+        TSP._solveNode ( child, costMatrix, 'assignment', None, True )
+        children.append ( child )
+
+        fromNodes, toNodes = child.getConstraints ()
+        forcedFrom, forcedTo = child.getForcedArcs ()
+        self.failUnless ( ( child.successors [forcedFrom] == forcedTo ).all () )
+        self.failUnless ( ( child.successors [fromNodes] != toNodes ).all () or child.assignmentCost >= TSP._INFINITY )
+
+        rowToCol = HA.shortestAugmentingPathAssignment ( TSP._constrainedCosts ( child, costMatrix ) ) [0]
+        self.failUnless ( child.assignmentCost == TSP._constrainedCosts ( child, costMatrix ) [ range ( n ), rowToCol ].sum () )
+
+      for tour in tours:
+        if keepsTo ( tour, node ):
+          self.failUnless ( sum ( [ keepsTo ( tour, child ) for child in children ] ) == 1 )
+
+      node.release ()
+      nodes.extend ( children )
+
+  def testTSPAgainstBruteForce (self):
+
+    '''
+    Optimal with and without a constructed initial tour, on asymmetric matrices.
+    '''
+
+    randomState = numpy.random.RandomState ( 12 )
+
+    for trial in range ( 15 ):
+
+      n = randomState.randint ( 3, 8 )
+      costMatrix = randomState.randint ( 1, 100, ( n, n ) )
+
+      bestCost = min ( [ sum ( [ costMatrix [p[i], p[(i+1) % n]] for i in range (n) ] )
+                         for p in [ (0,) + q for q in itertools.permutations ( range (1, n) ) ] ] )
+
+      for initialTourMethod in [ 'best', None ]:
+        result = TSP.TSP ( costMatrix.copy (), initialTourMethod, dynamicProgrammingBelow = 0 )
+        self.failUnless ( result.getTotalCost () == bestCost )
+        self.failUnless ( len ( result.getAllCircuits () ) == 1 )
+
+  def testHeldKarpBoundAgainstBruteForce (self):
+
+    '''
+    Optimal with the 1-tree bound on symmetric matrices, integer or not. 
+    '''
+
+    randomState = numpy.random.RandomState ( 16 )
+
+    for trial in range ( 15 ):
+
+      n = randomState.randint ( 3, 9 )
+      points, costMatrix, unused = randomInstance ( n, randomState, 100, rounded = trial % 2 == 0 )
+
+      bestCost = min ( [ sum ( [ costMatrix [p[i], p[(i+1) % n]] for i in range (n) ] )
+                         for p in [ (0,) + q for q in itertools.permutations ( range (1, n) ) ] ] )
+
+      for initialTourMethod in [ 'best', None ]:
+        result = TSP.TSP ( costMatrix.copy (), initialTourMethod, bound = 'heldKarp', dynamicProgrammingBelow = 0 )
+        self.failUnless ( abs ( result.getTotalCost () - bestCost ) < 1e-9 )
+        self.failUnless ( len ( result.getAllCircuits () ) == 1 )
+
+  def testHeldKarpBoundLargerInstance (self):
+
+    points, costMatrix, unused = randomInstance ( 40, 40, 1000, rounded = True )
+
+    result = TSP.TSP ( costMatrix.copy (), bound = 'heldKarp' )
+    self.failUnless ( len ( result.getAllCircuits () ) == 1 )
+
+    # Between the root bound and a good heuristic tour.
+    lkTour, lkCost = LinKernighan.LinKernighan ( costMatrix )
+    self.failUnless ( result.getTotalCost () <= lkCost )
+    self.failUnless ( result.getTotalCost () >= HeldKarpBound.oneTreeBound ( costMatrix ) [0] )
+
+  def testAdditiveBoundAgainstBruteForce (self):
+
+    randomState = numpy.random.RandomState ( 17 )
+
+    for trial in range ( 15 ):
+
+      n = randomState.randint ( 3, 9 )
+      costMatrix = randomState.randint ( 1, 100, ( n, n ) )
+
+      bestCost = min ( [ sum ( [ costMatrix [p[i], p[(i+1) % n]] for i in range (n) ] )
+                         for p in [ (0,) + q for q in itertools.permutations ( range (1, n) ) ] ] )
+
+      for initialTourMethod in [ 'best', None ]:
+        result = TSP.TSP ( costMatrix.copy (), initialTourMethod, bound = 'additive', dynamicProgrammingBelow = 0 )
+        self.failUnless ( result.getTotalCost () == bestCost )
+        self.failUnless ( len ( result.getAllCircuits () ) == 1 )
+
+  def testSmallInstancesByDynamicProgramming (self):
+
+    randomState = numpy.random.RandomState ( 18 )
+    costMatrix = randomState.randint ( 1, 100, ( 12, 12 ) )
+
+    dynamicProgramming = TSP.TSP ( costMatrix.copy () )
+    branchAndBound = TSP.TSP ( costMatrix.copy (), dynamicProgrammingBelow = 0 )
+
+    self.failUnless ( dynamicProgramming.getTotalCost () == branchAndBound.getTotalCost () )
+    self.failUnless ( len ( dynamicProgramming.getAllCircuits () ) == 1 )
+
+    # Both give the cost in the matrix's own dtype.
+    dynamicProgramming = TSP.solve ( costMatrix.copy () )
+    branchAndBound = TSP.solve ( costMatrix.copy (), dynamicProgrammingBelow = 0 )
+    self.failUnless ( dynamicProgramming [1:] == branchAndBound [1:] )
+    self.failUnless ( type ( dynamicProgramming [1] ) == type ( branchAndBound [1] ) )
+
+  def testParallelMatchesSerial (self):
+
+    '''
+    The same tour with any number of processes, for a given batch size.
+    '''
+
+    randomState = numpy.random.RandomState ( 19 )
+    points, symmetricMatrix, unused = randomInstance ( 30, randomState, 1000, rounded = True )
+    asymmetricMatrix = randomState.randint ( 1, 1000, ( 30, 30 ) )
+
+    for costMatrix, bound in [ ( asymmetricMatrix, 'assignment' ), ( symmetricMatrix, 'heldKarp' ) ]:
+
+      serial   = TSP.TSP ( costMatrix.copy (), bound = bound, nodesPerBatch = 4 )
+      parallel = TSP.TSP ( costMatrix.copy (), bound = bound, processes = 2, nodesPerBatch = 4 )
+      bestFirst = TSP.TSP ( costMatrix.copy (), bound = bound )
+
+      self.failUnless ( ( serial.booleanMatrix == parallel.booleanMatrix ).all () )
+      self.failUnless ( parallel.getTotalCost () == bestFirst.getTotalCost () )
+      self.failUnless ( len ( parallel.getAllCircuits () ) == 1 )
+
+    # Tours found by the workers are costed in the matrix's own dtype.
+    serial   = TSP.solve ( asymmetricMatrix.copy (), initialTourMethod = None, nodesPerBatch = 4 )
+    parallel = TSP.solve ( asymmetricMatrix.copy (), initialTourMethod = None, processes = 2, nodesPerBatch = 4 )
+    self.failUnless ( serial == parallel and type ( serial [1] ) == type ( parallel [1] ) )
+
+  def testSearchStrategiesAgree (self):
+
+    '''
+    Every search finds the optimum, within its queue cap or spilling to disk.
+    '''
+
+    randomState = numpy.random.RandomState ( 22 )
+    points, symmetricMatrix, unused = randomInstance ( 16, randomState, 1000, rounded = True )
+    asymmetricMatrix = randomState.randint ( 1, 1000, ( 40, 40 ) )
+    spillDirectory = tempfile.mkdtemp ()
+
+    try:
+      for costMatrix in [ symmetricMatrix, asymmetricMatrix ]:
+
+        bestFirst = TSP.TSP ( costMatrix.copy (), dynamicProgrammingBelow = 0 )
+
+        for options in [ dict ( search = 'depthFirst' ), dict ( search = 'depthFirst', initialTourMethod = None ),
+                         dict ( search = 'hybrid', maxQueuedNodes = 5 ), dict ( search = 'hybrid', maxQueueBytes = 5000 ),
+                         dict ( maxQueuedNodes = 6, spillDirectory = spillDirectory ) ]:
+          result = TSP.TSP ( costMatrix.copy (), dynamicProgrammingBelow = 0, **options )
+          self.failUnless ( result.getTotalCost () == bestFirst.getTotalCost () )
+          self.failUnless ( len ( result.getAllCircuits () ) == 1 )
+
+        self.failUnless ( os.listdir ( spillDirectory ) == [] )
+
+    finally:
+      shutil.rmtree ( spillDirectory )
+
+    self.assertRaises ( ValueError, TSP.TSP, asymmetricMatrix.copy (), search = 'breadthFirst', dynamicProgrammingBelow = 0 )
+
+  def testSpilledQueueStaysBestFirst (self):
+
+    randomState = numpy.random.RandomState ( 23 )
+    spillDirectory = tempfile.mkdtemp ()
+    queue = TSP._SearchQueue ( 'bestFirst', maxQueuedNodes = 8, spillDirectory = spillDirectory )
+    bounds = []
+
+    try:
+      for batch in range ( 20 ):
+        nodes = []
+        for child in range ( 3 ):
+          node = TSP.BranchNode ( None, ( numpy.array ( [batch], dtype = numpy.int32 ), numpy.array ( [child], dtype = numpy.int32 ) ) )
+          node.bound = randomState.randint ( 100 )
+          node.successors = numpy.arange ( 5, dtype = numpy.int32 )
+          nodes.append ( node )
+        queue.push ( nodes )
+        self.failUnless ( len ( queue.heap ) < 8 )
+
+      popped = queue.pop ( 100 )
+      while popped is not None:
+        bounds.append ( popped.bound )
+        self.failUnless ( len ( popped.getConstraints () [0] ) == 1 )
+        self.failUnless ( ( popped.successors == numpy.arange ( 5 ) ).all () )
+        popped = queue.pop ( 100 )
+
+      self.failUnless ( len ( bounds ) == 60 and bounds == sorted ( bounds ) )
+    finally:
+      queue.close ()
+
+    self.failUnless ( not os.path.exists ( queue.spillDirectory ) )
+    shutil.rmtree ( spillDirectory )
+
+  def testSolveWithinLimits (self):
+
+    randomState = numpy.random.RandomState ( 23 )
+    points, costMatrix, unused = randomInstance ( 18, randomState, 1000, rounded = True )
+    optimum = TSP.TSP ( costMatrix.copy () ).getTotalCost ()
+
+    tour, cost, lowerBound, gap = TSP.solve ( costMatrix.copy (), dynamicProgrammingBelow = 0 )
+    self.failUnless ( cost == optimum and lowerBound == optimum and gap == 0.0 )
+    self.failUnless ( sorted ( tour ) == range ( 18 ) )
+
+    for limits in [ dict ( nodeLimit = 3 ), dict ( timeLimit = 0 ), dict ( gap = 0.05 ),
+                    dict ( nodeLimit = 3, initialTourMethod = None, search = 'depthFirst' ) ]:
+      tour, cost, lowerBound, gap = TSP.solve ( costMatrix.copy (), dynamicProgrammingBelow = 0, **limits )
+      self.failUnless ( lowerBound <= optimum )
+      if tour is None:
+        # No tour found yet.
+        self.failUnless ( cost == numpy.inf and gap == numpy.inf )
+        continue
+      self.failUnless ( sorted ( tour ) == range ( 18 ) )
+      self.failUnless ( cost == costMatrix [ tour, numpy.roll ( tour, -1 ) ].sum () )
+      self.failUnless ( lowerBound <= optimum <= cost )
+      self.failUnless ( abs ( gap - ( cost - lowerBound ) / cost ) < 1e-12 )
+      self.failUnless ( gap <= limits.get ( 'gap', 1.0 ) )
+
+    # 20 nodes, whose dynamic programme takes about a second: a tour comes
+    # at once and the limit is kept (give or take a step of the search).
+    points, costMatrix, unused = randomInstance ( 20, randomState, 1000, rounded = True )
+    for bound in [ 'assignment', 'heldKarp' ]:
+      startTime = time.time ()
+      solutions = TSP.improvingSolutions ( costMatrix.copy (), timeLimit = 0.2, bound = bound )
+      firstTour = solutions.next () [0]
+      self.failUnless ( sorted ( firstTour ) == range ( 20 ) and time.time () - startTime < 0.2 )
+      tour, cost, lowerBound, gap = list ( solutions ) [-1]
+      self.failUnless ( time.time () - startTime < 0.2 + 0.5 )
+      self.failUnless ( sorted ( tour ) == range ( 20 ) and lowerBound <= cost )
+
+  def testImprovingSolutions (self):
+
+    '''
+    Each tour yielded is better than the last, until the last, which is
+    optimal.
+    '''
+
+    randomState = numpy.random.RandomState ( 40 )
+    costMatrix = randomState.randint ( 1, 1000, ( 40, 40 ) )
+    optimum = TSP.TSP ( costMatrix.copy () ).getTotalCost ()
+
+    solutions = list ( TSP.improvingSolutions ( costMatrix.copy (), initialTourMethod = None, search = 'depthFirst' ) )
+    costs = [ cost for tour, cost, lowerBound, gap in solutions ]
+
+    self.failUnless ( len ( solutions ) > 1 )
+    self.failUnless ( costs [:-1] == sorted ( set ( costs [:-1] ), reverse = True ) and costs [-1] <= costs [-2] )
+    for tour, cost, lowerBound, gap in solutions:
+      self.failUnless ( sorted ( tour ) == range ( 40 ) and lowerBound <= optimum <= cost )
+    self.failUnless ( solutions [-1] [1:] == ( optimum, optimum, 0.0 ) )
+
+    self.assertRaises ( ValueError, TSP.improvingSolutions, costMatrix, bound = 'oneTree' )
+
+  def testCheckpointAndResume (self):
+
+    points, costMatrix, unused = randomInstance ( 18, 18, 1000, rounded = True )
+    optimum = TSP.TSP ( costMatrix.copy () ).getTotalCost ()
+    checkpointDirectory = tempfile.mkdtemp ()
+    checkpointPath = os.path.join ( checkpointDirectory, 'tsp.checkpoint' )
+
+    try:
+      for options in [ dict (), dict ( search = 'depthFirst' ), dict ( bound = 'heldKarp' ),
+                       dict ( maxQueuedNodes = 10, spillDirectory = checkpointDirectory ) ]:
+
+        # Stopped by a limit, and carried on without one.
+        tour, cost, lowerBound, gap = TSP.solve ( costMatrix.copy (), nodeLimit = 30, dynamicProgrammingBelow = 0,
+                                                  checkpointPath = checkpointPath, **options )
+        tour, cost, lowerBound, gap = TSP.resume ( checkpointPath, nodeLimit = 1000000 )
+        self.failUnless ( cost == optimum and lowerBound == optimum and sorted ( tour ) == range ( 18 ) )
+
+        # The checkpoint of a finished search gives its result again.
+        self.failUnless ( TSP.resume ( checkpointPath ) [1:] == ( optimum, optimum, 0.0 ) )
+
+      # Killed part way, with a checkpoint after every batch.
+      solutions = TSP.improvingSolutions ( costMatrix.copy (), initialTourMethod = None, dynamicProgrammingBelow = 0,
+                                           checkpointPath = checkpointPath, checkpointInterval = 0 )
+      firstCost = solutions.next () [1]
+      solutions.close ()
+
+      with open ( checkpointPath, 'rb' ) as checkpointFile:
+        checkpoint = cPickle.load ( checkpointFile )
+      self.failUnless ( checkpoint ['lowestCost'] >= firstCost and len ( checkpoint ['openNodes'] ) > 0 )
+      self.failUnless ( len ( checkpoint ['bounds'] ) == len ( checkpoint ['openNodes'] ) )
+      self.failUnless ( len ( set ( checkpoint ['openNodes'] ) ) == len ( checkpoint ['openNodes'] ) )
+
+      tour, cost, lowerBound, gap = TSP.resume ( checkpointPath )
+      self.failUnless ( cost == optimum and gap == 0.0 )
+      self.failUnless ( os.listdir ( checkpointDirectory ) == [ 'tsp.checkpoint' ] )
+
+    finally:
+      shutil.rmtree ( checkpointDirectory )
+
+  def testDuplicateSubProblemsDropped (self):
+
+    # The same constraints reached in either order are one sub-problem.
+    parentNode = TSP.BranchNode ()
+    childA = TSP.BranchNode ( parentNode, ( numpy.array ( [0, 1], dtype = numpy.int32 ), numpy.array ( [1, 0], dtype = numpy.int32 ) ) )
+    childB = TSP.BranchNode ( parentNode, ( numpy.array ( [0, 2], dtype = numpy.int32 ), numpy.array ( [2, 0], dtype = numpy.int32 ) ) )
+    tasks = [ ( childA, childB.constraint, None ), ( childB, childA.constraint, None ), ( parentNode, childA.constraint, None ) ]
+
+    memo = TSP._SubProblemMemo ( 10 )
+    self.failUnless ( memo.dropDuplicates ( tasks, 5 ) == [ tasks [0], tasks [2] ] and ( memo.hits, memo.misses ) == ( 1, 2 ) )
+    self.failUnless ( memo.dropDuplicates ( tasks [2:], 5 ) == [] and memo.hits == 2 )
+
+    # Least recently used keys go first.
+    memo = TSP._SubProblemMemo ( 1 )
+    memo.dropDuplicates ( tasks [:1], 5 )
+    memo.dropDuplicates ( tasks [2:], 5 )
+    self.failUnless ( len ( memo.dropDuplicates ( tasks [:1], 5 ) ) == 1 and memo.hits == 0 )
+
+    # A grid, whose ties leave the 1-tree many branches to meet again down.
+    points = numpy.array ( list ( itertools.product ( range ( 4 ), range ( 6 ) ) ), dtype = float )
+    costMatrix = numpy.round ( distanceMatrix ( points ) * 10 )
+
+    results = []
+    for memoSize in ( 1000, 0 ):
+      statistics = {}
+      results.append ( TSP.solve ( costMatrix.copy (), initialTourMethod = None, bound = 'heldKarp',
+                                   memoSize = memoSize, statistics = statistics ) [1:] + ( statistics, ) )
+
+    ( cost, lowerBound, gap, statistics ), ( costWithout, lowerBoundWithout, gapWithout, statisticsWithout ) = results
+    self.failUnless ( cost == costWithout == 240 and gap == gapWithout == 0.0 )
+    self.failUnless ( statistics ['memoHits'] > 0 and statisticsWithout ['memoHits'] == statisticsWithout ['memoMisses'] == 0 )
+    self.failUnless ( statistics ['memoEntries'] == statistics ['memoMisses'] )
+    self.failUnless ( statistics ['nodesExpanded'] <= statisticsWithout ['nodesExpanded'] )
+
+  def testHeldKarpBoundNeedsSymmetricMatrix (self):
+
+    costMatrix = numpy.array ( [ [0, 1, 2], [3, 0, 4], [5, 6, 0] ] )
+    self.assertRaises ( ValueError, TSP.TSP, costMatrix, 'best', 'heldKarp' )
+
   def testTSP (self):
 
 
@@ -0,0 +1,68 @@
+import unittest
+import itertools
+from algorithms import AdditiveBound
+from algorithms import HungarianAssignment
+from algorithms import TourConstruction
+import numpy
+
+class AdditiveBound_TestCase ( unittest.TestCase):
+
+  def _bruteForceArborescence (self, costMatrix, root):
+
+    n = len ( costMatrix )
+    others = [ node for node in range ( n ) if node != root ]
+    bestCost = numpy.inf
+
+    for parents in itertools.product ( range ( n ), repeat = n - 1 ):
+      parentOf = dict ( zip ( others, parents ) )
+      if any ( [ parentOf [node] == node for node in others ] ):
+        continue
+
+      # Every node must lead back to the root.
+      reachesRoot = True
+      for node in others:
+        seen = set ()
+        while node != root and node not in seen:
+          seen.add ( node )
+          node = parentOf [node]
+        reachesRoot = reachesRoot and node == root
+
+      if reachesRoot:
+        bestCost = min ( bestCost, sum ( [ costMatrix [ parentOf [node], node ] for node in others ] ) )
+
+    return bestCost
+
+  def testArborescenceAgainstBruteForce (self):
+
+    randomState = numpy.random.RandomState ( 3 )
+
+    for trial in range ( 40 ):
+      n = randomState.randint ( 2, 6 )
+      costMatrix = randomState.randint ( 1, 50, ( n, n ) ).astype ( float )
+      if trial % 3 == 0:
+        costMatrix [ randomState.rand ( n, n ) < 0.3 ] = numpy.inf
+      root = randomState.randint ( n )
+
+      cost, residualCosts = AdditiveBound.minimumArborescence ( costMatrix, root )
+      self.failUnless ( cost == self._bruteForceArborescence ( costMatrix, root ) )
+      self.failUnless ( ( residualCosts [ numpy.isfinite ( residualCosts ) ] >= 0 ).all () )
+
+  def testBoundBetweenAssignmentAndOptimum (self):
+
+    randomState = numpy.random.RandomState ( 4 )
+
+    for trial in range ( 30 ):
+      n = randomState.randint ( 3, 8 )
+      costMatrix = randomState.randint ( 1, 100, ( n, n ) ).astype ( float )
+      numpy.fill_diagonal ( costMatrix, numpy.inf )
+
+      rowToCol, colToRow, rowPotentials, colPotentials = \
+        HungarianAssignment.shortestAugmentingPathAssignment ( numpy.where ( numpy.isinf ( costMatrix ), 1e8, costMatrix ) )
+      optimum = min ( [ TourConstruction.tourCost ( costMatrix, [0] + list ( p ) ) for p in itertools.permutations ( range ( 1, n ) ) ] )
+
+      bound = AdditiveBound.additiveBound ( costMatrix, rowPotentials, colPotentials, roots = range ( n ) )
+      self.failUnless ( bound <= optimum + 1e-9 )
+      self.failUnless ( bound >= rowPotentials.sum () + colPotentials.sum () - 1e-9 )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
@@ -0,0 +1,66 @@
+
+import unittest
+from algorithms import AuctionAssignment
+from algorithms import HungarianAssignment
+import numpy
+
+class AuctionAssignment_TestCase ( unittest.TestCase):
+
+  def testSmallExample (self):
+
+    # 0 means forbidden
+    costMatrix = numpy.array ( [ 6, 0, 1,
+                                 0, 4, 0,
+                                 5, 2, 3 ] ).reshape (3,3)
+
+    indptr, indices, costs = AuctionAssignment.denseToCSR ( costMatrix, 0 )
+
+    self.failUnless ( list ( indptr ) == [0,2,3,6] )
+
+    rowToCol, totalCost = AuctionAssignment.SparseAuctionAssignment ( indptr, indices, costs )
+
+    self.failUnless ( list ( rowToCol ) == [2,1,0] )
+    self.failUnless ( totalCost == 10 )
+
+  def testAgainstHungarianAssignment (self):
+
+    '''
+    Forbidden cells are given a large cost for the dense solver. Every problem 
+    has a feasible assignment hidden in it (the random permutation).
+    ''' 
+
+    randomState = numpy.random.RandomState ( 0 )
+
+    for trial in range ( 50 ):
+
+      n = randomState.randint ( 1, 12 )
+      costMatrix = randomState.randint ( 1, 50, ( n, n ) ).astype ( float )
+      forbidden = randomState.rand ( n, n ) < 0.6
+      forbidden [ range (n), randomState.permutation (n) ] = False
+      costMatrix [forbidden] = numpy.inf
+
+      rowToCol, totalCost = AuctionAssignment.SparseAuctionAssignment ( *AuctionAssignment.denseToCSR ( costMatrix ) )
+
+      denseMatrix = costMatrix.copy ()
+      denseMatrix [forbidden] = 100000000
+      resultGraph = HungarianAssignment.HungarianAssignment ( range (n), range (n), denseMatrix, 'jv' )
+
+      self.failUnless ( sorted ( rowToCol ) == range (n) )
+      self.failUnless ( totalCost == ( denseMatrix * resultGraph ).sum () )
+
+  def testInfeasible (self):
+
+    # Rows 0 and 1 can only use col 0
+    costMatrix = numpy.array ( [ 1, 0, 0,
+                                 1, 0, 0,
+                                 1, 1, 1 ] ).reshape (3,3)
+
+    self.assertRaises ( ValueError, AuctionAssignment.SparseAuctionAssignment, 
+                        *AuctionAssignment.denseToCSR ( costMatrix, 0 ) )
+
+    # Col 2 has no edges at all
+    self.assertRaises ( ValueError, AuctionAssignment.SparseAuctionAssignment, 
+                        [0,1,2,3], [0,1,1], [1,1,1] )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
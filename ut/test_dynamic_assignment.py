@@ -0,0 +1,87 @@
+
+import unittest
+from algorithms import DynamicAssignment
+from algorithms import HungarianAssignment
+import numpy
+
+class DynamicAssignment_TestCase ( unittest.TestCase):
+
+  def _checkOptimal (self, dynamicAssignment, costs):
+
+    '''
+    Compare with a fresh solve of the real (possibly rectangular) problem. 
+    costs is a dict of dicts: costs [supply][demand]
+    ''' 
+
+    supply = dynamicAssignment.getSupplyVertices ()
+    demand = dynamicAssignment.getDemandVertices ()
+    pairs  = dynamicAssignment.getAssignedPairs ()
+
+    self.failUnless ( len ( pairs ) == min ( len ( supply ), len ( demand ) ) )
+    self.failUnless ( len ( set ( [ s for s, d in pairs ] ) ) == len ( pairs ) )
+    self.failUnless ( len ( set ( [ d for s, d in pairs ] ) ) == len ( pairs ) )
+
+    if len ( pairs ) == 0:
+      return
+
+    costMatrix = numpy.array ( [ [ costs [s][d] for d in demand ] for s in supply ] )
+    resultGraph = HungarianAssignment.HungarianAssignment ( supply, demand, costMatrix, 'jv' )
+
+    self.failUnless ( sum ( [ costs [s][d] for s, d in pairs ] ) == ( costMatrix * resultGraph ).sum () )
+    self.failUnless ( dynamicAssignment.getTotalCost () == ( costMatrix * resultGraph ).sum () )
+
+  def testRandomChanges (self):
+
+    randomState = numpy.random.RandomState ( 4 )
+
+    supply = [ 's' + str (i) for i in range (4) ]
+    demand = [ 'd' + str (j) for j in range (5) ]
+    costs = dict ( [ ( s, dict ( [ ( d, randomState.randint ( 0, 50 ) ) for d in demand ] ) ) for s in supply ] )
+
+    dynamicAssignment = DynamicAssignment.DynamicAssignment ( supply, demand, 
+                          numpy.array ( [ [ costs [s][d] for d in demand ] for s in supply ] ) )
+    self._checkOptimal ( dynamicAssignment, costs )
+
+    for step in range ( 200 ):
+
+      supply = dynamicAssignment.getSupplyVertices ()
+      demand = dynamicAssignment.getDemandVertices ()
+      action = randomState.randint ( 5 )
+
+      if action == 0 and len ( supply ) < 8:
+        newLabel = 's' + str ( 100 + step )
+        costs [newLabel] = dict ( [ ( d, randomState.randint ( 0, 50 ) ) for d in demand ] )
+        dynamicAssignment.add_row ( newLabel, [ costs [newLabel][d] for d in demand ] )
+
+      elif action == 1 and len ( demand ) < 8:
+        newLabel = 'd' + str ( 100 + step )
+        for s in supply:
+          costs [s][newLabel] = randomState.randint ( 0, 50 )
+        dynamicAssignment.add_col ( newLabel, [ costs [s][newLabel] for s in supply ] )
+
+      elif action == 2 and len ( supply ) > 1:
+        dynamicAssignment.remove_row ( supply [ randomState.randint ( len ( supply ) ) ] )
+
+      elif action == 3 and len ( demand ) > 1:
+        dynamicAssignment.remove_col ( demand [ randomState.randint ( len ( demand ) ) ] )
+
+      else:
+        s = supply [ randomState.randint ( len ( supply ) ) ]
+        d = demand [ randomState.randint ( len ( demand ) ) ]
+        costs [s][d] = randomState.randint ( 0, 50 )
+        dynamicAssignment.update_cost ( s, d, costs [s][d] )
+
+      self._checkOptimal ( dynamicAssignment, costs )
+
+  def testLabels (self):
+
+    dynamicAssignment = DynamicAssignment.DynamicAssignment ( ['a'], ['x'], numpy.array ( [[1]] ) )
+
+    self.assertRaises ( ValueError, dynamicAssignment.add_row, 'a', [2] )
+    self.assertRaises ( KeyError, dynamicAssignment.remove_col, 'y' )
+
+    dynamicAssignment.add_col ( 'y', [0] )
+    self.failUnless ( dynamicAssignment.getAssignedPairs () == [ ('a','y') ] )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
@@ -0,0 +1,60 @@
+import unittest
+import itertools
+from algorithms import HeldKarpBound
+from algorithms import TourConstruction
+from ut.tsp_instances import randomInstance
+import numpy
+
+class HeldKarpBound_TestCase ( unittest.TestCase):
+
+  def _bruteForceCost (self, costMatrix):
+    n = len ( costMatrix )
+    return min ( [ TourConstruction.tourCost ( costMatrix, [0] + list ( p ) ) for p in itertools.permutations ( range ( 1, n ) ) ] )
+
+  def testBoundBelowOptimum (self):
+
+    randomState = numpy.random.RandomState ( 5 )
+
+    for trial in range ( 10 ):
+      n = randomState.randint ( 4, 9 )
+      points, costMatrix, unused = randomInstance ( n, randomState )
+
+      optimum = self._bruteForceCost ( costMatrix )
+      bound, penalties, oneTree = HeldKarpBound.oneTreeBound ( costMatrix, upperBound = optimum )
+
+      self.failUnless ( bound <= optimum + 1e-9 )
+      self.failUnless ( len ( oneTree ) == n )
+
+      # Much tighter than the plain minimum 1-tree.
+      self.failUnless ( bound >= HeldKarpBound.oneTreeBound ( costMatrix, iterations = 1 ) [0] )
+
+      tour = HeldKarpBound.oneTreeTour ( oneTree )
+      if tour is not None:
+        self.failUnless ( sorted ( tour ) == range ( n ) )
+        self.failUnless ( abs ( TourConstruction.tourCost ( costMatrix, tour ) - bound ) < 1e-6 )
+
+  def testWarmStartAndForbiddenEdges (self):
+
+    points, costMatrix, unused = randomInstance ( 30, 6 )
+
+    bound, penalties, oneTree = HeldKarpBound.oneTreeBound ( costMatrix )
+
+    # Forbidding the root's 1-tree edges, from the root's penalties, can only raise the bound.
+    forbidden = [ tuple ( edge ) for edge in oneTree [:5] ]
+    childBound, childPenalties, childTree = HeldKarpBound.oneTreeBound ( costMatrix, forbidden, penalties, iterations = 30 )
+    self.failUnless ( childBound >= bound - 1e-9 )
+
+    childEdges = set ( [ ( min ( i, j ), max ( i, j ) ) for i, j in childTree ] )
+    self.failUnless ( not childEdges & set ( [ ( min ( i, j ), max ( i, j ) ) for i, j in forbidden ] ) )
+
+    # No tour at all once every edge at node 3 but one is forbidden.
+    forbidden = [ ( 3, node ) for node in range ( 1, 30 ) if node != 3 ]
+    self.failUnless ( numpy.isinf ( HeldKarpBound.oneTreeBound ( costMatrix, forbidden ) [0] ) )
+
+  def testOneTreeTour (self):
+
+    self.failUnless ( HeldKarpBound.oneTreeTour ( numpy.array ( [ [0, 1], [1, 2], [2, 3], [3, 0] ] ) ) == [0, 1, 2, 3] )
+    self.failUnless ( HeldKarpBound.oneTreeTour ( numpy.array ( [ [0, 1], [0, 2], [0, 3], [1, 2] ] ) ) is None )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
@@ -0,0 +1,53 @@
+import unittest
+import itertools
+from algorithms import HeldKarpDP
+from algorithms import TourConstruction
+import numpy
+
+class HeldKarpDP_TestCase ( unittest.TestCase):
+
+  def testAgainstBruteForce (self):
+
+    randomState = numpy.random.RandomState ( 8 )
+
+    for trial in range ( 30 ):
+      n = randomState.randint ( 3, 9 )
+      costMatrix = randomState.randint ( 1, 100, ( n, n ) ).astype ( float )
+      if trial % 3 == 0:
+        costMatrix [ randomState.rand ( n, n ) < 0.2 ] = numpy.inf
+
+      bestCost = min ( [ TourConstruction.tourCost ( costMatrix, [0] + list ( p ) ) for p in itertools.permutations ( range ( 1, n ) ) ] )
+      tour, cost = HeldKarpDP.HeldKarpDP ( costMatrix )
+
+      self.failUnless ( cost == bestCost )
+      self.failUnless ( sorted ( tour ) == range ( n ) )
+      if numpy.isfinite ( cost ):
+        self.failUnless ( tour [0] == 0 )
+        self.failUnless ( TourConstruction.tourCost ( costMatrix, tour ) == cost )
+
+  def testIntegerCostsStayExact (self):
+
+    # Costs beyond 2^53, which float64 cannot hold exactly.
+    randomState = numpy.random.RandomState ( 9 )
+    costMatrix = randomState.randint ( 1, 100, ( 8, 8 ) ).astype ( numpy.int64 ) + 2 ** 56
+
+    tour, cost = HeldKarpDP.HeldKarpDP ( costMatrix )
+    self.failUnless ( cost.dtype == numpy.int64 )
+    self.failUnless ( cost == costMatrix [ tour, numpy.roll ( tour, -1 ) ].sum () )
+
+  def testTinyAndLarger (self):
+
+    self.failUnless ( HeldKarpDP.HeldKarpDP ( numpy.array ( [ [0.0] ] ) ) == ( [0], 0.0 ) )
+    self.failUnless ( HeldKarpDP.HeldKarpDP ( numpy.array ( [ [0, 2], [3, 0] ] ) ) [1] == 5 )
+
+    # A one-way ring is the only cheap tour.
+    n = 16
+    costMatrix = numpy.ones ( ( n, n ) ) * 10
+    for i in range ( n ):
+      costMatrix [ i, ( i + 5 ) % n ] = 1
+    tour, cost = HeldKarpDP.HeldKarpDP ( costMatrix )
+    self.failUnless ( cost == n )
+    self.failUnless ( tour == [ ( 5 * i ) % n for i in range ( n ) ] )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
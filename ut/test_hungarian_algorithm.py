@@ -2,6 +2,7 @@
 import unittest
 from algorithms import HungarianAssignment
 import numpy
+import itertools
 
 class HungarianAlgorithm_TestCase ( unittest.TestCase):
 
@@ -254,6 +255,146 @@ class HungarianAlgorithm_TestCase ( unittest.TestCase):
 
     self.failUnless (  (self.costMatrix * resultGraph ).sum()  == 28 ) 
 
+  def testLabellingAgainstBruteForce (self):
+
+    randomState = numpy.random.RandomState ( 1 )
+
+    for trial in range ( 50 ):
+
+      n = randomState.randint ( 2, 7 )
+      costMatrix = randomState.randint ( 0, 20, ( n, n ) )
+
+      bestCost = min ( [ sum ( [ costMatrix [i, p[i]] for i in range (n) ] ) 
+                         for p in itertools.permutations ( range (n) ) ] )
+
+      resultGraph = HungarianAssignment.HungarianAssignment ( range (n), range (n), costMatrix )
+
+      self.failUnless ( ( costMatrix * resultGraph ).sum () == bestCost )
+
+  def testReviseCostMatrixInPlaceKeepsDtype (self):
+
+    for dtype in [ numpy.int32, numpy.float32 ]:
+
+      costMatrix = self.costMatrix.astype ( dtype )
+      originalMatrix = costMatrix.copy ()
+
+      a, b, reducedMatrix, partialGraphMatrix = HungarianAssignment.HA_Step1_ConstructInitialPartialGraph ( costMatrix ) 
+
+      delta = HungarianAssignment._reviseCostMatrixInPlace ( reducedMatrix, partialGraphMatrix, 
+                                                             [0,'*',-1,-1], [1,-1,-1,-1] )
+
+      self.failUnless ( delta == 4 ) # see page 320 of 'Networks and Algorithms'
+      self.failUnless ( reducedMatrix.dtype == dtype )
+      self.failUnless ( ( partialGraphMatrix == ( reducedMatrix == 0 ) ).all () )
+      self.failUnless ( ( costMatrix == originalMatrix ).all () )
+
+      resultGraph = HungarianAssignment.HungarianAssignment ( range (4), range (4), costMatrix )
+      self.failUnless ( ( costMatrix * resultGraph ).sum () == 28 )
+
+  def testHungarianAssignmentJV (self):
+
+    sl = range ( len (self.costMatrix )) 
+    dl = range ( len (self.costMatrix )) 
+
+    resultGraph = HungarianAssignment.HungarianAssignment (  sl, dl , self.costMatrix, engine = 'jv')
+
+    self.failUnless (  (self.costMatrix * resultGraph ).sum()  == 28 ) 
+    self.failUnless (  ( resultGraph.sum ( axis = 0 ) == 1 ).all () ) 
+    self.failUnless (  ( resultGraph.sum ( axis = 1 ) == 1 ).all () ) 
+
+  def testShortestAugmentingPathAgainstBruteForce (self):
+
+    '''
+    Compare the jv engine with every permutation on small random problems, 
+    and check the dual potentials it returns are feasible and tight.
+    ''' 
+
+    randomState = numpy.random.RandomState ( 7 )
+
+    for trial in range ( 50 ):
+
+      n = randomState.randint ( 2, 7 )
+      costMatrix = randomState.randint ( 0, 20, ( n, n ) )
+
+      bestCost = min ( [ sum ( [ costMatrix [i, p[i]] for i in range (n) ] ) 
+                         for p in itertools.permutations ( range (n) ) ] )
+
+      rowToCol, colToRow, u, v = HungarianAssignment.shortestAugmentingPathAssignment ( costMatrix )
+
+      self.failUnless ( costMatrix [ range (n), rowToCol ].sum () == bestCost )
+      self.failUnless ( ( costMatrix - u [:,None] - v [None,:] >= -1e-9 ).all () ) 
+      self.failUnless ( abs ( u.sum () + v.sum () - bestCost ) < 1e-9 ) 
+
+  def testRectangularAssignment (self):
+
+    '''
+    A wide and a tall problem should match the optimum of the same problem 
+    padded out to a square with zero cost dummy vertices.
+    ''' 
+
+    randomState = numpy.random.RandomState ( 3 )
+
+    for trial in range ( 30 ):
+
+      m, n = randomState.randint ( 1, 6, 2 )
+      costMatrix = randomState.randint ( 0, 30, ( m, n ) )
+
+      size = max ( m, n )
+      paddedMatrix = numpy.zeros ( ( size, size ), dtype = int )
+      paddedMatrix [:m, :n] = costMatrix
+      bestCost = min ( [ sum ( [ paddedMatrix [i, p[i]] for i in range (size) ] ) 
+                         for p in itertools.permutations ( range (size) ) ] )
+
+      resultGraph = HungarianAssignment.HungarianAssignment ( range (m), range (n), costMatrix )
+
+      self.failUnless ( resultGraph.shape == ( m, n ) )
+      self.failUnless ( resultGraph.sum () == min ( m, n ) )
+      self.failUnless ( ( resultGraph.sum ( axis = 0 ) <= 1 ).all () ) 
+      self.failUnless ( ( resultGraph.sum ( axis = 1 ) <= 1 ).all () ) 
+      self.failUnless ( ( costMatrix * resultGraph ).sum () == bestCost )
+
+  def testGetAssignedPairs (self):
+
+    supply = ['a','b']
+    demand = ['x','y','z']
+    costMatrix = numpy.array ( [ 5, 4, 1,
+                                 2, 6, 3 ] ).reshape (2,3)
+
+    resultGraph = HungarianAssignment.HungarianAssignment ( supply, demand, costMatrix )
+
+    self.failUnless ( HungarianAssignment.getAssignedPairs ( supply, demand, resultGraph ) == 
+                      [ ('a','z'), ('b','x') ] )
+
+    self.assertRaises ( ValueError, HungarianAssignment.HungarianAssignment, supply, supply, costMatrix )
+
+  def testHungarianAssignmentBatch (self):
+
+    randomState = numpy.random.RandomState ( 5 )
+    costs3d = randomState.randint ( 0, 100, ( 25, 6, 6 ) )
+    costs3d [0] = self.costMatrix.max () 
+    costs3d [1,:4,:4] = self.costMatrix
+    costs3d [1,4:,:] = 1000
+    costs3d [1,:,4:] = 1000
+
+    for processes in [ None, 2 ]:
+
+      resultMatrices, totalCosts = HungarianAssignment.HungarianAssignmentBatch ( costs3d, processes )
+
+      self.failUnless ( resultMatrices.shape == ( 25, 6, 6 ) )
+      self.failUnless ( ( resultMatrices.sum ( axis = 1 ) == 1 ).all () ) 
+      self.failUnless ( ( resultMatrices.sum ( axis = 2 ) == 1 ).all () ) 
+      self.failUnless ( totalCosts [1] == 28 + 2000 )
+
+      for k in range ( len ( costs3d ) ):
+        singleResult = HungarianAssignment.HungarianAssignment ( range (6), range (6), costs3d [k], 'jv' )
+        self.failUnless ( totalCosts [k] == ( costs3d [k] * singleResult ).sum () )
+        self.failUnless ( totalCosts [k] == ( costs3d [k] * resultMatrices [k] ).sum () )
+
+  def testUnknownEngine (self):
+
+    self.assertRaises ( ValueError, HungarianAssignment.HungarianAssignment, 
+                        [0,1], [0,1], numpy.eye (2), 'simplex' )
+
 #--------------------
 if __name__ == '__main__': unittest.main ()
 
@@ -0,0 +1,58 @@
+import unittest
+from algorithms import IslandTSP
+from algorithms import LinKernighan
+from algorithms import TourConstruction
+from ut.tsp_instances import randomInstance
+import numpy
+
+class IslandTSP_TestCase ( unittest.TestCase):
+
+  def setUp (self):
+
+    points, self.costMatrix, self.asymmetricMatrix = randomInstance ( 80, 12, asymmetric = True )
+
+  def testParallelIslands (self):
+
+    for costMatrix in [ self.costMatrix, self.asymmetricMatrix ]:
+
+      tour, cost = IslandTSP.IslandTSP ( costMatrix, timeLimit = 1.0, processes = 2, migrations = 2 )
+
+      self.failUnless ( sorted ( tour ) == range ( 80 ) )
+      self.failUnless ( abs ( cost - TourConstruction.tourCost ( costMatrix, tour ) ) < 1e-9 )
+      self.failUnless ( cost <= LinKernighan.LinKernighan ( costMatrix ) [1] + 1e-9 )
+
+  def testSingleIsland (self):
+
+    tour, cost = IslandTSP.IslandTSP ( self.costMatrix, timeLimit = 0.5, processes = 1 )
+    self.failUnless ( sorted ( tour ) == range ( 80 ) )
+
+  def testEdgeRecombination (self):
+
+    randomState = numpy.random.RandomState ( 0 )
+    parentA = list ( randomState.permutation ( 80 ) )
+    parentB = list ( randomState.permutation ( 80 ) )
+
+    child = IslandTSP.edgeRecombination ( parentA, parentB, self.costMatrix, randomState )
+    self.failUnless ( sorted ( child ) == range ( 80 ) )
+
+    # From identical parents the child is the same circuit.
+    child = IslandTSP.edgeRecombination ( parentA, parentA, self.costMatrix, randomState )
+    self.failUnless ( abs ( TourConstruction.tourCost ( self.costMatrix, child ) -
+                            TourConstruction.tourCost ( self.costMatrix, parentA ) ) < 1e-9 )
+
+  def testForbiddenArcs (self):
+
+    # Half the arcs forbidden at inf cost: tours and children are still whole.
+    randomState = numpy.random.RandomState ( 0 )
+    costMatrix = self.asymmetricMatrix [:10, :10].copy ()
+    costMatrix [ randomState.rand ( 10, 10 ) < 0.5 ] = numpy.inf
+
+    for trial in range ( 200 ):
+      tour = IslandTSP._randomisedNearestNeighbourTour ( costMatrix, randomState )
+      self.failUnless ( sorted ( tour ) == range ( 10 ) )
+      child = IslandTSP.edgeRecombination ( list ( randomState.permutation ( 10 ) ), list ( randomState.permutation ( 10 ) ),
+                                            costMatrix, randomState )
+      self.failUnless ( sorted ( child ) == range ( 10 ) )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
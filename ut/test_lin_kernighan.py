@@ -0,0 +1,56 @@
+import unittest
+from algorithms import LinKernighan
+from algorithms import LocalSearch
+from algorithms import TourConstruction
+from ut.tsp_instances import randomInstance
+import numpy
+
+class LinKernighan_TestCase ( unittest.TestCase):
+
+  def setUp (self):
+
+    randomState = numpy.random.RandomState ( 6 )
+    points, self.symmetricMatrix, self.asymmetricMatrix = randomInstance ( 150, randomState, asymmetric = True )
+    self.startingTour = list ( randomState.permutation ( 150 ) )
+
+  def testImprovesTour (self):
+
+    for costMatrix in [ self.symmetricMatrix, self.asymmetricMatrix ]:
+
+      startingCost = TourConstruction.tourCost ( costMatrix, self.startingTour )
+      tour, cost = LinKernighan.LinKernighan ( costMatrix, self.startingTour )
+
+      self.failUnless ( sorted ( tour ) == range ( 150 ) )
+      self.failUnless ( abs ( cost - TourConstruction.tourCost ( costMatrix, tour ) ) < 1e-9 )
+      self.failUnless ( cost < startingCost )
+
+  def testBetterThanTwoOptOnAsymmetric (self):
+
+    tour, cost = LinKernighan.LinKernighan ( self.asymmetricMatrix )
+    twoOptTour, twoOptCost = LocalSearch.improve_tour ( self.asymmetricMatrix,
+                                                        TourConstruction.construct_tour ( self.asymmetricMatrix, 'greedyEdge' ) [0] )
+    self.failUnless ( cost < twoOptCost )
+
+  def testOneWayRing (self):
+
+    # Only the edges i -> i+1 are cheap, so the only good tour is the ring in that direction.
+    costMatrix = numpy.ones ( (12, 12) ) * 10
+    for i in range ( 12 ):
+      costMatrix [i, ( i + 1 ) % 12] = 1
+
+    tour, cost = LinKernighan.LinKernighan ( costMatrix, [0, 5, 3, 9, 1, 11, 7, 2, 10, 4, 8, 6] )
+    self.failUnless ( cost == 12 )
+
+  def testIteratedNoWorse (self):
+
+    for costMatrix in [ self.symmetricMatrix, self.asymmetricMatrix ]:
+      tour, cost = LinKernighan.IteratedLinKernighan ( costMatrix, timeLimit = 10.0, maxKicks = 50,
+                                                       randomState = numpy.random.RandomState ( 0 ) )
+      self.failUnless ( sorted ( tour ) == range ( 150 ) )
+      self.failUnless ( cost <= LinKernighan.LinKernighan ( costMatrix ) [1] + 1e-9 )
+
+  def testTinyTour (self):
+    self.failUnless ( LinKernighan.LinKernighan ( self.asymmetricMatrix [:3, :3], [2,0,1] ) [0] == [2,0,1] )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
@@ -0,0 +1,57 @@
+import unittest
+from algorithms import LocalSearch
+from algorithms import TourConstruction
+from ut.tsp_instances import randomInstance
+import numpy
+
+class LocalSearch_TestCase ( unittest.TestCase):
+
+  def setUp (self):
+
+    randomState = numpy.random.RandomState ( 5 )
+    points, self.symmetricMatrix, self.asymmetricMatrix = randomInstance ( 80, randomState, asymmetric = True )
+    self.startingTour = list ( randomState.permutation ( 80 ) )
+
+  def testImprovesTour (self):
+
+    for costMatrix in [ self.symmetricMatrix, self.asymmetricMatrix ]:
+
+      startingCost = TourConstruction.tourCost ( costMatrix, self.startingTour )
+      tour, cost = LocalSearch.improve_tour ( costMatrix, self.startingTour )
+
+      self.failUnless ( sorted ( tour ) == range ( 80 ) )
+      self.failUnless ( abs ( cost - TourConstruction.tourCost ( costMatrix, tour ) ) < 1e-9 )
+      self.failUnless ( cost < startingCost )
+
+  def testForbiddenArcs (self):
+
+    # Arcs forbidden at inf cost: the inf - inf deltas must not pass for moves.
+    randomState = numpy.random.RandomState ( 6 )
+    for costMatrix in [ self.symmetricMatrix [:8, :8].copy (), self.asymmetricMatrix [:8, :8].copy () ]:
+      for trial in range ( 10 ):
+        forbidden = costMatrix.copy ()
+        forbidden [ randomState.rand ( 8, 8 ) < 0.2 ] = numpy.inf
+        startingTour = list ( randomState.permutation ( 8 ) )
+
+        tour, cost = LocalSearch.improve_tour ( forbidden, startingTour )
+        self.failUnless ( sorted ( tour ) == range ( 8 ) )
+        self.failUnless ( cost <= TourConstruction.tourCost ( forbidden, startingTour ) )
+
+  def testTwoOptOptimalWithFullNeighbourLists (self):
+
+    # With every node a neighbour, no 2-opt move can improve the result.
+    tour, cost = LocalSearch.improve_tour ( self.symmetricMatrix, self.startingTour, neighbourCount = 79 )
+
+    for i in range ( 80 ):
+      for j in range ( i + 2, 80 ):
+        candidate = tour [: i + 1] + tour [i + 1 : j + 1][::-1] + tour [j + 1 :]
+        self.failUnless ( TourConstruction.tourCost ( self.symmetricMatrix, candidate ) > cost - 1e-9 )
+
+  def testTinyTours (self):
+
+    costMatrix = self.asymmetricMatrix [:4, :4]
+    self.failUnless ( LocalSearch.improve_tour ( costMatrix, [3,1,0,2] ) [0] == [3,1,0,2] )
+    self.failUnless ( LocalSearch.improve_tour ( numpy.zeros ( (1,1) ), [0] ) == ( [0], 0 ) )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
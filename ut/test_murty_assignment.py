@@ -0,0 +1,49 @@
+
+import unittest
+from algorithms import MurtyAssignment
+import numpy
+import itertools
+
+class MurtyAssignment_TestCase ( unittest.TestCase):
+
+  def testAgainstAllPermutations (self):
+
+    '''
+    Every assignment of a 5x5 problem should be generated exactly once, 
+    in order of cost.
+    ''' 
+
+    randomState = numpy.random.RandomState ( 2 )
+    costMatrix = randomState.randint ( 0, 100, ( 5, 5 ) )
+
+    allCosts = sorted ( [ sum ( [ costMatrix [i, p[i]] for i in range (5) ] ) 
+                          for p in itertools.permutations ( range (5) ) ] )
+
+    generatedCosts = []
+    seenAssignments = set ()
+
+    for resultMatrix, totalCost in MurtyAssignment.iter_best_assignments ( costMatrix ):
+
+      self.failUnless ( ( resultMatrix.sum ( axis = 0 ) == 1 ).all () ) 
+      self.failUnless ( ( resultMatrix.sum ( axis = 1 ) == 1 ).all () ) 
+      self.failUnless ( ( costMatrix * resultMatrix ).sum () == totalCost )
+
+      generatedCosts.append ( totalCost )
+      seenAssignments.add ( tuple ( resultMatrix.argmax ( axis = 1 ) ) )
+
+    self.failUnless ( generatedCosts == allCosts )
+    self.failUnless ( len ( seenAssignments ) == 120 )
+
+  def testForbiddenPairs (self):
+
+    # Only the identity and the swap of rows 0,1 are feasible
+    costMatrix = numpy.array ( [ 1, 2, numpy.inf,
+                                 3, 1, numpy.inf,
+                                 numpy.inf, numpy.inf, 1 ] ).reshape (3,3)
+
+    generatedCosts = [ totalCost for resultMatrix, totalCost in MurtyAssignment.iter_best_assignments ( costMatrix ) ]
+
+    self.failUnless ( generatedCosts == [ 3, 6 ] )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
@@ -0,0 +1,49 @@
+import unittest
+from algorithms import TabuTSP
+from algorithms import LocalSearch
+from algorithms import TourConstruction
+from ut.tsp_instances import randomInstance
+import numpy
+
+class TabuTSP_TestCase ( unittest.TestCase):
+
+  def setUp (self):
+
+    points, self.symmetricMatrix, self.asymmetricMatrix = randomInstance ( 70, 11, asymmetric = True )
+
+  def testBetterThanLocalSearch (self):
+
+    for costMatrix in [ self.symmetricMatrix, self.asymmetricMatrix ]:
+
+      startingTour, startingCost = TourConstruction.construct_tour ( costMatrix, 'greedyEdge' )
+      localOptimum, localCost = LocalSearch.improve_tour ( costMatrix, startingTour )
+
+      tour, cost, costHistory = TabuTSP.TabuTSP ( costMatrix, startingTour, timeLimit = 10.0, maxIterations = 300 )
+
+      self.failUnless ( sorted ( tour ) == range ( 70 ) )
+      self.failUnless ( abs ( cost - TourConstruction.tourCost ( costMatrix, tour ) ) < 1e-9 )
+      self.failUnless ( abs ( costHistory [0] - localCost ) < 1e-9 )
+      self.failUnless ( abs ( min ( costHistory ) - cost ) < 1e-9 )
+      self.failUnless ( cost < localCost - 1e-9 )
+      self.failUnless ( len ( costHistory ) <= 301 )
+
+  def testForbiddenArcs (self):
+
+    costMatrix = self.asymmetricMatrix [:8, :8].copy ()
+    costMatrix [ numpy.random.RandomState ( 2 ).rand ( 8, 8 ) < 0.2 ] = numpy.inf
+
+    tour, cost, costHistory = TabuTSP.TabuTSP ( costMatrix, range ( 8 ), maxIterations = 50 )
+    self.failUnless ( sorted ( tour ) == range ( 8 ) and cost == min ( costHistory ) )
+
+  def testTimeLimit (self):
+
+    tour, cost, costHistory = TabuTSP.TabuTSP ( self.symmetricMatrix, timeLimit = 0.0 )
+    self.failUnless ( len ( costHistory ) == 1 )
+
+  def testTinyTour (self):
+
+    tour, cost, costHistory = TabuTSP.TabuTSP ( self.asymmetricMatrix [:3, :3] )
+    self.failUnless ( sorted ( tour ) == [0,1,2] and costHistory == [cost] )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
@@ -0,0 +1,60 @@
+
+import unittest
+from algorithms import TourConstruction
+from ut.tsp_instances import randomInstance
+import numpy
+
+class TourConstruction_TestCase ( unittest.TestCase):
+
+  def setUp (self):
+
+    self.points, self.symmetricMatrix, self.asymmetricMatrix = randomInstance ( 60, 8, asymmetric = True )
+
+  def testEveryMethodGivesATour (self):
+
+    for costMatrix in [ self.symmetricMatrix, self.asymmetricMatrix ]:
+
+      costs = []
+      for method in TourConstruction.METHODS:
+
+        tour, cost = TourConstruction.construct_tour ( costMatrix, method )
+
+        self.failUnless ( sorted ( tour ) == range ( 60 ) )
+        self.failUnless ( abs ( cost - TourConstruction.tourCost ( costMatrix, tour ) ) < 1e-9 )
+        costs.append ( cost )
+
+      tour, cost = TourConstruction.construct_tour ( costMatrix )
+      self.failUnless ( cost == min ( costs ) )
+
+  def testForbiddenArcs (self):
+
+    # Every arc out of node 4 forbidden, and some others: all tours cost inf,
+    # but each method must still give one.
+    randomState = numpy.random.RandomState ( 3 )
+    costMatrix = self.symmetricMatrix [:8, :8].copy ()
+    costMatrix [ randomState.rand ( 8, 8 ) < 0.3 ] = numpy.inf
+    costMatrix [4] = numpy.inf
+
+    for method in TourConstruction.METHODS + [ 'best' ]:
+      tour, cost = TourConstruction.construct_tour ( costMatrix, method )
+      self.failUnless ( sorted ( tour ) == range ( 8 ) and cost == numpy.inf )
+
+  def testSpaceFillingCurveWithCoordinates (self):
+
+    tour, cost = TourConstruction.construct_tour ( self.symmetricMatrix, 'spaceFillingCurve', self.points )
+    self.failUnless ( sorted ( tour ) == range ( 60 ) )
+
+  def testTourToBooleanMatrix (self):
+
+    booleanMatrix = TourConstruction.tourToBooleanMatrix ( [0,2,1] )
+    self.failUnless ( ( booleanMatrix == numpy.array ( [ False, False, True,
+                                                         True,  False, False,
+                                                         False, True,  False ] ).reshape (3,3) ).all () )
+
+  def testTinyAndUnknown (self):
+
+    self.failUnless ( TourConstruction.construct_tour ( numpy.zeros ( (1,1) ), 'greedyEdge' ) == ( [0], 0 ) )
+    self.assertRaises ( ValueError, TourConstruction.construct_tour, self.symmetricMatrix, 'christofides' )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
@@ -0,0 +1,57 @@
+
+import unittest
+from algorithms import TransportationProblem
+from algorithms import HungarianAssignment
+import numpy
+
+class TransportationProblem_TestCase ( unittest.TestCase):
+
+  def testSmallExample (self):
+
+    costMatrix = numpy.array ( [1,3, 2,1] ).reshape (2,2)
+    flows = TransportationProblem.TransportationProblem ( [5,3], [4,4], costMatrix )
+
+    self.failUnless ( ( flows == numpy.array ( [4,1, 0,3] ).reshape (2,2) ).all () )
+
+  def testAgainstUnitExpansion (self):
+
+    '''
+    Duplicating each supply row once per unit (and each demand col once per unit)
+    turns the problem into an assignment problem with the same optimum.
+    ''' 
+
+    randomState = numpy.random.RandomState ( 6 )
+
+    for trial in range ( 30 ):
+
+      numRows, numCols = randomState.randint ( 1, 5, 2 )
+      costMatrix = randomState.randint ( 0, 20, ( numRows, numCols ) )
+      supplyQuantities = randomState.randint ( 0, 5, numRows )
+      demandQuantities = randomState.randint ( 0, 5, numCols )
+
+      # Top up supply so that it covers demand, sometimes with a surplus.
+      supplyQuantities [0] += max ( 0, demandQuantities.sum () - supplyQuantities.sum () ) + randomState.randint ( 0, 2 )
+
+      flows = TransportationProblem.TransportationProblem ( supplyQuantities, demandQuantities, costMatrix )
+
+      self.failUnless ( ( flows >= 0 ).all () )
+      self.failUnless ( ( flows.sum ( axis = 1 ) <= supplyQuantities ).all () )
+      self.failUnless ( ( flows.sum ( axis = 0 ) == demandQuantities ).all () )
+
+      expandedMatrix = costMatrix.repeat ( supplyQuantities, axis = 0 ).repeat ( demandQuantities, axis = 1 )
+      if expandedMatrix.size == 0:
+        self.failUnless ( flows.sum () == 0 )
+        continue
+
+      resultGraph = HungarianAssignment.HungarianAssignment ( range ( expandedMatrix.shape [0] ), 
+                                                              range ( expandedMatrix.shape [1] ), expandedMatrix, 'jv' )
+
+      self.failUnless ( ( flows * costMatrix ).sum () == ( resultGraph * expandedMatrix ).sum () )
+
+  def testDemandExceedsSupply (self):
+
+    self.assertRaises ( ValueError, TransportationProblem.TransportationProblem, 
+                        [1,1], [2,1], numpy.ones ( ( 2, 2 ) ) )
+
+#--------------------
+if __name__ == '__main__': unittest.main ()
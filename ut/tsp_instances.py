@@ -0,0 +1,44 @@
+
+# Random Euclidean instances shared by the TSP tests.
+
+import numpy
+
+def distanceMatrix ( points ):
+
+  '''
+  Euclidean distances between each pair of rows of points.
+  '''
+
+  return numpy.sqrt ( ( ( points [:, None] - points [None, :] ) ** 2 ).sum ( axis = 2 ) )
+
+def randomInstance ( numPoints, seed, scale = 1.0, rounded = False, asymmetric = False ):
+
+  '''
+
+  numPoints random points in a square of side scale, and their distances.
+
+  seed is a number, or a numpy.random.RandomState to go on drawing from (in
+  a loop of trials, say). rounded rounds the distances to integers.
+
+  Returns ( points, symmetricMatrix, asymmetricMatrix ). With asymmetric,
+  asymmetricMatrix is the distances plus uniform [0, 1) noise, drawn after
+  the points; otherwise it is None, and nothing more is drawn.
+
+  Example (not for doctest)
+
+  points, symmetricMatrix, asymmetricMatrix = randomInstance ( 60, 8, asymmetric = True )
+
+  '''
+
+  randomState = seed if isinstance ( seed, numpy.random.RandomState ) else numpy.random.RandomState ( seed )
+
+  points = randomState.rand ( numPoints, 2 ) * scale
+  symmetricMatrix = distanceMatrix ( points )
+  if rounded:
+    symmetricMatrix = numpy.round ( symmetricMatrix )
+
+  asymmetricMatrix = None
+  if asymmetric:
+    asymmetricMatrix = symmetricMatrix + randomState.rand ( numPoints, numPoints )
+
+  return points, symmetricMatrix, asymmetricMatrix